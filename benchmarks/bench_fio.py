@@ -0,0 +1,243 @@
+"""
+Benchmarks for the domain/fio hot paths and the run generator.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_fio                      # 10k rows
+    python -m benchmarks.bench_fio --sizes 10k,1m,10m   # full suite
+    python -m benchmarks.bench_fio --only normalize,flags
+    python -m benchmarks.bench_fio --compare OLD.json NEW.json
+
+Corpora are cached in benchmarks/.corpus/ (keyed by size and seed); results
+are written to benchmarks/results/<timestamp>_<commit>.json.
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict
+from pathlib import Path
+from typing import Callable, Iterator
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT / "src"))
+
+from benchmarks.corpus import CorpusConfig, header, write_corpus  # noqa: E402
+from domain.fio.normalize_value import normalize_fio_value  # noqa: E402
+from domain.fio.quality_checks import detect_flags, detect_warnings  # noqa: E402
+
+
+CORPUS_DIR = REPO_ROOT / "benchmarks" / ".corpus"
+RESULTS_DIR = REPO_ROOT / "benchmarks" / "results"
+
+CHUNK_VALUES = 100_000
+BENCHMARKS = ["normalize", "warnings", "flags", "preview", "run"]
+
+
+def _parse_size(s: str) -> int:
+    s = s.strip().lower()
+    mult = {"k": 1_000, "m": 1_000_000}.get(s[-1:], 1)
+    return int(float(s[:-1] if mult > 1 else s) * mult)
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def _corpus_path(cfg: CorpusConfig) -> Path:
+    path = CORPUS_DIR / f"fio_{cfg.rows}_{cfg.seed}_{cfg.extra_columns}.csv"
+    if not path.exists():
+        started = time.perf_counter()
+        write_corpus(path, cfg)
+        print(f"  corpus {path.name}: {time.perf_counter() - started:.1f}s", file=sys.stderr)
+    return path
+
+
+def _iter_value_chunks(path: Path, cfg: CorpusConfig) -> Iterator[list[str]]:
+    """
+    FIO cells (fio + split columns) of the corpus, in chunks; reading is not timed.
+    """
+    cols = [header(cfg).index(c) for c in ("fio", "last_name", "first_name", "middle_name")]
+    with path.open("r", encoding="utf-8-sig", newline="") as f:
+        reader = csv.reader(f, delimiter=cfg.delimiter)
+        next(reader)
+        chunk: list[str] = []
+        for row in reader:
+            chunk.extend(row[i] for i in cols)
+            if len(chunk) >= CHUNK_VALUES:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+
+def _bench_values(fn: Callable, path: Path, cfg: CorpusConfig) -> dict:
+    seconds = 0.0
+    values = 0
+    for chunk in _iter_value_chunks(path, cfg):
+        started = time.perf_counter()
+        for v in chunk:
+            fn(v)
+        seconds += time.perf_counter() - started
+        values += len(chunk)
+    return {"seconds": seconds, "values": values, "values_per_sec": values / seconds if seconds else None}
+
+
+def _setup_django(workdir: Path) -> None:
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+    import django
+    from django.conf import settings
+
+    settings.DATABASES["default"]["NAME"] = str(workdir / "bench.sqlite3")
+    settings.MEDIA_ROOT = str(workdir / "media")
+    django.setup()
+
+    from django.core.management import call_command
+
+    call_command("migrate", verbosity=0)
+
+
+def _storage_copy(path: Path) -> str:
+    from django.core.files import File
+    from django.core.files.storage import default_storage
+
+    with path.open("rb") as f:
+        return default_storage.save(f"uploads/{path.name}", File(f))
+
+
+def _bench_preview(path: Path, cfg: CorpusConfig, repeat: int = 20) -> dict:
+    from uploads.views import _read_csv_preview
+
+    storage_path = _storage_copy(path)
+    started = time.perf_counter()
+    for _ in range(repeat):
+        _read_csv_preview(storage_path)
+    seconds = (time.perf_counter() - started) / repeat
+    return {"seconds": seconds, "calls": repeat}
+
+
+def _bench_run(path: Path, cfg: CorpusConfig) -> dict:
+    from apps.fio_runstore.generator.run_generator import generate_suggestions_for_csv
+
+    storage_path = _storage_copy(path)
+    selection = {
+        "mode": "split",
+        "last_name_column": "last_name",
+        "first_name_column": "first_name",
+        "middle_name_column": "middle_name",
+    }
+    started = time.perf_counter()
+    run = generate_suggestions_for_csv(
+        source_csv_path=storage_path,
+        selection=selection,
+        encoding="utf-8-sig",
+        delimiter=cfg.delimiter,
+    )
+    seconds = time.perf_counter() - started
+    return {
+        "seconds": seconds,
+        "rows_per_sec": cfg.rows / seconds if seconds else None,
+        "suggestions": run.suggestions.count(),
+        "run_metrics": run.metrics,
+    }
+
+
+def run_suite(sizes: list[int], only: list[str], seed: int, extra_columns: int) -> dict:
+    results = []
+    with tempfile.TemporaryDirectory(prefix="fio-bench-") as tmp:
+        django_ready = False
+        for rows in sizes:
+            cfg = CorpusConfig(rows=rows, seed=seed, extra_columns=extra_columns)
+            path = _corpus_path(cfg)
+
+            for name in only:
+                if name in ("preview", "run") and not django_ready:
+                    _setup_django(Path(tmp))
+                    django_ready = True
+
+                if name == "normalize":
+                    res = _bench_values(normalize_fio_value, path, cfg)
+                elif name == "warnings":
+                    res = _bench_values(detect_warnings, path, cfg)
+                elif name == "flags":
+                    res = _bench_values(detect_flags, path, cfg)
+                elif name == "preview":
+                    res = _bench_preview(path, cfg)
+                else:
+                    res = _bench_run(path, cfg)
+
+                results.append({"benchmark": name, "rows": rows, **res})
+                print(f"{name:>10} {rows:>10}: {res['seconds']:.3f}s", file=sys.stderr)
+
+    return {
+        "commit": _git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "corpus": {
+            k: v
+            for k, v in asdict(CorpusConfig(rows=0, seed=seed, extra_columns=extra_columns)).items()
+            if k != "rows"
+        },
+        "results": results,
+    }
+
+
+def compare(old_path: Path, new_path: Path) -> None:
+    old = json.loads(old_path.read_text(encoding="utf-8"))
+    new = json.loads(new_path.read_text(encoding="utf-8"))
+    old_by_key = {(r["benchmark"], r["rows"]): r for r in old["results"]}
+    print(f"{'benchmark':>10} {'rows':>10} {old['commit']:>10} {new['commit']:>10} {'change':>8}")
+    for r in new["results"]:
+        o = old_by_key.get((r["benchmark"], r["rows"]))
+        if o is None:
+            continue
+        change = (r["seconds"] - o["seconds"]) / o["seconds"] * 100.0 if o["seconds"] else 0.0
+        print(f"{r['benchmark']:>10} {r['rows']:>10} {o['seconds']:>10.3f} {r['seconds']:>10.3f} {change:>+7.1f}%")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10k", help="comma-separated row counts, e.g. 10k,1m,10m")
+    parser.add_argument("--only", default=",".join(BENCHMARKS), help=f"subset of: {','.join(BENCHMARKS)}")
+    parser.add_argument("--seed", type=int, default=CorpusConfig.seed)
+    parser.add_argument("--extra-columns", type=int, default=CorpusConfig.extra_columns)
+    parser.add_argument("--output", type=Path, help="results file (default: benchmarks/results/...)")
+    parser.add_argument("--compare", nargs=2, type=Path, metavar=("OLD", "NEW"))
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        compare(*args.compare)
+        return 0
+
+    only = [b.strip() for b in args.only.split(",") if b.strip()]
+    unknown = set(only) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"unknown benchmarks: {sorted(unknown)}")
+
+    # The names dictionary path is relative to the repository root.
+    os.chdir(REPO_ROOT)
+    report = run_suite([_parse_size(s) for s in args.sizes.split(",")], only, args.seed, args.extra_columns)
+
+    output = args.output or RESULTS_DIR / f"{time.strftime('%Y%m%d_%H%M%S')}_{report['commit']}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
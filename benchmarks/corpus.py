@@ -0,0 +1,165 @@
+"""
+Deterministic synthetic FIO corpus for benchmarks.
+
+The same (rows, seed, rates) always produce byte-identical files, so timings
+from different commits are measured on the same data.
+"""
+
+from __future__ import annotations
+
+import csv
+import random
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator
+
+
+_SURNAMES = [
+    "Иванов", "Смирнов", "Кузнецов", "Попов", "Васильев", "Петров", "Соколов",
+    "Михайлов", "Новиков", "Фёдоров", "Морозов", "Волков", "Алексеев", "Лебедев",
+    "Семёнов", "Егоров", "Павлов", "Козлов", "Степанов", "Николаев", "Орлов",
+    "Андреев", "Макаров", "Никитин", "Захаров", "Зайцев", "Соловьёв", "Борисов",
+    "Яковлев", "Григорьев", "Романов", "Воробьёв", "Сергеев", "Кузьмин", "Фролов",
+    "Александров", "Дмитриев", "Королёв", "Гусев", "Киселёв", "Ильин", "Максимов",
+    "Поляков", "Сорокин", "Виноградов", "Ковалёв", "Белов", "Медведев", "Антонов",
+    "Тарасов", "Жуков", "Баранов", "Филиппов", "Комаров", "Давыдов", "Беляев",
+    "Герасимов", "Богданов", "Осипов", "Сидоров", "Матвеев", "Титов", "Марков",
+    "Миронов", "Крылов", "Куликов", "Карпов", "Власов", "Мельников", "Денисов",
+    "Гаврилов", "Тихонов", "Казаков", "Афанасьев", "Данилов", "Савельев", "Тимофеев",
+    "Фомин", "Чернов", "Абрамов", "Мартынов", "Ефимов", "Федотов", "Щербаков",
+    "Назаров", "Калинин", "Исаев", "Чернышёв", "Быков", "Маслов", "Родионов",
+    "Коновалов", "Лазарев", "Воронин", "Климов", "Филатов", "Пономарёв", "Голубев",
+]
+
+# (first name, gender, patronymic stem or None)
+_FIRST_NAMES = [
+    ("Александр", "m", "Александров"), ("Алексей", "m", "Алексеев"),
+    ("Андрей", "m", "Андреев"), ("Антон", "m", "Антонов"), ("Борис", "m", "Борисов"),
+    ("Вадим", "m", "Вадимов"), ("Виктор", "m", "Викторов"), ("Владимир", "m", "Владимиров"),
+    ("Дмитрий", "m", "Дмитриев"), ("Евгений", "m", "Евгеньев"), ("Иван", "m", "Иванов"),
+    ("Игорь", "m", "Игорев"), ("Кирилл", "m", "Кириллов"), ("Максим", "m", "Максимов"),
+    ("Михаил", "m", "Михайлов"), ("Николай", "m", "Николаев"), ("Олег", "m", "Олегов"),
+    ("Павел", "m", "Павлов"), ("Роман", "m", "Романов"), ("Сергей", "m", "Сергеев"),
+    ("Юрий", "m", "Юрьев"), ("Анна", "f", None), ("Мария", "f", None),
+    ("Елена", "f", None), ("Ольга", "f", None), ("Наталья", "f", None),
+    ("Татьяна", "f", None), ("Ирина", "f", None), ("Светлана", "f", None),
+    ("Екатерина", "f", None), ("Юлия", "f", None), ("Анастасия", "f", None),
+    ("Марина", "f", None), ("Людмила", "f", None), ("Галина", "f", None),
+    ("Дарья", "f", None), ("Ксения", "f", None), ("Виктория", "f", None),
+]
+_FATHER_STEMS = [stem for _, g, stem in _FIRST_NAMES if stem]
+
+_TYPOS = {
+    "Александр": "Алексаднр", "Сергей": "Сергй", "Мария": "Мраия",
+    "Иван": "Иавн", "Екатерина": "Екатреина", "Дмитрий": "Дмитрйи",
+}
+
+_LATIN = {
+    "а": "a", "б": "b", "в": "v", "г": "g", "д": "d", "е": "e", "ё": "e",
+    "ж": "zh", "з": "z", "и": "i", "й": "i", "к": "k", "л": "l", "м": "m",
+    "н": "n", "о": "o", "п": "p", "р": "r", "с": "s", "т": "t", "у": "u",
+    "ф": "f", "х": "kh", "ц": "ts", "ч": "ch", "ш": "sh", "щ": "shch",
+    "ъ": "ie", "ы": "y", "ь": "", "э": "e", "ю": "iu", "я": "ia",
+}
+_LATIN_LOOKALIKES = {"А": "A", "а": "a", "С": "C", "с": "c", "О": "O", "о": "o", "Е": "E", "е": "e"}
+_DIGIT_LOOKALIKES = {"О": "0", "о": "0", "З": "3", "з": "3", "б": "6"}
+_INVISIBLE = ["\u200b", "\ufeff", "\u00ad", "\u2060"]
+
+HEADER = ["id", "fio", "last_name", "first_name", "middle_name"]
+
+
+@dataclass(frozen=True)
+class CorpusConfig:
+    rows: int
+    seed: int = 20240101
+    noise_rate: float = 0.10  # case / spaces / punctuation noise
+    latin_rate: float = 0.02
+    digits_rate: float = 0.01
+    homoglyph_rate: float = 0.01  # one Cyrillic letter replaced by its Latin twin
+    invisible_rate: float = 0.01
+    typo_rate: float = 0.02
+    extra_columns: int = 20  # filler columns (HR exports are wide)
+    delimiter: str = ";"
+
+
+def _to_latin(s: str) -> str:
+    out = []
+    for ch in s:
+        lat = _LATIN.get(ch.lower(), ch)
+        out.append(lat.capitalize() if ch.isupper() else lat)
+    return "".join(out)
+
+
+def _replace_one(value: str, table: dict[str, str], rng: random.Random) -> str:
+    spots = [i for i, ch in enumerate(value) if ch in table]
+    if not spots:
+        return value
+    i = rng.choice(spots)
+    return value[:i] + table[value[i]] + value[i + 1 :]
+
+
+def _person(rng: random.Random, cfg: CorpusConfig) -> list[str]:
+    surname = rng.choice(_SURNAMES)
+    first, gender, _ = rng.choice(_FIRST_NAMES)
+    stem = rng.choice(_FATHER_STEMS)  # patronymic: stem + -ич / -на
+    if gender == "f":
+        surname += "а"
+        middle = stem + "на"
+    else:
+        middle = stem + "ич"
+
+    if rng.random() < cfg.typo_rate and first in _TYPOS:
+        first = _TYPOS[first]
+    return [surname, first, middle]
+
+
+def _damage(value: str, rng: random.Random, cfg: CorpusConfig) -> str:
+    if rng.random() < cfg.latin_rate:
+        value = _to_latin(value)
+    if rng.random() < cfg.digits_rate:
+        value = _replace_one(value, _DIGIT_LOOKALIKES, rng)
+    if rng.random() < cfg.homoglyph_rate:
+        value = _replace_one(value, _LATIN_LOOKALIKES, rng)
+    if rng.random() < cfg.invisible_rate:
+        i = rng.randrange(len(value) + 1)
+        value = value[:i] + rng.choice(_INVISIBLE) + value[i:]
+    if rng.random() < cfg.noise_rate:
+        kind = rng.randrange(4)
+        if kind == 0:
+            value = value.upper()
+        elif kind == 1:
+            value = value.lower()
+        elif kind == 2:
+            value = f"  {value.replace(' ', '   ')} "
+        else:
+            value = value.replace(" ", ", ", 1)
+    return value
+
+
+def iter_corpus_rows(cfg: CorpusConfig) -> Iterator[list[str]]:
+    """
+    Yields data rows (without header) matching header(cfg).
+    """
+    rng = random.Random(cfg.seed)
+    for row_id in range(1, cfg.rows + 1):
+        last, first, middle = _person(rng, cfg)
+        fio = _damage(f"{last} {first} {middle}", rng, cfg)
+        parts = [_damage(v, rng, cfg) for v in (last, first, middle)]
+        filler = [f"v{row_id % 97}_{j}" for j in range(cfg.extra_columns)]
+        yield [str(row_id), fio, *parts, *filler]
+
+
+def header(cfg: CorpusConfig) -> list[str]:
+    return HEADER + [f"extra_{j}" for j in range(cfg.extra_columns)]
+
+
+def write_corpus(path: Path, cfg: CorpusConfig) -> Path:
+    """
+    Write the corpus as UTF-8 CSV (with BOM, like Excel exports).
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w", encoding="utf-8-sig", newline="") as f:
+        writer = csv.writer(f, delimiter=cfg.delimiter)
+        writer.writerow(header(cfg))
+        writer.writerows(iter_corpus_rows(cfg))
+    return path
@@ -1,5 +1,162 @@
-from django.contrib import admin
-from .models import Run, Suggestion
+import json
+import os
+
+from django.contrib import admin, messages
+from django.contrib.admin.views.main import IS_POPUP_VAR, ORDER_VAR, PAGE_VAR, TO_FIELD_VAR
+from django.core.paginator import EmptyPage, PageNotAnInteger, Paginator
+from django.http import FileResponse, Http404
+from django.urls import path, reverse
+from django.utils.functional import cached_property
+from django.utils.html import format_html
+from django.utils.text import capfirst
+
+from .generator.generators import (
+    SUGGEST_DICT_NAME_TYPO,
+    SUGGEST_DICT_NAME_VARIANT,
+    SUGGEST_HOMOGLYPH,
+    SUGGEST_NAME_PATRONYMIC_MISMATCH,
+    SUGGEST_TRANSLIT_LATIN,
+)
+from .models import ProfileReport, Run, Suggestion
+from .retention import apply_retention, delete_runs
+from .search import fts_available, matching_ids
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Exact count up to EXACT_COUNT_LIMIT rows. Above that, no COUNT(*) over
+    millions of rows:
+    - estimate_from_ids: the id range of the result (two index lookups),
+      only close for lists whose ids are dense (a whole run, all rows);
+    - otherwise the count is capped: shown as "10000+", pages go on as
+      long as there are rows and there is no link to the last page.
+    """
+
+    EXACT_COUNT_LIMIT = 10_000
+
+    def __init__(self, *args, estimate_from_ids=True, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.estimate_from_ids = estimate_from_ids
+
+    @cached_property
+    def count(self):
+        qs = self.object_list.order_by()
+        exact = qs[: self.EXACT_COUNT_LIMIT + 1].count()
+        if exact <= self.EXACT_COUNT_LIMIT:
+            return exact
+        if not self.estimate_from_ids:
+            return exact
+        ids = qs.order_by("pk").values_list("pk", flat=True)
+        return max(exact, ids.last() - ids.first() + 1)
+
+    @property
+    def capped(self):
+        return not self.estimate_from_ids and self.count > self.EXACT_COUNT_LIMIT
+
+    def _has_next(self, number):
+        return self.object_list[number * self.per_page :].exists()
+
+    def validate_number(self, number):
+        if not self.capped:
+            return super().validate_number(number)
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger("That page number is not an integer")
+        if number < 1:
+            raise EmptyPage("That page number is less than 1")
+        return number
+
+    def page(self, number):
+        if not self.capped:
+            return super().page(number)
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        if number > 1 and not self._has_next(number - 1):
+            raise EmptyPage("That page contains no results")
+        return self._get_page(self.object_list[bottom : bottom + self.per_page], number, self)
+
+    def get_elided_page_range(self, number=1, *, on_each_side=3, on_ends=2):
+        if not self.capped:
+            yield from super().get_elided_page_range(number, on_each_side=on_each_side, on_ends=on_ends)
+            return
+        number = self.validate_number(number)
+        first = number - on_each_side
+        if first > on_ends + 1:
+            yield from range(1, on_ends + 1)
+            yield self.ELLIPSIS
+        else:
+            first = 1
+        yield from range(first, number + 1)
+        if self._has_next(number):
+            yield number + 1
+            yield self.ELLIPSIS
+
+
+class RunScopeFilter(admin.SimpleListFilter):
+    """
+    Suggestions of one run: the latest run unless another run or "all" is chosen.
+    """
+
+    title = "run"
+    parameter_name = "run"
+    ALL = "all"
+    RECENT_RUNS = 20
+
+    def lookups(self, request, model_admin):
+        return [(str(run.pk), str(run)) for run in Run.objects.order_by("-id")[: self.RECENT_RUNS]]
+
+    def value(self):
+        value = super().value()
+        if value is None:
+            latest = Run.objects.order_by("-id").values_list("id", flat=True).first()
+            return str(latest) if latest is not None else self.ALL
+        return value
+
+    def choices(self, changelist):
+        yield {
+            "selected": self.value() == self.ALL,
+            "query_string": changelist.get_query_string({self.parameter_name: self.ALL}),
+            "display": "all runs",
+        }
+        for lookup, title in self.lookup_choices:
+            yield {
+                "selected": self.value() == lookup,
+                "query_string": changelist.get_query_string({self.parameter_name: lookup}),
+                "display": title,
+            }
+
+    def queryset(self, request, queryset):
+        value = self.value()
+        if value == self.ALL:
+            return queryset
+        if not value.isdigit():
+            return queryset.none()
+        return queryset.filter(run_id=int(value))
+
+
+class SuggestionCodeFilter(admin.SimpleListFilter):
+    """
+    Fixed list of the generators' codes (no SELECT DISTINCT over the table).
+    """
+
+    title = "suggestion code"
+    parameter_name = "suggestion_code"
+
+    def lookups(self, request, model_admin):
+        codes = [
+            SUGGEST_DICT_NAME_VARIANT,
+            SUGGEST_DICT_NAME_TYPO,
+            SUGGEST_TRANSLIT_LATIN,
+            SUGGEST_HOMOGLYPH,
+            SUGGEST_NAME_PATRONYMIC_MISMATCH,
+        ]
+        return [(code, code) for code in codes]
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(suggestion_code=self.value())
+        return queryset
 
 
 @admin.register(Run)
@@ -8,11 +165,82 @@ class RunAdmin(admin.ModelAdmin):
         "id",
         "created_at",
         "source_csv_path",
+        "rows_read",
+        "total_seconds",
+        "peak_memory_mb",
+        "suggestions_link",
     )
     ordering = ("-id",)
     readonly_fields = (
         "created_at",
+        "peak_memory_bytes",
+        "metrics_summary",
     )
+    exclude = (
+        "metrics",
+    )
+    actions = ("apply_retention_policy",)
+
+    def get_deleted_objects(self, objs, request):
+        # The default collector would load (and list) every suggestion of the runs
+        run_ids = [obj.pk for obj in objs]
+        suggestions = Suggestion.objects.filter(run_id__in=run_ids).count()
+        deleted = [f"{capfirst(Run._meta.verbose_name)}: {obj}" for obj in objs]
+        if suggestions:
+            deleted.append(f"{suggestions} {Suggestion._meta.verbose_name_plural}")
+        model_count = {Run._meta.verbose_name_plural: len(run_ids)}
+        perms_needed = set()
+        if suggestions:
+            model_count[Suggestion._meta.verbose_name_plural] = suggestions
+            if not request.user.has_perm("fio_runstore.delete_suggestion"):
+                perms_needed.add(Suggestion._meta.verbose_name)
+        return deleted, model_count, perms_needed, []
+
+    def delete_model(self, request, obj):
+        delete_runs([obj.pk])
+
+    def delete_queryset(self, request, queryset):
+        delete_runs(queryset.values_list("id", flat=True))
+
+    @admin.action(description="Apply retention policy (all runs and uploads)", permissions=["delete"])
+    def apply_retention_policy(self, request, queryset):
+        result = apply_retention()
+        self.message_user(
+            request,
+            f"Deleted {result['runs']} runs, {result['suggestions']} suggestions "
+            f"and {len(result['uploads'])} upload files.",
+            messages.SUCCESS,
+        )
+
+    @admin.display(description="rows read")
+    def rows_read(self, obj):
+        return (obj.metrics or {}).get("rows_read")
+
+    @admin.display(description="total, s")
+    def total_seconds(self, obj):
+        total = (obj.metrics or {}).get("stages", {}).get("total")
+        return total["seconds"] if total else None
+
+    @admin.display(description="peak RSS, MB", ordering="peak_memory_bytes")
+    def peak_memory_mb(self, obj):
+        if obj.peak_memory_bytes is None:
+            return None
+        return round(obj.peak_memory_bytes / (1024 * 1024), 1)
+
+    @admin.display(description="suggestions")
+    def suggestions_link(self, obj):
+        count = (obj.metrics or {}).get("suggestions")
+        url = reverse("admin:fio_runstore_suggestion_changelist") + f"?run={obj.pk}"
+        return format_html('<a href="{}">{}</a>', url, count if count is not None else "open")
+
+    @admin.display(description="metrics")
+    def metrics_summary(self, obj):
+        if not obj.metrics:
+            return "—"
+        return format_html(
+            "<pre>{}</pre>",
+            json.dumps(obj.metrics, ensure_ascii=False, indent=2, sort_keys=True),
+        )
 
 
 @admin.register(Suggestion)
@@ -28,16 +256,110 @@ class SuggestionAdmin(admin.ModelAdmin):
         "suggestion_code",
     )
     list_filter = (
+        RunScopeFilter,
         "confidence",
-        "suggestion_code",
+        SuggestionCodeFilter,
     )
+    list_select_related = ("run",)
+    ordering = ("-id",)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     search_fields = (
         "before_value",
         "suggested_value",
     )
+    search_help_text = "Words of before / suggested value (word prefixes, case-insensitive)"
     readonly_fields = (
         "created_at",
         "generator",
         "generator_version",
         "dictionary_hash",
     )
+    raw_id_fields = ("run",)
+
+    # Query parameters that keep the ids of the list dense (see EstimatedCountPaginator)
+    DENSE_ID_PARAMS = {RunScopeFilter.parameter_name, PAGE_VAR, ORDER_VAR, IS_POPUP_VAR, TO_FIELD_VAR}
+
+    def get_paginator(self, request, queryset, per_page, orphans=0, allow_empty_first_page=True):
+        return self.paginator(
+            queryset,
+            per_page,
+            orphans,
+            allow_empty_first_page,
+            estimate_from_ids=set(request.GET) <= self.DENSE_ID_PARAMS,
+        )
+
+    def get_search_results(self, request, queryset, search_term):
+        # FTS5 index instead of LIKE '%...%' over the whole table (see search.py)
+        if not search_term or not fts_available():
+            return super().get_search_results(request, queryset, search_term)
+        ids = matching_ids(search_term)
+        if ids is None:
+            return queryset, False
+        return queryset.filter(id__in=ids), False
+
+
+@admin.register(ProfileReport)
+class ProfileReportAdmin(admin.ModelAdmin):
+    list_display = (
+        "id",
+        "created_at",
+        "kind",
+        "mode",
+        "target",
+        "duration_seconds",
+        "download_link",
+    )
+    list_filter = (
+        "kind",
+        "mode",
+    )
+    ordering = ("-id",)
+    readonly_fields = (
+        "created_at",
+        "kind",
+        "mode",
+        "target",
+        "duration_seconds",
+        "run",
+        "download_link",
+        "summary_pre",
+    )
+    exclude = (
+        "report_file",
+        "summary",
+    )
+
+    def has_add_permission(self, request):
+        return False
+
+    def get_urls(self):
+        urls = [
+            path(
+                "<int:pk>/download/",
+                self.admin_site.admin_view(self.download_view),
+                name="fio_runstore_profilereport_download",
+            ),
+        ]
+        return urls + super().get_urls()
+
+    def download_view(self, request, pk):
+        obj = self.get_object(request, pk)
+        if obj is None or not self.has_view_permission(request, obj) or not obj.report_file:
+            raise Http404("Profile report not found")
+        try:
+            fh = obj.report_file.open("rb")
+        except FileNotFoundError:
+            raise Http404("Profile report file is missing")
+        return FileResponse(fh, as_attachment=True, filename=os.path.basename(obj.report_file.name))
+
+    @admin.display(description="report")
+    def download_link(self, obj):
+        if not obj.report_file:
+            return "—"
+        url = reverse("admin:fio_runstore_profilereport_download", args=[obj.pk])
+        return format_html('<a href="{}">download</a>', url)
+
+    @admin.display(description="summary")
+    def summary_pre(self, obj):
+        return format_html("<pre>{}</pre>", obj.summary or "")
@@ -1,6 +1,14 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
 
 
 class FioRunstoreConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.fio_runstore"
+
+    def ready(self):
+        from apps.fio_runstore.sqlite import configure_sqlite_connection
+        from apps.fio_runstore.warmup import warm_up_from_settings
+
+        connection_created.connect(configure_sqlite_connection, dispatch_uid="fio_runstore_sqlite_pragmas")
+        warm_up_from_settings()
@@ -0,0 +1,280 @@
+"""
+Batch export (apps/fio_runstore/export.py) from the command line.
+
+Run from the repository root (the names dictionary path is relative to it):
+
+    python src/fio_cli.py 'exports/*.csv' --fio-column ФИО --output-dir out/
+    python src/fio_cli.py a.csv --mode split --last-name-column Фамилия \\
+        --first-name-column Имя --middle-name-column Отчество -o a.fio.csv
+    cat a.csv | python src/fio_cli.py - --fio-column ФИО > a.fio.csv
+
+The same options are served by `manage.py fio_export`. This entry point
+does not import Django: Django is only set up for --store, which also
+saves the file to MEDIA_ROOT/uploads/ and records a Run with its
+suggestions. Several files are exported concurrently by a process pool
+(--workers); workers are forked from a small server process that only
+has the export code loaded, not from the caller, and each loads the
+dictionary once (warmup.warm_up) before its first file.
+"""
+
+from __future__ import annotations
+
+import argparse
+import glob
+import io
+import os
+import sys
+from typing import Iterator, Optional, TextIO
+
+from apps.fio_runstore.export import export_file, export_stream
+from apps.fio_runstore.generator.name_dictionary import DEFAULT_NAMES_CSV_PATH
+from apps.fio_runstore.warmup import warm_up
+
+STDIO = "-"
+DEFAULT_SUFFIX = ".fio.csv"
+WORKER_PRELOAD = ["apps.fio_runstore.export", "apps.fio_runstore.warmup"]
+
+
+class CliError(Exception):
+    pass
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("inputs", nargs="+", help="CSV paths or glob patterns; '-' reads stdin.")
+    parser.add_argument("--mode", choices=("single", "split"), default="single")
+    parser.add_argument("--fio-column", help="Single mode: the FIO column.")
+    parser.add_argument("--last-name-column")
+    parser.add_argument("--first-name-column")
+    parser.add_argument("--middle-name-column")
+    parser.add_argument("-o", "--output", help="Output file of a single input; '-' writes stdout.")
+    parser.add_argument("--output-dir", help="Directory for the outputs (default: next to each input).")
+    parser.add_argument("--suffix", default=DEFAULT_SUFFIX, help="Output name: input name without .csv + suffix.")
+    parser.add_argument("--encoding", help="Input encoding (default: detected).")
+    parser.add_argument("--delimiter", help="Input delimiter (default: detected).")
+    parser.add_argument("--output-encoding", default="utf-8")
+    parser.add_argument("--output-delimiter", help="Default: the input delimiter.")
+    parser.add_argument("--generators", help="Comma-separated generator ids (default: all).")
+    parser.add_argument("--dictionary", default=str(DEFAULT_NAMES_CSV_PATH), help="names.csv to use.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Files exported in parallel.")
+    parser.add_argument("--store", action="store_true", help="Also record a Run with suggestions (sets up Django).")
+
+
+def _selection(options: dict) -> dict:
+    selection = {"mode": options["mode"]}
+    if options["mode"] == "split":
+        for key in ("last_name_column", "first_name_column", "middle_name_column"):
+            if options[key]:
+                selection[key] = options[key]
+        if len(selection) == 1:
+            raise CliError("Split mode needs at least one of --last/first/middle-name-column.")
+    elif options["fio_column"]:
+        selection["fio_column"] = options["fio_column"]
+    else:
+        raise CliError("Single mode needs --fio-column.")
+    return selection
+
+
+def _jobs(options: dict) -> list[tuple[str, str]]:
+    """
+    (input, output) paths; globs expanded, duplicates dropped.
+    """
+    sources: list[str] = []
+    for pattern in options["inputs"]:
+        if pattern == STDIO:
+            raise CliError("'-' cannot be combined with other inputs.")
+        matches = sorted(glob.glob(pattern, recursive=True))
+        if not matches:
+            raise CliError(f"No files match {pattern}")
+        sources.extend(m for m in matches if os.path.isfile(m) and m not in sources)
+
+    if options["output"]:
+        if len(sources) != 1:
+            raise CliError("--output needs exactly one input file; use --output-dir.")
+        return [(sources[0], options["output"])]
+
+    if options["output_dir"]:
+        os.makedirs(options["output_dir"], exist_ok=True)
+    jobs = []
+    for source in sources:
+        stem = os.path.basename(source)
+        if stem.lower().endswith(".csv"):
+            stem = stem[:-4]
+        output = os.path.join(options["output_dir"] or os.path.dirname(source), stem + options["suffix"])
+        if os.path.abspath(output) == os.path.abspath(source):
+            raise CliError(f"Output would overwrite the input: {source}")
+        jobs.append((source, output))
+    return jobs
+
+
+def _pool_context():
+    """
+    forkserver where available: workers fork from a server that has only
+    WORKER_PRELOAD imported (not Django, not the caller's state).
+    """
+    import multiprocessing
+
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("forkserver")
+        context.set_forkserver_preload(WORKER_PRELOAD)
+        return context
+    return multiprocessing.get_context("spawn")
+
+
+def _warm_up_worker(dictionary_path: str) -> None:
+    """
+    Pool initializer. A bad dictionary must not break the pool: each file
+    then reports the error itself.
+    """
+    try:
+        warm_up(dictionary_path)
+    except (OSError, ValueError):
+        pass
+
+
+def _run(jobs: list[tuple[str, str]], selection: dict, workers: int, kwargs: dict) -> Iterator[dict]:
+    """
+    Yields results as files finish; a failed file yields {"source", "error"}.
+    """
+    workers = max(1, min(workers, len(jobs)))
+    if workers == 1:
+        for source, output in jobs:
+            try:
+                yield export_file(source, output, selection, **kwargs)
+            except (OSError, ValueError) as e:
+                yield {"source": source, "error": str(e)}
+        return
+
+    # Only pools pay for the import
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=_pool_context(),
+        initializer=_warm_up_worker,
+        initargs=(kwargs["dictionary_path"],),
+    ) as pool:
+        futures = {pool.submit(export_file, source, output, selection, **kwargs): source for source, output in jobs}
+        for future in as_completed(futures):
+            try:
+                yield future.result()
+            except (OSError, ValueError) as e:
+                yield {"source": futures[future], "error": str(e)}
+
+
+def _setup_django() -> None:
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+    import django
+
+    django.setup()
+
+
+def _store_run(source: str, selection: dict, result: dict) -> int:
+    """
+    Copy the file to storage and record a Run for it; returns the run id.
+    """
+    from django.core.files import File
+    from django.core.files.storage import default_storage
+
+    from apps.fio_runstore.generator.run_generator import generate_suggestions_for_csv
+
+    with open(source, "rb") as f:
+        storage_path = default_storage.save(f"uploads/{os.path.basename(source)}", File(f))
+    run = generate_suggestions_for_csv(
+        source_csv_path=storage_path,
+        selection=selection,
+        encoding=result["encoding"],
+        delimiter=result["delimiter"],
+    )
+    return run.id
+
+
+def _summary(result: dict) -> str:
+    return (
+        f"{result['rows']} rows (ok {result['ok']}, fixed {result['fixed']}, "
+        f"needs_review {result['needs_review']})"
+    )
+
+
+def _export_stream(raw, selection: dict, options: dict, export_options: dict, stderr: TextIO) -> Optional[dict]:
+    """
+    Export stdin, or a single file to stdout (pipelines).
+    None when the reader of stdout went away.
+    """
+    output = options["output"] or STDIO
+    if output == STDIO:
+        dst = io.TextIOWrapper(sys.stdout.buffer, encoding=options["output_encoding"], newline="")
+    else:
+        dst = open(output, "w", encoding=options["output_encoding"], newline="")
+    try:
+        result = export_stream(raw, dst, selection, **export_options)
+        dst.flush()
+    except ValueError as e:
+        raise CliError(str(e))
+    except BrokenPipeError:
+        # The reader of stdout (head, ...) is gone; drop the rest quietly
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return None
+    finally:
+        if output == STDIO:
+            dst.detach()
+        else:
+            dst.close()
+    # stdout may be the export itself
+    stderr.write(_summary(result) + "\n")
+    return result
+
+
+def export(options: dict, stdout: TextIO, stderr: TextIO, *, django_ready: bool = False) -> None:
+    """
+    Run an export with parsed options (add_arguments). Raises CliError.
+    """
+    selection = _selection(options)
+    export_options = {
+        "encoding": options["encoding"],
+        "delimiter": options["delimiter"],
+        "out_delimiter": options["output_delimiter"],
+        "generator_ids": options["generators"].split(",") if options["generators"] else None,
+        "dictionary_path": options["dictionary"],
+    }
+    if options["inputs"] == [STDIO]:
+        if options["store"]:
+            raise CliError("--store needs input files.")
+        _export_stream(sys.stdin.buffer, selection, options, export_options, stderr)
+        return
+
+    jobs = _jobs(options)
+    if options["store"] and not django_ready:
+        _setup_django()
+
+    if options["output"] == STDIO:
+        with open(jobs[0][0], "rb") as raw:
+            result = _export_stream(raw, selection, options, export_options, stderr)
+        if result is not None and options["store"]:
+            stderr.write(f"run {_store_run(jobs[0][0], selection, result)}\n")
+        return
+
+    failed = 0
+    kwargs = {"out_encoding": options["output_encoding"], **export_options}
+    for result in _run(jobs, selection, options["workers"], kwargs):
+        if "error" in result:
+            failed += 1
+            stderr.write(f"{result['source']}: {result['error']}\n")
+            continue
+        line = f"{result['source']} -> {result['output']}: {_summary(result)} in {result['seconds']} s"
+        if options["store"]:
+            line += f", run {_store_run(result['source'], selection, result)}"
+        stdout.write(line + "\n")
+    if failed:
+        raise CliError(f"{failed} of {len(jobs)} files failed.")
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_arguments(parser)
+    options = vars(parser.parse_args(argv))
+    try:
+        export(options, sys.stdout, sys.stderr)
+    except CliError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    return 0
@@ -0,0 +1,235 @@
+"""
+Single writer for suggestion batches.
+
+SQLite allows one writer at a time: concurrent runs that each commit their
+own batches wait on the database lock ("database is locked", retry stalls).
+Instead, runs hand their batches to one writer thread per process, which
+drains the queue and commits whatever is queued, from all runs, in one
+transaction (up to MAX_ROWS_PER_COMMIT rows). Runs only wait when the
+queue is full (MAX_QUEUED_BATCHES) and once at the end, for their own
+batches (WriteTicket.wait), so they spend their time analyzing.
+
+If a combined commit fails, the batches are retried per run, and only the
+runs whose batches fail get the error (raised from WriteTicket.wait). If
+the writer thread itself dies, every queued batch fails with its error, so
+no run waits forever, and get_writer() starts a new writer.
+
+Runs started inside a transaction (atomic block) write in their own thread:
+the writer's connection cannot see their uncommitted Run row.
+
+Between processes (several web workers) SQLite's own locking still
+applies; WAL and busy_timeout (apps.fio_runstore.sqlite) keep those waits
+short.
+
+Settings (settings.FIO_DB_WRITER, see DEFAULTS):
+    ENABLED             False writes batches in the run's thread
+    MAX_QUEUED_BATCHES  queue bound (back-pressure on the runs)
+    MAX_ROWS_PER_COMMIT rows per transaction
+"""
+
+from __future__ import annotations
+
+import atexit
+import os
+import queue
+import threading
+from typing import Optional
+
+from django.db import close_old_connections, connections, transaction
+
+from apps.fio_runstore import prometheus
+from apps.fio_runstore.models import Suggestion
+
+
+DEFAULTS = {
+    "ENABLED": True,
+    "MAX_QUEUED_BATCHES": 64,
+    "MAX_ROWS_PER_COMMIT": 20_000,
+}
+
+QUEUE_LABEL = "db_writer"
+_STOP = object()
+_PUT_TIMEOUT = 0.1  # seconds between checks of a dead writer while the queue is full
+
+
+def writer_settings() -> dict:
+    from django.conf import settings
+
+    return {**DEFAULTS, **getattr(settings, "FIO_DB_WRITER", {})}
+
+
+class WriteTicket:
+    """
+    Batches of one run: how many are still queued, and the first error.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._pending = 0
+        self.written = 0
+        self.error: Optional[BaseException] = None
+
+    def _add(self) -> None:
+        with self._cond:
+            self._pending += 1
+
+    def _done(self, rows: int, error: Optional[BaseException] = None) -> None:
+        with self._cond:
+            self._pending -= 1
+            if error is None:
+                self.written += rows
+            elif self.error is None:
+                self.error = error
+            self._cond.notify_all()
+
+    def wait(self) -> None:
+        """
+        Block until every submitted batch is committed; re-raise a write error.
+        """
+        with self._cond:
+            self._cond.wait_for(lambda: self._pending == 0)
+        if self.error is not None:
+            raise self.error
+
+
+class SuggestionWriter:
+    def __init__(self, max_queued_batches: int, max_rows_per_commit: int):
+        self.max_rows_per_commit = max_rows_per_commit
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queued_batches)
+        self.error: Optional[BaseException] = None  # set when the thread dies
+        self._inflight: dict[int, tuple[WriteTicket, list[Suggestion]]] = {}  # batches being written
+        self._thread = threading.Thread(target=self._loop, name="fio-suggestion-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, ticket: WriteTicket, batch: list[Suggestion]) -> None:
+        """
+        Queue a batch (the caller must not modify it afterwards). Blocks
+        while the queue is full.
+        """
+        ticket._add()
+        while self.error is None:
+            try:
+                self._queue.put((ticket, batch), timeout=_PUT_TIMEOUT)
+                break
+            except queue.Full:
+                continue
+        else:
+            ticket._done(0, self.error)
+            return
+        if self.error is not None:
+            self._fail_queued()  # queued after the thread drained the queue
+        prometheus.set_gauge("fio_queue_depth", self._queue.qsize(), queue=QUEUE_LABEL)
+
+    @property
+    def alive(self) -> bool:
+        return self._thread.is_alive()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """
+        Write what is queued and end the thread.
+        """
+        if self._thread.is_alive():
+            self._queue.put((None, _STOP))
+            self._thread.join(timeout)
+
+    def _loop(self) -> None:
+        try:
+            while True:
+                items = [self._queue.get()]
+                rows = len(items[0][1]) if items[0][1] is not _STOP else 0
+                while rows < self.max_rows_per_commit:
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    items.append(item)
+                    if item[1] is not _STOP:
+                        rows += len(item[1])
+                prometheus.set_gauge("fio_queue_depth", self._queue.qsize(), queue=QUEUE_LABEL)
+
+                stop = any(batch is _STOP for _, batch in items)
+                batches = [(t, b) for t, b in items if b is not _STOP]
+                self._inflight = {id(b): (t, b) for t, b in batches}
+                self._write(batches)
+                if stop:
+                    return
+        except BaseException as e:
+            self.error = e
+            for ticket, batch in list(self._inflight.values()):
+                self._complete(ticket, batch, e)
+            self._fail_queued()
+            raise
+        finally:
+            connections.close_all()
+
+    def _complete(self, ticket: WriteTicket, batch: list[Suggestion], error: Optional[BaseException] = None) -> None:
+        self._inflight.pop(id(batch), None)
+        ticket._done(len(batch), error)
+
+    def _fail_queued(self) -> None:
+        """
+        Fail every queued batch with the error that ended the thread.
+        """
+        while True:
+            try:
+                ticket, batch = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if batch is not _STOP:
+                ticket._done(len(batch), self.error)
+
+    def _write(self, items: list[tuple[WriteTicket, list[Suggestion]]]) -> None:
+        if not items:
+            return
+        try:
+            close_old_connections()
+            with transaction.atomic():
+                for _, batch in items:
+                    Suggestion.objects.bulk_create(batch, batch_size=len(batch))
+        except Exception:
+            self._write_per_run(items)
+            return
+        for ticket, batch in items:
+            self._complete(ticket, batch)
+
+    def _write_per_run(self, items: list[tuple[WriteTicket, list[Suggestion]]]) -> None:
+        by_ticket: dict[int, tuple[WriteTicket, list[list[Suggestion]]]] = {}
+        for ticket, batch in items:
+            by_ticket.setdefault(id(ticket), (ticket, []))[1].append(batch)
+        for ticket, batches in by_ticket.values():
+            error = None
+            try:
+                with transaction.atomic():
+                    for batch in batches:
+                        Suggestion.objects.bulk_create(batch, batch_size=len(batch))
+            except Exception as e:
+                error = e
+            for batch in batches:
+                self._complete(ticket, batch, error)
+
+
+_writer: Optional[SuggestionWriter] = None
+_writer_pid: Optional[int] = None
+_writer_lock = threading.Lock()
+
+
+def get_writer() -> Optional[SuggestionWriter]:
+    """
+    The process-wide writer (started on first use), or None when disabled.
+    """
+    global _writer, _writer_pid
+    conf = writer_settings()
+    if not conf["ENABLED"]:
+        return None
+    with _writer_lock:
+        # A forked worker does not inherit the parent's thread; a dead thread has failed its batches
+        if _writer is None or _writer_pid != os.getpid() or not _writer.alive:
+            _writer = SuggestionWriter(conf["MAX_QUEUED_BATCHES"], conf["MAX_ROWS_PER_COMMIT"])
+            _writer_pid = os.getpid()
+        return _writer
+
+
+@atexit.register
+def _stop_writer() -> None:
+    if _writer is not None and _writer_pid == os.getpid():
+        _writer.stop(timeout=30)
@@ -0,0 +1,321 @@
+"""
+Export v0 (docs/export_format_v0.md): the source CSV with fio_raw,
+fio_norm, fio_suggest, fio_status, fio_flags and fio_comment appended to
+every row.
+
+- fio_raw / fio_norm: the selected value (split mode: the parts joined in
+  Ф И О order) as is and after safe normalization;
+- fio_suggest: fio_norm with the best suggestion of the registered
+  generators applied (high before medium confidence); empty without one;
+- fio_status: needs_review with a flag or a suggestion, else fixed / ok;
+- fio_flags: flag codes (format and name/patronymic flags);
+  fio_comment: their labels and the suggestion messages.
+
+Used by apps/fio_runstore/cli.py (src/fio_cli.py, `manage.py fio_export`).
+This module does not import Django, so pool workers only load the domain
+code and the names dictionary.
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import os
+import time
+from pathlib import Path
+from typing import BinaryIO, Iterable, Optional, TextIO
+
+from apps.fio_runstore.generator.name_dictionary import DEFAULT_NAMES_CSV_PATH, NameDictionary, get_name_dictionary
+from apps.fio_runstore.generator.registry import (
+    FIELD_FIO,
+    FIELD_FIO_FIRST_NAME,
+    FIELD_FIRST_NAME,
+    FIELD_MIDDLE_NAME,
+    ValueInfo,
+    build_generators,
+    extract_first_name_from_fio,
+    selected_fields,
+)
+from domain.fio.consistency import NamePatronymicChecker
+from domain.fio.constants import (
+    CONFIDENCE_HIGH,
+    FLAG_LABELS_RU,
+    TECH_STATUS_FIXED,
+    TECH_STATUS_NEEDS_REVIEW,
+    TECH_STATUS_OK,
+)
+from domain.fio.normalize_value import normalize_fio_value
+from uploads.csv_dialect import detect_format
+
+
+EXPORT_COLUMNS = ("fio_raw", "fio_norm", "fio_suggest", "fio_status", "fio_flags", "fio_comment")
+
+# Upper bound for the memo of distinct values; cleared when reached.
+MEMO_MAX_ENTRIES = 100_000
+
+
+class _Entry:
+    """
+    A distinct value: normalization, flags and the best suggestion per field.
+    """
+
+    __slots__ = ("info", "result", "best")
+
+    def __init__(self, value: str):
+        self.info = ValueInfo(value)
+        self.result = normalize_fio_value(value)
+        self.best: dict[str, Optional[dict]] = {}
+
+
+class FioExporter:
+    """
+    Computes the export columns of a row; one instance per file.
+    """
+
+    def __init__(
+        self,
+        selection: dict,
+        header: list[str],
+        name_dictionary: NameDictionary,
+        *,
+        generator_ids: Optional[Iterable[str]] = None,
+    ):
+        fields = selected_fields(selection)
+        if not fields:
+            raise ValueError("No FIO columns selected")
+        columns = [c.strip() for c in header]
+        missing = [col for _, col in fields if col not in columns]
+        if missing:
+            raise ValueError(f"Columns not found: {missing}")
+
+        self.split = selection.get("mode") == "split"
+        self._fields = [(field_name, columns.index(col)) for field_name, col in fields]
+        field_names = {field_name for field_name, _ in fields}
+        if not self.split:
+            field_names.add(FIELD_FIO_FIRST_NAME)
+        generators = build_generators(name_dictionary, generator_ids=generator_ids)
+        self._consumers = {f: [g for g in generators if f in g.fields] for f in field_names}
+        self._check_split = self.split and {FIELD_FIRST_NAME, FIELD_MIDDLE_NAME} <= field_names
+        self._checker = NamePatronymicChecker(name_dictionary.name_gender)
+        self._memo: dict[str, _Entry] = {}
+        self._rows: dict[tuple[str, ...], tuple[str, ...]] = {}
+        self.counts = {TECH_STATUS_OK: 0, TECH_STATUS_FIXED: 0, TECH_STATUS_NEEDS_REVIEW: 0}
+
+    def _entry(self, value: str) -> _Entry:
+        entry = self._memo.get(value)
+        if entry is None:
+            if len(self._memo) >= MEMO_MAX_ENTRIES:
+                self._memo.clear()
+            entry = self._memo[value] = _Entry(value)
+        return entry
+
+    def _suggestion(self, field_name: str, entry: _Entry) -> Optional[dict]:
+        if field_name not in entry.best:
+            payloads = [p for g in self._consumers[field_name] if g.accepts(entry.info) for p in g.suggest(entry.info)]
+            # Generators run in registry order; the first high-confidence payload wins
+            payloads.sort(key=lambda p: p["confidence"] != CONFIDENCE_HIGH)
+            entry.best[field_name] = payloads[0] if payloads else None
+        return entry.best[field_name]
+
+    def _first_name_suggestion(self, value: str, normalized: str) -> Optional[dict]:
+        """
+        Single FIO field: a suggestion for the first name, applied to the
+        second word of the normalized value.
+        """
+        first = extract_first_name_from_fio(value)
+        tokens = normalized.split()
+        if not first or len(tokens) < 2:
+            return None
+        payload = self._suggestion(FIELD_FIO_FIRST_NAME, self._entry(first))
+        if payload is None:
+            return None
+        tokens[1] = payload["suggested_value"]
+        return {**payload, "suggested_value": " ".join(tokens)}
+
+    def export_row(self, cells: list[str]) -> tuple[str, ...]:
+        """
+        The EXPORT_COLUMNS values of a row; repeated value combinations are
+        answered from a memo.
+        """
+        width = len(cells)
+        key = tuple(cells[idx] if idx < width else "" for _, idx in self._fields)
+        columns = self._rows.get(key)
+        if columns is None:
+            if len(self._rows) >= MEMO_MAX_ENTRIES:
+                self._rows.clear()
+            columns = self._rows[key] = self._export_values(key)
+        self.counts[columns[3]] += 1
+        return columns
+
+    def _export_values(self, raw_values: tuple[str, ...]) -> tuple[str, ...]:
+        raws, norms, suggested, flags, messages = [], [], [], [], []
+        fixed = False
+        after: dict[str, str] = {}
+        for (field_name, _), raw in zip(self._fields, raw_values):
+            value = raw.strip()
+            if not value:
+                continue
+            entry = self._entry(value)
+            raws.append(raw)
+            norms.append(entry.result.after)
+            after[field_name] = entry.result.after
+            fixed = fixed or entry.result.status == TECH_STATUS_FIXED
+            flags.extend(f for f in entry.info.flags if f not in flags)
+
+            payload = self._suggestion(field_name, entry)
+            if payload is None and field_name == FIELD_FIO:
+                payload = self._first_name_suggestion(value, entry.result.after)
+            suggested.append(payload["suggested_value"] if payload else entry.result.after)
+            if payload is not None:
+                messages.append(payload["message"])
+
+        if self._check_split:
+            row_flags = self._checker.check(after.get(FIELD_FIRST_NAME), after.get(FIELD_MIDDLE_NAME))
+        elif not self.split:
+            row_flags = self._checker.check_fio(after.get(FIELD_FIO))
+        else:
+            row_flags = []
+        flags.extend(row_flags)
+
+        if flags or messages:
+            status = TECH_STATUS_NEEDS_REVIEW
+        else:
+            status = TECH_STATUS_FIXED if fixed else TECH_STATUS_OK
+
+        comment = ", ".join(FLAG_LABELS_RU[f] for f in flags)
+        return (
+            " ".join(raws),
+            " ".join(norms),
+            " ".join(suggested) if messages else "",
+            status,
+            ", ".join(flags),
+            "; ".join(c for c in [comment, *messages] if c),
+        )
+
+
+def export_csv(
+    src: TextIO,
+    dst: TextIO,
+    selection: dict,
+    name_dictionary: NameDictionary,
+    *,
+    delimiter: str = ",",
+    out_delimiter: Optional[str] = None,
+    generator_ids: Optional[Iterable[str]] = None,
+) -> dict:
+    """
+    Write the export of the CSV text `src` to `dst`.
+    Returns {"rows": n, "ok": n, "fixed": n, "needs_review": n}.
+    """
+    reader = csv.reader(src, delimiter=delimiter)
+    header = next(reader, None)
+    if header is None:
+        raise ValueError("Empty file")
+    exporter = FioExporter(selection, header, name_dictionary, generator_ids=generator_ids)
+    writer = csv.writer(dst, delimiter=out_delimiter or delimiter, lineterminator="\n")
+    writer.writerow([*header, *EXPORT_COLUMNS])
+
+    width = len(header)
+    rows = 0
+    for cells in reader:
+        if not cells:
+            continue
+        rows += 1
+        padding = [""] * (width - len(cells))
+        writer.writerow([*cells, *padding, *exporter.export_row(cells)])
+    return {"rows": rows, **exporter.counts}
+
+
+class _Rewound(io.RawIOBase):
+    """
+    A (possibly unseekable) binary stream with its sniffed start put back.
+    """
+
+    def __init__(self, raw: BinaryIO):
+        self._raw = raw
+        self._head = b""
+
+    def head(self, size: int) -> bytes:
+        while len(self._head) < size:
+            chunk = self._raw.read(size - len(self._head))
+            if not chunk:
+                break
+            self._head += chunk
+        return self._head[:size]
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        if self._head:
+            n = min(len(b), len(self._head))
+            b[:n] = self._head[:n]
+            self._head = self._head[n:]
+            return n
+        data = self._raw.read(len(b))
+        b[: len(data)] = data
+        return len(data)
+
+
+def export_stream(
+    raw: BinaryIO,
+    dst: TextIO,
+    selection: dict,
+    *,
+    encoding: Optional[str] = None,
+    delimiter: Optional[str] = None,
+    out_delimiter: Optional[str] = None,
+    generator_ids: Optional[Iterable[str]] = None,
+    dictionary_path: str | Path = DEFAULT_NAMES_CSV_PATH,
+) -> dict:
+    """
+    export_csv() over a binary stream (a file or stdin); encoding and
+    delimiter are detected unless given. Also returns both in the result.
+    """
+    stream = _Rewound(raw)
+    if encoding is None or delimiter is None:
+        detected_encoding, detected_delimiter, _ = detect_format(stream.head)
+        encoding = encoding or detected_encoding
+        delimiter = delimiter or detected_delimiter
+
+    text = io.TextIOWrapper(io.BufferedReader(stream), encoding=encoding, newline="")
+    result = export_csv(
+        text,
+        dst,
+        selection,
+        get_name_dictionary(csv_path=Path(dictionary_path)),
+        delimiter=delimiter,
+        out_delimiter=out_delimiter,
+        generator_ids=generator_ids,
+    )
+    return {**result, "encoding": encoding, "delimiter": delimiter}
+
+
+def export_file(
+    src_path: str,
+    dst_path: str,
+    selection: dict,
+    *,
+    out_encoding: str = "utf-8",
+    **options,
+) -> dict:
+    """
+    Export one file (a pool task). The output appears under dst_path only
+    when complete. Returns the export_stream() result with source, output
+    and seconds.
+    """
+    started = time.perf_counter()
+    part_path = f"{dst_path}.part"
+    try:
+        with open(src_path, "rb") as raw, open(part_path, "w", encoding=out_encoding, newline="") as dst:
+            result = export_stream(raw, dst, selection, **options)
+        os.replace(part_path, dst_path)
+    finally:
+        if os.path.exists(part_path):
+            os.remove(part_path)
+    return {
+        **result,
+        "source": src_path,
+        "output": dst_path,
+        "seconds": round(time.perf_counter() - started, 3),
+    }
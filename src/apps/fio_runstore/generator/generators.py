@@ -0,0 +1,210 @@
+"""
+Built-in suggestion generators (Step 3.5).
+
+Each generator only proposes a value; nothing is applied automatically.
+"""
+
+from __future__ import annotations
+
+from apps.fio_runstore import prometheus
+from apps.fio_runstore.generator.registry import (
+    FIRST_NAME_FIELDS,
+    VALUE_FIELDS,
+    SuggestionGenerator,
+    ValueInfo,
+    register_generator,
+)
+from domain.fio.constants import (
+    CONFIDENCE_HIGH,
+    CONFIDENCE_MEDIUM,
+    FLAG_HAS_DIGITS,
+    FLAG_LATIN_ONLY,
+    FLAG_MIXED_ALPHABET,
+)
+from domain.fio.homoglyphs import fix_homoglyphs
+from domain.fio.normalize_value import normalize_fio_value
+from domain.fio.transliteration import transliterate_latin_parts
+
+
+GENERATOR_ID = "apps.fio_runstore.generator"
+
+SUGGEST_DICT_NAME_VARIANT = "DICT_NAME_VARIANT"
+SUGGEST_TRANSLIT_LATIN = "TRANSLIT_LATIN"
+SUGGEST_HOMOGLYPH = "HOMOGLYPH_SUBSTITUTION"
+SUGGEST_DICT_NAME_TYPO = "DICT_NAME_TYPO"
+# Row-level check written by run_generator: the value is kept, the row is flagged for review
+SUGGEST_NAME_PATRONYMIC_MISMATCH = "NAME_PATRONYMIC_MISMATCH"
+
+# Typo lookup: shorter names only tolerate one edit, and nothing below 3 letters.
+TYPO_MIN_LENGTH = 3
+TYPO_SHORT_NAME_LENGTH = 5
+
+prometheus.register_cache("transliteration", transliterate_latin_parts.cache_info)
+
+
+@register_generator
+class DictionaryVariantGenerator(SuggestionGenerator):
+    """
+    Name variant listed in names.csv -> canonical form.
+    """
+
+    generator_id = f"{GENERATOR_ID}.dictionary"
+    version = "0.2"
+    fields = FIRST_NAME_FIELDS
+    uses_dictionary = True
+
+    def suggest(self, info: ValueInfo) -> list[dict]:
+        before = info.value
+        canonical = self.name_dictionary.variant_map.get(before)
+        if not canonical or canonical == before:
+            return []
+        return [
+            {
+                "suggested_value": canonical,
+                "suggestion_code": SUGGEST_DICT_NAME_VARIANT,
+                "confidence": CONFIDENCE_HIGH,
+                "message": f"В словаре имён вариант «{before}» сопоставлен с канонической формой «{canonical}».",
+                "evidence": {
+                    "variant": before,
+                    "canonical": canonical,
+                    "dictionary": self.name_dictionary.meta.path,
+                },
+            }
+        ]
+
+
+@register_generator
+class NameTypoGenerator(SuggestionGenerator):
+    """
+    Unique nearest canonical name for a first name unknown to the dictionary
+    (distance 1 -> high, 2 -> medium).
+    """
+
+    generator_id = f"{GENERATOR_ID}.typos"
+    version = "1.0"
+    fields = FIRST_NAME_FIELDS
+    uses_dictionary = True
+
+    def __init__(self, name_dictionary):
+        super().__init__(name_dictionary)
+        self.index = name_dictionary.typo_index
+
+    def suggest(self, info: ValueInfo) -> list[dict]:
+        if info.value in self.name_dictionary.variant_map:
+            return []  # handled by the dictionary generator
+
+        normalized = info.normalized
+        if len(normalized) < TYPO_MIN_LENGTH or normalized in self.index:
+            return []
+
+        max_distance = 1 if len(normalized) <= TYPO_SHORT_NAME_LENGTH else 2
+        matches = self.index.lookup(normalized, max_distance=max_distance)
+        if len(matches) != 1:
+            # No candidate or ambiguous: no suggestion below medium confidence.
+            return []
+
+        canonical, distance = matches[0]
+        return [
+            {
+                "suggested_value": canonical,
+                "suggestion_code": SUGGEST_DICT_NAME_TYPO,
+                "confidence": CONFIDENCE_HIGH if distance == 1 else CONFIDENCE_MEDIUM,
+                "message": f"Возможная опечатка в имени «{info.value}»: ближайшее имя в словаре — «{canonical}».",
+                "evidence": {
+                    "canonical": canonical,
+                    "distance": distance,
+                    "metric": "osa",
+                },
+            }
+        ]
+
+
+@register_generator
+class TransliterationGenerator(SuggestionGenerator):
+    """
+    latin_only values -> Cyrillic, only when the whole value parses.
+
+    A word with several readings takes the one known to the names
+    dictionary; if none or several are known and the readings are equally
+    plausible, the suggestion is only medium confidence.
+    """
+
+    generator_id = f"{GENERATOR_ID}.transliteration"
+    version = "1.2"
+    fields = VALUE_FIELDS
+    flags = frozenset({FLAG_LATIN_ONLY})
+    uses_dictionary = True
+
+    def suggest(self, info: ValueInfo) -> list[dict]:
+        parts = transliterate_latin_parts(info.normalized)
+        if not parts:
+            return []
+
+        names = self.name_dictionary.typo_index
+        words = []
+        unresolved = []
+        for part in parts:
+            known = [r for r in part.readings if r in names] if len(part.readings) > 1 else []
+            if len(known) == 1:
+                words.append(known[0])
+                continue
+            words.append(part.readings[0])
+            if part.ambiguous:
+                unresolved.append(list(part.readings))
+        suggested = "".join(words)
+
+        evidence = {
+            "source": info.value,
+            "transliterated": suggested,
+            "scheme": "latin_to_cyrillic_v1",
+        }
+        if unresolved:
+            evidence["alternatives"] = unresolved
+        return [
+            {
+                "suggested_value": suggested,
+                "suggestion_code": SUGGEST_TRANSLIT_LATIN,
+                "confidence": CONFIDENCE_MEDIUM if unresolved else CONFIDENCE_HIGH,
+                "message": f"Значение «{info.value}» записано латиницей; транслитерация: «{suggested}».",
+                "evidence": evidence,
+            }
+        ]
+
+
+@register_generator
+class HomoglyphGenerator(SuggestionGenerator):
+    """
+    Lookalike characters of the other alphabet / digits typed instead of letters.
+    """
+
+    generator_id = f"{GENERATOR_ID}.homoglyphs"
+    version = "1.0"
+    fields = VALUE_FIELDS
+    flags = frozenset({FLAG_MIXED_ALPHABET, FLAG_HAS_DIGITS})
+
+    def suggest(self, info: ValueInfo) -> list[dict]:
+        value = info.value
+        fix = fix_homoglyphs(value)
+        if fix is None:
+            return []
+        suggested = normalize_fio_value(fix.after).after
+        if suggested == value:
+            return []
+        return [
+            {
+                "suggested_value": suggested,
+                "suggestion_code": SUGGEST_HOMOGLYPH,
+                "confidence": CONFIDENCE_MEDIUM,
+                "message": (
+                    f"В значении «{value}» есть похожие символы другого алфавита или цифры; "
+                    f"возможно, имелось в виду «{suggested}»."
+                ),
+                "evidence": {
+                    "target_script": fix.target_script,
+                    "replaced": [
+                        {"pos": pos, "from": a, "to": b}
+                        for pos, a, b in fix.replacements
+                    ],
+                },
+            }
+        ]
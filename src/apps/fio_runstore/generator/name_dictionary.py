@@ -1,8 +1,17 @@
 import csv
 import hashlib
+import logging
+import os
+import threading
+import time
 from dataclasses import dataclass
+from functools import cached_property
 from pathlib import Path
-from typing import Dict, Tuple
+from typing import Dict, NamedTuple, Optional, Tuple
+
+from apps.fio_runstore import prometheus
+from domain.fio.consistency import build_name_gender_table
+from domain.fio.typo_index import SymSpellIndex
 
 
 DEFAULT_NAMES_CSV_PATH = Path("src/data/dictionaries/names.csv")
@@ -16,6 +25,25 @@ class NameDictMeta:
     enabled_rows: int
 
 
+@dataclass(frozen=True)
+class NameDictionary:
+    """
+    Everything derived from names.csv that suggestion generators need.
+    """
+
+    variant_map: Dict[str, str]
+    canonical_names: list[str]
+    name_gender: Dict[str, str]
+    meta: NameDictMeta
+
+    @cached_property
+    def typo_index(self) -> SymSpellIndex:
+        """
+        Typo lookup over the canonical names, built once per dictionary.
+        """
+        return SymSpellIndex(self.canonical_names)
+
+
 def _sha256_of_file(path: Path) -> str:
     h = hashlib.sha256()
     with path.open("rb") as f:
@@ -75,3 +103,272 @@ def load_names_variant_map(
         enabled_rows=enabled_rows,
     )
     return variant_to_canonical, meta
+
+
+def load_canonical_names(
+    *,
+    csv_path: Path = DEFAULT_NAMES_CSV_PATH,
+) -> list[str]:
+    """
+    Load the sorted list of distinct canonical names.
+
+    Every row contributes its canonical form, including rows without a variant
+    and disabled rows (enabled=0 disables the variant mapping, not the name).
+    """
+    if not csv_path.exists():
+        raise FileNotFoundError(f"Names dictionary not found: {csv_path}")
+
+    canonicals = set()
+    with csv_path.open("r", encoding="utf-8", newline="") as f:
+        for row in csv.DictReader(f):
+            canonical = (row.get("canonical") or "").strip()
+            if canonical:
+                canonicals.add(canonical)
+    return sorted(canonicals)
+
+
+def load_name_gender_table(
+    *,
+    csv_path: Path = DEFAULT_NAMES_CSV_PATH,
+) -> Dict[str, str]:
+    """
+    Load name -> gender lookup (lowercase keys) for the name/patronymic check.
+
+    Canonical names and their enabled variants are included; variants shared
+    by canonical forms of different genders are dropped as ambiguous.
+    """
+    if not csv_path.exists():
+        raise FileNotFoundError(f"Names dictionary not found: {csv_path}")
+
+    pairs = []
+    with csv_path.open("r", encoding="utf-8", newline="") as f:
+        for row in csv.DictReader(f):
+            canonical = (row.get("canonical") or "").strip()
+            variant = (row.get("variant") or "").strip()
+            enabled = (row.get("enabled") or "").strip()
+            if not canonical:
+                continue
+            pairs.append((canonical, canonical))
+            if variant and enabled == "1":
+                pairs.append((variant, canonical))
+    return build_name_gender_table(pairs)
+
+
+def load_name_dictionary(
+    *,
+    csv_path: Path = DEFAULT_NAMES_CSV_PATH,
+) -> NameDictionary:
+    """
+    Load the names dictionary with all lookup tables used by the generators.
+    """
+    variant_map, meta = load_names_variant_map(csv_path=csv_path)
+    return NameDictionary(
+        variant_map=variant_map,
+        canonical_names=load_canonical_names(csv_path=csv_path),
+        name_gender=load_name_gender_table(csv_path=csv_path),
+        meta=meta,
+    )
+
+
+# --- versioning and the process-wide cache ----------------------------------
+#
+# The stamp file <names.csv>.version holds a counter that
+# publish_name_dictionary() / bump_dictionary_version() increase after
+# each edit. Every process checks the stat() of names.csv and of its stamp
+# at most every RELOAD_CHECK_SECONDS; on a change the dictionary and its
+# indexes are rebuilt in a background thread and swapped in as one object,
+# while callers keep getting the previous one. A run or export takes the
+# dictionary once, so it keeps the dictionary_hash it started with.
+
+RELOAD_CHECK_SECONDS = 1.0
+VERSION_SUFFIX = ".version"
+
+logger = logging.getLogger(__name__)
+
+
+class DictionaryCacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    currsize: int
+
+
+class _Cached:
+    __slots__ = ("signature", "dictionary", "checked_at", "reloading_pid")
+
+    def __init__(self, signature: tuple, dictionary: NameDictionary):
+        self.signature = signature
+        self.dictionary = dictionary
+        self.checked_at = time.monotonic()
+        self.reloading_pid: Optional[int] = None
+
+
+_cache_lock = threading.Lock()
+_cache: Dict[Path, _Cached] = {}
+_cache_hits = 0
+_cache_misses = 0
+
+
+def version_path(csv_path: Path = DEFAULT_NAMES_CSV_PATH) -> Path:
+    return csv_path.with_name(csv_path.name + VERSION_SUFFIX)
+
+
+def dictionary_version(*, csv_path: Path = DEFAULT_NAMES_CSV_PATH) -> int:
+    """
+    Current stamp; 0 before the first bump.
+    """
+    try:
+        return int(version_path(Path(csv_path)).read_text(encoding="utf-8").strip() or 0)
+    except FileNotFoundError:
+        return 0
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+def bump_dictionary_version(*, csv_path: Path = DEFAULT_NAMES_CSV_PATH) -> int:
+    """
+    Tell every process to reload names.csv (after an edit in place).
+    Returns the new stamp.
+    """
+    csv_path = Path(csv_path)
+    version = dictionary_version(csv_path=csv_path) + 1
+    _write_atomic(version_path(csv_path), f"{version}\n".encode())
+    return version
+
+
+def _signature(csv_path: Path) -> tuple:
+    """
+    Cheap change check: stat() of names.csv and of its stamp.
+    Raises FileNotFoundError without names.csv.
+    """
+    st = csv_path.stat()
+    try:
+        stamp = version_path(csv_path).stat()
+    except FileNotFoundError:
+        stamp_signature = None
+    else:
+        stamp_signature = (stamp.st_ino, stamp.st_mtime_ns)
+    return (st.st_ino, st.st_mtime_ns, st.st_size), stamp_signature
+
+
+def _build(csv_path: Path) -> Tuple[tuple, NameDictionary]:
+    """
+    Load the dictionary with its indexes. Retried if the file changed while
+    it was read (the loaders read it several times).
+    """
+    for _ in range(3):
+        signature = _signature(csv_path)
+        name_dictionary = load_name_dictionary(csv_path=csv_path)
+        name_dictionary.typo_index  # noqa: B018 - built before anyone sees it
+        if _signature(csv_path) == signature:
+            break
+    return signature, name_dictionary
+
+
+def _reload(csv_path: Path, signature: tuple) -> None:
+    try:
+        signature, name_dictionary = _build(csv_path)
+    except (OSError, ValueError) as e:
+        # Keep serving the previous dictionary until the next change
+        logger.warning("Names dictionary %s not reloaded: %s", csv_path, e)
+        with _cache_lock:
+            cached = _cache[csv_path]
+            cached.signature = signature
+            cached.reloading_pid = None
+        return
+    with _cache_lock:
+        _cache[csv_path] = _Cached(signature, name_dictionary)
+    logger.info("Names dictionary %s reloaded: %s", csv_path, name_dictionary.meta.sha256)
+
+
+def get_name_dictionary(
+    *,
+    csv_path: Path = DEFAULT_NAMES_CSV_PATH,
+) -> NameDictionary:
+    """
+    load_name_dictionary() shared by the process: the first call loads it,
+    later calls return the cached one and, at most every
+    RELOAD_CHECK_SECONDS, start a background reload if names.csv or its
+    version stamp changed. Derived indexes live on the NameDictionary.
+    """
+    global _cache_hits, _cache_misses
+
+    csv_path = Path(csv_path)
+    now = time.monotonic()
+    with _cache_lock:
+        cached = _cache.get(csv_path)
+        if cached is not None:
+            _cache_hits += 1
+            if now - cached.checked_at < RELOAD_CHECK_SECONDS or cached.reloading_pid == os.getpid():
+                return cached.dictionary
+            cached.checked_at = now
+        else:
+            _cache_misses += 1
+
+    if cached is None:
+        try:
+            signature, name_dictionary = _build(csv_path)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Names dictionary not found: {csv_path}") from None
+        with _cache_lock:
+            _cache[csv_path] = _Cached(signature, name_dictionary)
+        return name_dictionary
+
+    try:
+        signature = _signature(csv_path)
+    except FileNotFoundError:
+        signature = None  # being replaced by hand; keep the cached one
+    if signature is not None and signature != cached.signature:
+        with _cache_lock:
+            # A forked worker does not inherit the parent's reload thread
+            start = cached.reloading_pid != os.getpid()
+            cached.reloading_pid = os.getpid()
+        if start:
+            threading.Thread(
+                target=_reload, args=(csv_path, signature), name="fio-dictionary-reload", daemon=True
+            ).start()
+    return cached.dictionary
+
+
+def reload_name_dictionary(*, csv_path: Path = DEFAULT_NAMES_CSV_PATH) -> NameDictionary:
+    """
+    Load names.csv now and make it the cached dictionary of this process.
+    """
+    csv_path = Path(csv_path)
+    signature, name_dictionary = _build(csv_path)
+    with _cache_lock:
+        _cache[csv_path] = _Cached(signature, name_dictionary)
+    return name_dictionary
+
+
+def publish_name_dictionary(
+    content: bytes,
+    *,
+    csv_path: Path = DEFAULT_NAMES_CSV_PATH,
+) -> NameDictionary:
+    """
+    Replace names.csv with content and bump its version stamp. The content
+    is validated first (ValueError on a bad header); the file is replaced
+    atomically, so readers see the old or the new one. This process switches
+    at once, the others within RELOAD_CHECK_SECONDS plus a reload.
+    """
+    csv_path = Path(csv_path)
+    staged = csv_path.with_name(f"{csv_path.name}.{os.getpid()}.staged")
+    staged.write_bytes(content)
+    try:
+        load_name_dictionary(csv_path=staged)
+        os.replace(staged, csv_path)
+    finally:
+        staged.unlink(missing_ok=True)
+    bump_dictionary_version(csv_path=csv_path)
+    return reload_name_dictionary(csv_path=csv_path)
+
+
+def dictionary_cache_info() -> DictionaryCacheInfo:
+    return DictionaryCacheInfo(_cache_hits, _cache_misses, len(_cache))
+
+
+prometheus.register_cache("dictionary", dictionary_cache_info)
@@ -0,0 +1,154 @@
+"""
+Suggestion generator registry.
+
+A generator declares which fields it reads and which flags a value must
+carry for it to run. The run pipeline parses each row once and hands every
+selected value to the generators that consume it; values are wrapped in
+ValueInfo so normalization and flag detection happen once per distinct value
+and are shared between generators.
+
+This module does not import Django: generators return plain dicts that the
+caller turns into Suggestion rows.
+"""
+
+from __future__ import annotations
+
+from typing import Iterable, Optional
+
+from apps.fio_runstore.generator.name_dictionary import NameDictionary
+from domain.fio.normalize_value import normalize_fio_value
+from domain.fio.quality_checks import detect_flags
+
+
+# Field names as stored in Suggestion.field_name
+FIELD_FIO = "fio"
+FIELD_FIO_FIRST_NAME = "fio.first_name"  # first name extracted from a single FIO field
+FIELD_LAST_NAME = "last_name"
+FIELD_FIRST_NAME = "first_name"
+FIELD_MIDDLE_NAME = "middle_name"
+
+VALUE_FIELDS = frozenset({FIELD_FIO, FIELD_LAST_NAME, FIELD_FIRST_NAME, FIELD_MIDDLE_NAME})
+FIRST_NAME_FIELDS = frozenset({FIELD_FIRST_NAME, FIELD_FIO_FIRST_NAME})
+
+
+def selected_fields(selection: dict) -> list[tuple[str, str]]:
+    """
+    Returns list of (field_name, column_name) for the selected FIO columns.
+    """
+    if selection.get("mode") == "split":
+        mapping = [
+            (FIELD_LAST_NAME, selection.get("last_name_column")),
+            (FIELD_FIRST_NAME, selection.get("first_name_column")),
+            (FIELD_MIDDLE_NAME, selection.get("middle_name_column")),
+        ]
+        return [(field_name, col) for field_name, col in mapping if col]
+
+    fio_col = selection.get("fio_column")
+    return [(FIELD_FIO, fio_col)] if fio_col else []
+
+
+def extract_first_name_from_fio(value: str) -> Optional[str]:
+    """
+    Very simple heuristic for single-field FIO:
+    assume 'Last First Middle' and take the second token.
+    """
+    if not value:
+        return None
+    parts = [p for p in value.strip().split() if p]
+    if len(parts) < 2:
+        return None
+    return parts[1]
+
+
+class ValueInfo:
+    """
+    A distinct non-empty value with lazily computed, shared analysis.
+    """
+
+    __slots__ = ("value", "_normalized", "_flags")
+
+    def __init__(self, value: str):
+        self.value = value
+        self._normalized: Optional[str] = None
+        self._flags: Optional[list[str]] = None
+
+    @property
+    def normalized(self) -> str:
+        if self._normalized is None:
+            self._normalized = normalize_fio_value(self.value).after
+        return self._normalized
+
+    @property
+    def flags(self) -> list[str]:
+        if self._flags is None:
+            self._flags = detect_flags(self.value)
+        return self._flags
+
+
+class SuggestionGenerator:
+    """
+    Base class for registered generators.
+
+    Subclasses set:
+    - generator_id / version: stored on every Suggestion they produce;
+    - fields: field names the generator reads;
+    - flags: the value must carry at least one of them (empty = every value);
+    - uses_dictionary: stamp Suggestion.dictionary_hash.
+
+    suggest() must depend on the value only (not on the row), so the pipeline
+    may reuse its result for repeated values.
+    """
+
+    generator_id: str = ""
+    version: str = ""
+    fields: frozenset = frozenset()
+    flags: frozenset = frozenset()
+    uses_dictionary: bool = False
+
+    def __init__(self, name_dictionary: NameDictionary):
+        self.name_dictionary = name_dictionary
+
+    def accepts(self, info: ValueInfo) -> bool:
+        return not self.flags or not self.flags.isdisjoint(info.flags)
+
+    def suggest(self, info: ValueInfo) -> list[dict]:
+        """
+        Returns Suggestion payloads: suggested_value, suggestion_code,
+        confidence, message, evidence.
+        """
+        raise NotImplementedError
+
+
+GENERATOR_REGISTRY: dict[str, type[SuggestionGenerator]] = {}
+
+
+def register_generator(cls: type[SuggestionGenerator]) -> type[SuggestionGenerator]:
+    if not cls.generator_id:
+        raise ValueError(f"{cls.__name__} has no generator_id")
+    if cls.generator_id in GENERATOR_REGISTRY:
+        raise ValueError(f"Generator already registered: {cls.generator_id}")
+    GENERATOR_REGISTRY[cls.generator_id] = cls
+    return cls
+
+
+def build_generators(
+    name_dictionary: NameDictionary,
+    *,
+    generator_ids: Optional[Iterable[str]] = None,
+) -> list[SuggestionGenerator]:
+    """
+    Instantiate registered generators (all, or the listed ids in registry order).
+    """
+    # Built-in generators register themselves on import.
+    from apps.fio_runstore.generator import generators  # noqa: F401
+
+    if generator_ids is None:
+        selected = list(GENERATOR_REGISTRY)
+    else:
+        wanted = set(generator_ids)
+        unknown = wanted - set(GENERATOR_REGISTRY)
+        if unknown:
+            raise ValueError(f"Unknown generator ids: {sorted(unknown)}")
+        selected = [gid for gid in GENERATOR_REGISTRY if gid in wanted]
+
+    return [GENERATOR_REGISTRY[gid](name_dictionary) for gid in selected]
@@ -3,35 +3,182 @@ Suggestion generator entry point.
 
 Responsibilities:
 - create Run records;
-- iterate through CSV rows;
-- generate Suggestion objects (no auto-fixes).
+- iterate through CSV rows (one pass);
+- fan every selected value out to the registered generators;
+- check the name / patronymic pair of every row;
+- write Suggestion objects in batches (no auto-fixes). A row flag is
+  stored as a Suggestion of the flagged cell that keeps its value.
 """
 
-from typing import Optional
-import csv
-import io
+from typing import Iterable, Optional
+import time
 
-from django.core.files.storage import default_storage
+from django.db import transaction
 
-from apps.fio_runstore.models import Run, Suggestion
-from apps.fio_runstore.generator.name_dictionary import load_names_variant_map
+from apps.fio_runstore import prometheus
+from apps.fio_runstore.db_writer import SuggestionWriter, WriteTicket, get_writer
+from apps.fio_runstore.instrumentation import (
+    COUNTER_ROWS_READ,
+    COUNTER_SUGGESTIONS_EMITTED,
+    COUNTER_VALUES_ANALYZED,
+    NULL_METRICS,
+    STAGE_ANALYZE,
+    STAGE_PARSE,
+    STAGE_READ,
+    STAGE_TOTAL,
+    STAGE_WRITE,
+    RunMetrics,
+    make_metrics,
+)
+from apps.fio_runstore.memory import (
+    MIN_BATCH_SIZE,
+    MIN_CHUNK_ROWS,
+    MIN_MEMO_ENTRIES,
+    MIN_PREFETCH_CHUNKS,
+    NULL_MEMORY,
+    MemoryGuard,
+    make_memory_guard,
+)
+from apps.fio_runstore.models import ProfileReport, Run, Suggestion
+from apps.fio_runstore.pipeline import STAGE_WAIT, Prefetcher, prefetch
+from apps.fio_runstore.profiling import Profiler, save_profile_report
+from apps.fio_runstore.generator.generators import GENERATOR_ID, SUGGEST_NAME_PATRONYMIC_MISMATCH
+from apps.fio_runstore.generator.name_dictionary import get_name_dictionary
+from apps.fio_runstore.generator.registry import (
+    FIELD_FIO,
+    FIELD_FIO_FIRST_NAME,
+    FIELD_FIRST_NAME,
+    FIELD_MIDDLE_NAME,
+    SuggestionGenerator,
+    ValueInfo,
+    build_generators,
+    extract_first_name_from_fio,
+    selected_fields,
+)
+from domain.fio.consistency import NamePatronymicChecker
+from domain.fio.constants import CONFIDENCE_MEDIUM, FLAG_LABELS_RU, FLAG_NAME_PATRONYMIC_MISMATCH
+from uploads.csv_projection import ProjectedReader
 
 
-GENERATOR_ID = "apps.fio_runstore.generator"
-GENERATOR_VERSION = "0.2"
+SUGGESTION_BATCH_SIZE = 1000
+# Upper bound for the per-run memo of distinct values; cleared when reached.
+MEMO_MAX_ENTRIES = 100_000
 
+# Row flags stored as Suggestions
+ROW_CHECK_ID = f"{GENERATOR_ID}.name_patronymic"
+ROW_CHECK_VERSION = "1.0"
+ROW_FLAG_CODES = {FLAG_NAME_PATRONYMIC_MISMATCH: SUGGEST_NAME_PATRONYMIC_MISMATCH}
 
-def _extract_first_name_from_fio(value: str) -> Optional[str]:
+
+class _SuggestionSink:
     """
-    Very simple heuristic for single-field FIO:
-    assume 'Last First Middle' and take the second token.
+    Single batched writer for all generators of a run.
+
+    With a SuggestionWriter, full batches are handed to the process-wide
+    writer thread and wait() blocks until they are committed; without one
+    they are written here.
     """
-    if not value:
-        return None
-    parts = [p for p in value.strip().split() if p]
-    if len(parts) < 2:
-        return None
-    return parts[1]
+
+    def __init__(
+        self,
+        run: Run,
+        dictionary_hash: str,
+        batch_size: int = SUGGESTION_BATCH_SIZE,
+        metrics: RunMetrics = NULL_METRICS,
+        memory: MemoryGuard = NULL_MEMORY,
+        writer: Optional[SuggestionWriter] = None,
+    ):
+        self.run = run
+        self.dictionary_hash = dictionary_hash
+        self.batch_size = batch_size
+        self.metrics = metrics
+        self.memory = memory
+        self.writer = writer
+        self.ticket = WriteTicket()
+        self.pending: list[Suggestion] = []
+        self._written = 0
+
+    @property
+    def written(self) -> int:
+        return self.ticket.written if self.writer is not None else self._written
+
+    def add(self, generator: SuggestionGenerator, row_id: int, field_name: str, before: str, payload: dict) -> None:
+        self.pending.append(
+            Suggestion(
+                run=self.run,
+                row_id=row_id,
+                field_name=field_name,
+                before_value=before,
+                generator=generator.generator_id,
+                generator_version=generator.version,
+                dictionary_hash=self.dictionary_hash if generator.uses_dictionary else None,
+                **payload,
+            )
+        )
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def add_flag(self, row_id: int, field_name: str, value: str, flag: str, evidence: dict) -> None:
+        """
+        Row-level flag on the cell `field_name`; the suggested value is the
+        value itself.
+        """
+        self.pending.append(
+            Suggestion(
+                run=self.run,
+                row_id=row_id,
+                field_name=field_name,
+                before_value=value,
+                suggested_value=value,
+                suggestion_code=ROW_FLAG_CODES[flag],
+                confidence=CONFIDENCE_MEDIUM,
+                message=f"Проверьте строку: {FLAG_LABELS_RU[flag]}.",
+                evidence={"flag": flag, **evidence},
+                generator=ROW_CHECK_ID,
+                generator_version=ROW_CHECK_VERSION,
+                dictionary_hash=self.dictionary_hash,
+            )
+        )
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if self.pending:
+            # STAGE_WRITE: time the run spends writing or blocked on the writer
+            with self.metrics.stage(STAGE_WRITE):
+                if self.writer is not None:
+                    self.writer.submit(self.ticket, self.pending)
+                else:
+                    Suggestion.objects.bulk_create(self.pending, batch_size=self.batch_size)
+                    self._written += len(self.pending)
+            self.metrics.incr(COUNTER_SUGGESTIONS_EMITTED, len(self.pending))
+            self.pending = []
+            self.memory.sample(STAGE_WRITE)
+
+    def wait(self) -> None:
+        """
+        Block until every flushed batch is committed.
+        """
+        if self.writer is not None:
+            with self.metrics.stage(STAGE_WRITE):
+                self.ticket.wait()
+
+
+class _GeneratorStats:
+    __slots__ = ("calls", "hits", "seconds")
+
+    def __init__(self):
+        self.calls = 0  # distinct values evaluated
+        self.hits = 0  # suggestions emitted (all rows)
+        self.seconds = 0.0
+
+    def as_dict(self, generator: SuggestionGenerator) -> dict:
+        return {
+            "version": generator.version,
+            "calls": self.calls,
+            "hits": self.hits,
+            "seconds": round(self.seconds, 6),
+        }
 
 
 def generate_suggestions_for_csv(
@@ -40,10 +187,77 @@ def generate_suggestions_for_csv(
     selection: dict,
     encoding: Optional[str] = None,
     delimiter: Optional[str] = None,
+    generator_ids: Optional[Iterable[str]] = None,
+    collect_metrics: Optional[bool] = None,
+    profile: Optional[str] = None,
+    memory_budget_mb: Optional[int] = None,
 ) -> Run:
     """
-    Create a Run and generate name-based suggestions using dictionary.
+    Create a Run and generate suggestions with the registered generators
+    (all of them, or only generator_ids) in a single pass over the file.
+
+    Per-generator timing and hit counters are stored in Run.metrics; with
+    collect_metrics (default: settings.FIO_METRICS_ENABLED) also per-stage
+    timings (read, parse, analyze, write) and counters; decoding of the
+    selected cells happens while parsing.
+
+    Reading, analysis and writing overlap (settings.FIO_PIPELINE,
+    apps.fio_runstore.pipeline): rows come from a reader thread, batches go
+    to the writer thread; "wait" is the time analysis waited for rows.
+
+    profile="cprofile" | "sampling" stores a ProfileReport linked to the run.
+
+    Memory-bounded mode (memory_budget_mb, or settings.FIO_MEMORY["ENABLED"]):
+    memory is sampled per stage, batches and the value memo shrink and
+    pending suggestions are flushed early when the budget is approached;
+    the peak is stored in Run.peak_memory_bytes and Run.metrics["memory"].
     """
+    kwargs = dict(
+        source_csv_path=source_csv_path,
+        selection=selection,
+        encoding=encoding,
+        delimiter=delimiter,
+        generator_ids=generator_ids,
+        collect_metrics=collect_metrics,
+        memory_budget_mb=memory_budget_mb,
+    )
+    prometheus.inc_gauge("fio_runs_in_flight", 1)
+    try:
+        if not profile:
+            return _generate_suggestions(**kwargs)
+
+        with Profiler(profile) as profiler:
+            run = _generate_suggestions(**kwargs)
+        save_profile_report(profiler, kind=ProfileReport.KIND_RUN, target=f"run {run.id}", run=run)
+        return run
+    finally:
+        prometheus.inc_gauge("fio_runs_in_flight", -1)
+        prometheus.flush()
+
+
+def _export_run_metrics(rows_read: int, seconds: float, values_analyzed: int, memo_misses: int) -> None:
+    prometheus.inc_counter("fio_runs_total")
+    prometheus.inc_counter("fio_run_rows_total", rows_read)
+    prometheus.inc_counter("fio_run_seconds_total", seconds)
+    if seconds > 0:
+        prometheus.set_gauge("fio_run_rows_per_second", rows_read / seconds)
+    prometheus.inc_counter(prometheus.CACHE_HITS, values_analyzed - memo_misses, cache="run_values")
+    prometheus.inc_counter(prometheus.CACHE_MISSES, memo_misses, cache="run_values")
+
+
+def _generate_suggestions(
+    *,
+    source_csv_path: str,
+    selection: dict,
+    encoding: Optional[str],
+    delimiter: Optional[str],
+    generator_ids: Optional[Iterable[str]],
+    collect_metrics: Optional[bool],
+    memory_budget_mb: Optional[int],
+) -> Run:
+    metrics = make_metrics(collect_metrics)
+    memory = make_memory_guard(memory_budget_mb)
+    started = time.perf_counter()
 
     run = Run.objects.create(
         source_csv_path=source_csv_path,
@@ -52,66 +266,167 @@ def generate_suggestions_for_csv(
         delimiter=delimiter,
     )
 
-    name_map, name_meta = load_names_variant_map()
-
-    with default_storage.open(source_csv_path, "rb") as raw:
-        text = io.TextIOWrapper(raw, encoding=encoding or "utf-8", newline="")
-        reader = csv.reader(text, delimiter=delimiter or ",")
-
-        header = next(reader, None)
-        if header is None:
-            return run
-
-        col_index = {name: i for i, name in enumerate(header)}
-
-        mode = selection.get("mode")
-
-        for row_id, row in enumerate(reader, start=1):
-            if mode == "split":
-                first_col = selection.get("first_name_column")
-                if not first_col:
-                    continue
-                idx = col_index.get(first_col)
-                if idx is None or idx >= len(row):
-                    continue
-                before = (row[idx] or "").strip()
-                field_name = "first_name"
-
-            else:  # single
-                fio_col = selection.get("fio_column")
-                if not fio_col:
-                    continue
-                idx = col_index.get(fio_col)
-                if idx is None or idx >= len(row):
-                    continue
-                fio_val = (row[idx] or "").strip()
-                before = _extract_first_name_from_fio(fio_val)
-                field_name = "fio.first_name"
-
-            if not before:
-                continue
-
-            canonical = name_map.get(before)
-            if not canonical or canonical == before:
-                continue
-
-            Suggestion.objects.create(
-                run=run,
-                row_id=row_id,
-                field_name=field_name,
-                before_value=before,
-                suggested_value=canonical,
-                suggestion_code="DICT_NAME_VARIANT",
-                confidence=Suggestion.CONFIDENCE_HIGH,
-                message=f"В словаре имён вариант «{before}» сопоставлен с канонической формой «{canonical}».",
-                evidence={
-                    "variant": before,
-                    "canonical": canonical,
-                    "dictionary": name_meta.path,
-                },
-                generator=GENERATOR_ID,
-                generator_version=GENERATOR_VERSION,
-                dictionary_hash=name_meta.sha256,
-            )
+    name_dictionary = get_name_dictionary()
+    generators = build_generators(name_dictionary, generator_ids=generator_ids)
+    stats = {g.generator_id: _GeneratorStats() for g in generators}
+    sink = _SuggestionSink(
+        run,
+        dictionary_hash=name_dictionary.meta.sha256,
+        metrics=metrics,
+        memory=memory,
+        # Inside the caller's transaction the run row is not visible to the writer's connection
+        writer=None if transaction.get_connection().in_atomic_block else get_writer(),
+    )
+
+    checker = NamePatronymicChecker(name_dictionary.name_gender)
+    row_flag_counts: dict[str, int] = {}
+
+    rows_read = 0
+    values_analyzed = 0
+    memo_misses = 0
+    memo_limit = MEMO_MAX_ENTRIES
+    mode = selection.get("mode")
+    pipelined = False
+
+    memory.start()
+    try:
+        selected = selected_fields(selection)
+        with ProjectedReader(
+            source_csv_path,
+            [col for _, col in selected],
+            encoding=encoding or "utf-8",
+            delimiter=delimiter or ",",
+            metrics=metrics,
+            memory=memory,
+        ) as reader:
+            if reader.header is not None:
+                field_names = [field_name for field_name, _ in selected]
+                fields_present = {
+                    field_name for field_name, idx in zip(field_names, reader.indexes) if idx is not None
+                }
+                if mode != "split" and FIELD_FIO in fields_present:
+                    fields_present.add(FIELD_FIO_FIRST_NAME)
+
+                # field_name -> generators reading it (fields nobody reads are not analyzed)
+                consumers: dict[str, list[SuggestionGenerator]] = {}
+                for g in generators:
+                    for field_name in g.fields & fields_present:
+                        consumers.setdefault(field_name, []).append(g)
+
+                # value -> (ValueInfo, {generator_id: payloads})
+                memo: dict[str, tuple[ValueInfo, dict[str, list[dict]]]] = {}
+
+                check_split = mode == "split" and {FIELD_FIRST_NAME, FIELD_MIDDLE_NAME} <= fields_present
+                check_single = mode != "split" and FIELD_FIO in fields_present
+
+                rows_source = prefetch(reader, metrics)
+                pipelined = isinstance(rows_source, Prefetcher)
+                with rows_source as rows:
+                    for row_id, cells in enumerate(rows, start=1):
+                        rows_read += 1
+
+                        # cells are already stripped; None: column missing or row too short
+                        values: dict[str, str] = {
+                            field_name: cell for field_name, cell in zip(field_names, cells) if cell is not None
+                        }
+                        if FIELD_FIO in values and mode != "split":
+                            values[FIELD_FIO_FIRST_NAME] = extract_first_name_from_fio(values[FIELD_FIO]) or ""
+
+                        for field_name, value in values.items():
+                            gens = consumers.get(field_name)
+                            if not value or not gens:
+                                continue
+                            values_analyzed += 1
+
+                            entry = memo.get(value)
+                            if entry is None:
+                                memo_misses += 1
+                                if len(memo) >= memo_limit:
+                                    memo.clear()
+                                entry = (ValueInfo(value), {})
+                                memo[value] = entry
+                            info, results = entry
+
+                            for g in gens:
+                                payloads = results.get(g.generator_id)
+                                if payloads is None:
+                                    st = stats[g.generator_id]
+                                    t0 = time.perf_counter()
+                                    payloads = g.suggest(info) if g.accepts(info) else []
+                                    st.seconds += time.perf_counter() - t0
+                                    st.calls += 1
+                                    results[g.generator_id] = payloads
+                                for payload in payloads:
+                                    stats[g.generator_id].hits += 1
+                                    sink.add(g, row_id, field_name, value, payload)
+
+                        # Logical row-level flags (name / patronymic), same pass
+                        row_flags = []
+                        if check_split:
+                            flag_field = FIELD_MIDDLE_NAME
+                            evidence = {"first_name": values.get(FIELD_FIRST_NAME)}
+                            row_flags = checker.check(values.get(FIELD_FIRST_NAME), values.get(FIELD_MIDDLE_NAME))
+                        elif check_single:
+                            flag_field = FIELD_FIO
+                            evidence = {}
+                            row_flags = checker.check_fio(values.get(FIELD_FIO))
+                        for flag in row_flags:
+                            row_flag_counts[flag] = row_flag_counts.get(flag, 0) + 1
+                            sink.add_flag(row_id, flag_field, values[flag_field], flag, evidence)
+
+                        if memory.enabled and rows_read % memory.check_every_rows == 0:
+                            memory.sample(STAGE_ANALYZE)
+                            if memory.under_pressure():
+                                # Shrink the buffers and release what they hold now.
+                                memory.note_pressure()
+                                sink.batch_size = max(MIN_BATCH_SIZE, sink.batch_size // 2)
+                                memo_limit = max(MIN_MEMO_ENTRIES, memo_limit // 2)
+                                memo.clear()
+                                if pipelined:
+                                    rows_source.max_chunks = max(MIN_PREFETCH_CHUNKS, rows_source.max_chunks // 2)
+                                    rows_source.chunk_rows = max(MIN_CHUNK_ROWS, rows_source.chunk_rows // 2)
+                                sink.flush()
+                                sink.wait()
+
+        sink.flush()
+        sink.wait()
+    finally:
+        memory.stop()
+
+    generator_seconds = sum(st.seconds for st in stats.values())
+    metrics.add_time(STAGE_ANALYZE, generator_seconds)
+    total_seconds = time.perf_counter() - started
+    metrics.add_time(STAGE_TOTAL, total_seconds)
+    # CSV parsing / cell decoding and row handling: what is left of the total after the timed stages
+    # of this thread. Pipelined, reading and parsing run in the reader thread (overlapping the rest);
+    # this thread only waits for rows (STAGE_WAIT).
+    own_stages = (STAGE_WAIT if pipelined else STAGE_READ, STAGE_ANALYZE, STAGE_WRITE)
+    metrics.add_time(
+        STAGE_PARSE,
+        max(0.0, metrics.seconds(STAGE_TOTAL) - sum(metrics.seconds(name) for name in own_stages)),
+    )
+    metrics.incr(COUNTER_ROWS_READ, rows_read)
+    metrics.incr(COUNTER_VALUES_ANALYZED, values_analyzed)
 
+    run.metrics = {
+        "rows_read": rows_read,
+        "suggestions": sink.written,
+        "row_flags": row_flag_counts,
+        "generators": {g.generator_id: stats[g.generator_id].as_dict(g) for g in generators},
+        **(metrics.as_dict() if metrics.enabled else {}),
+    }
+    update_fields = ["metrics"]
+    if memory.enabled:
+        run.metrics["memory"] = {
+            **memory.as_dict(),
+            "final_batch_size": sink.batch_size,
+            "final_memo_limit": memo_limit,
+        }
+        if pipelined:
+            run.metrics["memory"]["final_prefetch_chunks"] = rows_source.max_chunks
+            run.metrics["memory"]["final_chunk_rows"] = rows_source.chunk_rows
+        run.peak_memory_bytes = memory.peak_rss or None
+        update_fields.append("peak_memory_bytes")
+    run.save(update_fields=update_fields)
+    _export_run_metrics(rows_read, total_seconds, values_analyzed, memo_misses)
     return run
@@ -0,0 +1,167 @@
+"""
+Lightweight per-run instrumentation: named stage timers and counters.
+
+RunMetrics collects; NULL_METRICS has the same interface and does nothing,
+so instrumented code never branches on "enabled". Stage timers are meant for
+coarse blocks (a chunk read, a batch write), not for per-value calls.
+
+This module does not import Django.
+"""
+
+from __future__ import annotations
+
+import functools
+import json
+import logging
+import time
+from typing import Optional
+
+from apps.fio_runstore import prometheus
+
+
+logger = logging.getLogger(__name__)
+
+# Stage names
+STAGE_READ = "read"
+STAGE_DECODE = "decode"
+STAGE_PARSE = "parse"
+STAGE_ANALYZE = "analyze"
+STAGE_WRITE = "write"
+STAGE_TOTAL = "total"
+
+# Counter names
+COUNTER_BYTES_READ = "bytes_read"
+COUNTER_ROWS_READ = "rows_read"
+COUNTER_VALUES_ANALYZED = "values_analyzed"
+COUNTER_SUGGESTIONS_EMITTED = "suggestions_emitted"
+
+
+class _Stage:
+    __slots__ = ("_metrics", "_name", "_started")
+
+    def __init__(self, metrics: "RunMetrics", name: str):
+        self._metrics = metrics
+        self._name = name
+        self._started = 0.0
+
+    def __enter__(self):
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._metrics.add_time(self._name, time.perf_counter() - self._started)
+        return False
+
+
+class _NullStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class RunMetrics:
+    """
+    Stage timers (seconds + number of timed blocks) and integer counters.
+    """
+
+    enabled = True
+
+    def __init__(self):
+        self.stages: dict[str, list] = {}  # name -> [seconds, calls]
+        self.counters: dict[str, int] = {}
+
+    def stage(self, name: str) -> _Stage:
+        return _Stage(self, name)
+
+    def add_time(self, name: str, seconds: float, calls: int = 1) -> None:
+        st = self.stages.get(name)
+        if st is None:
+            self.stages[name] = [seconds, calls]
+        else:
+            st[0] += seconds
+            st[1] += calls
+
+    def incr(self, name: str, n: int = 1) -> None:
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def seconds(self, name: str) -> float:
+        st = self.stages.get(name)
+        return st[0] if st else 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            "stages": {
+                name: {"seconds": round(sec, 6), "calls": calls}
+                for name, (sec, calls) in self.stages.items()
+            },
+            "counters": dict(self.counters),
+        }
+
+
+class _NullMetrics(RunMetrics):
+    enabled = False
+
+    def stage(self, name: str) -> _NullStage:
+        return _NULL_STAGE
+
+    def add_time(self, name: str, seconds: float, calls: int = 1) -> None:
+        pass
+
+    def incr(self, name: str, n: int = 1) -> None:
+        pass
+
+
+NULL_METRICS = _NullMetrics()
+
+
+def make_metrics(enabled: Optional[bool] = None) -> RunMetrics:
+    """
+    RunMetrics if enabled, else NULL_METRICS.
+    enabled=None follows settings.FIO_METRICS_ENABLED (default: on).
+    """
+    if enabled is None:
+        from django.conf import settings
+
+        enabled = getattr(settings, "FIO_METRICS_ENABLED", True)
+    return RunMetrics() if enabled else NULL_METRICS
+
+
+def request_metrics(request) -> RunMetrics:
+    """
+    Metrics of the current request (set by @instrument_view), or NULL_METRICS.
+    """
+    return getattr(request, "fio_metrics", NULL_METRICS)
+
+
+def instrument_view(view_name: str):
+    """
+    View decorator: attaches a RunMetrics to request.fio_metrics, times the
+    whole view as the "total" stage and logs the summary at INFO level.
+    The latency also goes to the fio_request_duration_seconds histogram.
+    """
+
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(request, *args, **kwargs):
+            metrics = make_metrics()
+            request.fio_metrics = metrics
+            started = time.perf_counter()
+            try:
+                with metrics.stage(STAGE_TOTAL):
+                    response = view(request, *args, **kwargs)
+            finally:
+                prometheus.observe("fio_request_duration_seconds", time.perf_counter() - started, view=view_name)
+            if metrics.enabled:
+                logger.info("%s metrics: %s", view_name, json.dumps(metrics.as_dict(), sort_keys=True))
+            return response
+
+        return wrapper
+
+    return decorator
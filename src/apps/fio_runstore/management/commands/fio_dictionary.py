@@ -0,0 +1,46 @@
+"""
+Publish an edited names dictionary to all running workers
+(apps/fio_runstore/generator/name_dictionary.py):
+
+    python manage.py fio_dictionary                     # current version
+    python manage.py fio_dictionary --publish new.csv   # validate, replace, bump
+    python manage.py fio_dictionary --bump              # after editing names.csv in place
+"""
+
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.fio_runstore.generator.name_dictionary import (
+    DEFAULT_NAMES_CSV_PATH,
+    bump_dictionary_version,
+    dictionary_version,
+    load_name_dictionary,
+    publish_name_dictionary,
+)
+
+
+class Command(BaseCommand):
+    help = "Show, publish or bump the version of the names dictionary."
+
+    def add_arguments(self, parser):
+        group = parser.add_mutually_exclusive_group()
+        group.add_argument("--publish", metavar="CSV", help="Replace names.csv with this file.")
+        group.add_argument("--bump", action="store_true", help="Make workers reload names.csv.")
+        parser.add_argument("--dictionary", default=str(DEFAULT_NAMES_CSV_PATH), help="names.csv to manage.")
+
+    def handle(self, *args, **options):
+        csv_path = Path(options["dictionary"])
+        try:
+            if options["publish"]:
+                name_dictionary = publish_name_dictionary(Path(options["publish"]).read_bytes(), csv_path=csv_path)
+            else:
+                if options["bump"]:
+                    bump_dictionary_version(csv_path=csv_path)
+                name_dictionary = load_name_dictionary(csv_path=csv_path)
+        except (OSError, ValueError) as e:
+            raise CommandError(str(e))
+
+        meta = name_dictionary.meta
+        self.stdout.write(f"{meta.path}: version {dictionary_version(csv_path=csv_path)}, sha256 {meta.sha256}")
+        self.stdout.write(f"{meta.total_rows} rows, {meta.enabled_rows} enabled variants")
@@ -0,0 +1,23 @@
+"""
+Headless export of CSV files, without the web UI; see apps/fio_runstore/cli.py
+(`python src/fio_cli.py` takes the same options without booting Django):
+
+    python manage.py fio_export 'exports/*.csv' --fio-column ФИО --output-dir out/
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.fio_runstore import cli
+
+
+class Command(BaseCommand):
+    help = "Normalize, flag and suggest FIO values of CSV files and write export v0 files."
+
+    def add_arguments(self, parser):
+        cli.add_arguments(parser)
+
+    def handle(self, *args, **options):
+        try:
+            cli.export(options, self.stdout, self.stderr, django_ready=True)
+        except cli.CliError as e:
+            raise CommandError(str(e))
@@ -0,0 +1,50 @@
+"""
+Apply the retention policy (apps/fio_runstore/retention.py):
+
+    python manage.py fio_retention --dry-run
+    python manage.py fio_retention --run-max-age-days 30 --vacuum full
+"""
+
+from django.core.management.base import BaseCommand
+
+from apps.fio_runstore.retention import VACUUM_MODES, apply_retention
+
+
+class Command(BaseCommand):
+    help = "Delete expired runs and orphaned uploads, then compact the database."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="Only report what would be deleted.")
+        parser.add_argument("--run-max-age-days", type=int, help="Delete runs older than this.")
+        parser.add_argument("--keep-runs", type=int, help="Always keep the latest N runs.")
+        parser.add_argument("--upload-max-age-days", type=int, help="Delete orphaned uploads older than this.")
+        parser.add_argument("--chunk-rows", type=int, help="Suggestions per DELETE statement.")
+        parser.add_argument("--vacuum", choices=VACUUM_MODES + ("none",), help="Database compaction after deleting.")
+
+    def handle(self, *args, **options):
+        overrides = {
+            key: options[option]
+            for key, option in (
+                ("RUN_MAX_AGE_DAYS", "run_max_age_days"),
+                ("KEEP_RUNS", "keep_runs"),
+                ("UPLOAD_MAX_AGE_DAYS", "upload_max_age_days"),
+                ("CHUNK_ROWS", "chunk_rows"),
+                ("VACUUM", "vacuum"),
+            )
+            if options[option] is not None
+        }
+        if overrides.get("VACUUM") == "none":
+            overrides["VACUUM"] = None
+
+        result = apply_retention(overrides, dry_run=options["dry_run"])
+
+        prefix = "Would delete" if options["dry_run"] else "Deleted"
+        self.stdout.write(f"{prefix}: {result['runs']} runs, {result['suggestions']} suggestions")
+        self.stdout.write(f"{prefix}: {len(result['uploads'])} upload files")
+        for name in result["uploads"]:
+            self.stdout.write(f"  {name}")
+        if "profile_reports" in result:
+            self.stdout.write(f"Deleted: {result['profile_reports']} profile reports")
+        if "database_bytes" in result:
+            size = result["database_bytes"]
+            self.stdout.write(f"Database: {size['before']} -> {size['after']} bytes")
@@ -0,0 +1,249 @@
+"""
+Memory-bounded runs: allocation tracking and a soft memory budget.
+
+MemoryGuard samples memory at stage boundaries (a chunk read, a batch
+write, every CHECK_EVERY_ROWS rows of analysis):
+- tracemalloc current/peak, if TRACEMALLOC is on (slower, but attributes
+  Python allocations to the run);
+- process RSS (Linux /proc; elsewhere the peak RSS from getrusage).
+
+The budget applies to the run's own usage: traced memory when tracemalloc
+is on, otherwise RSS growth since the run started (both relative to the
+start of the run). Once usage reaches
+SOFT_RATIO of the budget, under_pressure() is True and the run shrinks its
+buffers (see run_generator). NULL_MEMORY has the same interface and does
+nothing.
+
+tracemalloc is process-wide: guards share it through a reference count
+(the first one to start starts tracing, the last one to stop stops it, if
+it was not already on), and the traced peak is only reset while a single
+guard is active, so overlapping runs see a peak that may include the other
+run rather than one the other run has reset. A guard may be sampled from
+several threads (the reader thread samples STAGE_READ); sample() holds a
+lock.
+
+This module does not import Django.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import threading
+import tracemalloc
+from typing import Optional
+
+
+DEFAULTS = {
+    "ENABLED": False,
+    "BUDGET_MB": 512,
+    "TRACEMALLOC": True,
+    "SOFT_RATIO": 0.8,
+    "CHECK_EVERY_ROWS": 1000,
+}
+
+# Lower bounds when shrinking under pressure
+MIN_BATCH_SIZE = 50
+MIN_MEMO_ENTRIES = 1000
+MIN_PREFETCH_CHUNKS = 2
+MIN_CHUNK_ROWS = 64
+
+MB = 1024 * 1024
+
+# Guards using tracemalloc now, and whether tracing was started by them
+_tracing_lock = threading.Lock()
+_tracing_users = 0
+_started_tracing = False
+
+
+def memory_settings() -> dict:
+    from django.conf import settings
+
+    return {**DEFAULTS, **getattr(settings, "FIO_MEMORY", {})}
+
+
+def current_rss() -> Optional[int]:
+    """
+    Resident set size of this process in bytes (peak RSS where the current
+    value is not available), or None.
+    """
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _acquire_tracing() -> None:
+    global _tracing_users, _started_tracing
+    with _tracing_lock:
+        if _tracing_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _started_tracing = True
+        _tracing_users += 1
+        if _tracing_users == 1:
+            tracemalloc.reset_peak()
+
+
+def _release_tracing() -> None:
+    global _tracing_users, _started_tracing
+    with _tracing_lock:
+        _tracing_users -= 1
+        if _tracing_users == 0 and _started_tracing:
+            tracemalloc.stop()
+            _started_tracing = False
+
+
+def _traced_memory() -> tuple[int, int]:
+    """
+    tracemalloc (current, peak); the peak is reset unless another guard is
+    tracing too.
+    """
+    with _tracing_lock:
+        traced, traced_peak = tracemalloc.get_traced_memory()
+        if _tracing_users == 1:
+            tracemalloc.reset_peak()
+    return traced, traced_peak
+
+
+class MemoryGuard:
+    """
+    Per-stage memory samples plus the budget check.
+
+        guard = MemoryGuard(budget_bytes=256 * MB)
+        guard.start()
+        ...
+        guard.sample("write")
+        if guard.under_pressure(): ...
+        guard.stop()
+        guard.as_dict()
+    """
+
+    enabled = True
+
+    def __init__(
+        self,
+        budget_bytes: Optional[int],
+        *,
+        use_tracemalloc: bool = True,
+        soft_ratio: float = 0.8,
+        check_every_rows: int = 1000,
+    ):
+        self.budget_bytes = budget_bytes
+        self.use_tracemalloc = use_tracemalloc
+        self.soft_ratio = soft_ratio
+        self.check_every_rows = check_every_rows
+        self.stages: dict[str, dict] = {}  # name -> {"samples", "traced_peak", "rss_max"}
+        self.peak_traced = 0
+        self.peak_rss = 0
+        self.usage = 0
+        self.pressure_events = 0
+        self._rss_start = 0
+        self._traced_start = 0
+        self._tracing = False
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        if self.use_tracemalloc and not self._tracing:
+            _acquire_tracing()
+            self._tracing = True
+            self._traced_start = tracemalloc.get_traced_memory()[0]
+        self._rss_start = current_rss() or 0
+        self.peak_rss = self._rss_start
+
+    def stop(self) -> None:
+        self.sample("end")
+        with self._lock:
+            if self._tracing:
+                self._tracing = False
+                _release_tracing()
+
+    def sample(self, stage: str) -> int:
+        """
+        Record memory for the interval that ended with this stage; returns
+        the current usage counted against the budget.
+        """
+        with self._lock:
+            st = self.stages.get(stage)
+            if st is None:
+                st = self.stages[stage] = {"samples": 0, "traced_peak": 0, "rss_max": 0}
+            st["samples"] += 1
+
+            rss = current_rss() or 0
+            st["rss_max"] = max(st["rss_max"], rss)
+            self.peak_rss = max(self.peak_rss, rss)
+
+            if self._tracing:
+                traced, traced_peak = _traced_memory()
+                st["traced_peak"] = max(st["traced_peak"], traced_peak)
+                self.peak_traced = max(self.peak_traced, traced_peak)
+                self.usage = max(0, traced - self._traced_start)
+            else:
+                self.usage = max(0, rss - self._rss_start)
+            return self.usage
+
+    def under_pressure(self) -> bool:
+        return bool(self.budget_bytes) and self.usage >= self.budget_bytes * self.soft_ratio
+
+    def note_pressure(self) -> None:
+        self.pressure_events += 1
+
+    def as_dict(self) -> dict:
+        return {
+            "budget_bytes": self.budget_bytes,
+            "tracemalloc": self.use_tracemalloc,
+            "peak_traced_bytes": self.peak_traced,
+            "peak_rss_bytes": self.peak_rss,
+            "rss_start_bytes": self._rss_start,
+            "pressure_events": self.pressure_events,
+            "stages": self.stages,
+        }
+
+
+class _NullMemoryGuard(MemoryGuard):
+    enabled = False
+
+    def __init__(self):
+        super().__init__(None, use_tracemalloc=False)
+
+    def start(self) -> None:
+        pass
+
+    def stop(self) -> None:
+        pass
+
+    def sample(self, stage: str) -> int:
+        return 0
+
+    def under_pressure(self) -> bool:
+        return False
+
+
+NULL_MEMORY = _NullMemoryGuard()
+
+
+def make_memory_guard(budget_mb: Optional[int] = None, *, enabled: Optional[bool] = None) -> MemoryGuard:
+    """
+    MemoryGuard for a run, or NULL_MEMORY.
+    enabled=None follows settings.FIO_MEMORY["ENABLED"]; passing budget_mb
+    turns tracking on with that budget (0 = track only, no budget).
+    """
+    conf = memory_settings()
+    if enabled is None:
+        enabled = budget_mb is not None or conf["ENABLED"]
+    if not enabled:
+        return NULL_MEMORY
+    if budget_mb is None:
+        budget_mb = conf["BUDGET_MB"]
+    return MemoryGuard(
+        int(budget_mb * MB) if budget_mb else None,
+        use_tracemalloc=conf["TRACEMALLOC"],
+        soft_ratio=conf["SOFT_RATIO"],
+        check_every_rows=conf["CHECK_EVERY_ROWS"],
+    )
@@ -0,0 +1,37 @@
+from apps.fio_runstore.profiling import MODES, Profiler, profiling_settings, save_profile_report
+
+
+class ProfilingMiddleware:
+    """
+    Profiles selected requests when settings.FIO_PROFILING["ENABLED"] is on:
+    paths listed in PATHS, or any request with ?<QUERY_PARAM>=1 from a staff
+    user. ?<QUERY_PARAM>=sampling|cprofile overrides the mode.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        conf = profiling_settings()
+        if not conf["ENABLED"]:
+            return self.get_response(request)
+
+        mode = self._requested_mode(request, conf)
+        if mode is None:
+            return self.get_response(request)
+
+        with Profiler(mode) as profiler:
+            response = self.get_response(request)
+        save_profile_report(profiler, kind="request", target=f"{request.method} {request.path}")
+        return response
+
+    @staticmethod
+    def _requested_mode(request, conf):
+        flag = request.GET.get(conf["QUERY_PARAM"])
+        if flag:
+            user = getattr(request, "user", None)
+            if user is not None and user.is_staff:
+                return flag if flag in MODES else conf["MODE"]
+        if request.path in conf["PATHS"]:
+            return conf["MODE"]
+        return None
@@ -0,0 +1,22 @@
+# Generated by Django 4.2.27 on 2026-10-19 00:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("fio_runstore", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="run",
+            name="metrics",
+            field=models.JSONField(
+                blank=True,
+                help_text="Run metrics: rows read, per-generator timing and hit counters",
+                null=True,
+            ),
+        ),
+    ]
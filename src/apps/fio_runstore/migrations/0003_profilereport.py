@@ -0,0 +1,76 @@
+# Generated by Django 4.2.27 on 2026-10-19 00:44
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("fio_runstore", "0002_run_metrics"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ProfileReport",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[("request", "request"), ("run", "run")], max_length=20
+                    ),
+                ),
+                (
+                    "target",
+                    models.CharField(
+                        help_text="Profiled request (method + path) or run",
+                        max_length=500,
+                    ),
+                ),
+                (
+                    "mode",
+                    models.CharField(
+                        help_text="Profiler: cprofile or sampling", max_length=20
+                    ),
+                ),
+                (
+                    "duration_seconds",
+                    models.FloatField(
+                        help_text="Wall-clock duration of the profiled block"
+                    ),
+                ),
+                (
+                    "report_file",
+                    models.FileField(
+                        help_text=".prof (cProfile) or collapsed stacks (sampling)",
+                        max_length=500,
+                        upload_to="profiles/",
+                    ),
+                ),
+                (
+                    "summary",
+                    models.TextField(blank=True, help_text="Top functions / stacks"),
+                ),
+                (
+                    "run",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="profile_reports",
+                        to="fio_runstore.run",
+                    ),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 4.2.27 on 2026-10-19 00:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("fio_runstore", "0003_profilereport"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="run",
+            name="peak_memory_bytes",
+            field=models.BigIntegerField(
+                blank=True,
+                help_text="Peak process RSS during a memory-tracked run",
+                null=True,
+            ),
+        ),
+    ]
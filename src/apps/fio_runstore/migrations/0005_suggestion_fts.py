@@ -0,0 +1,76 @@
+# FTS5 index over Suggestion values (SQLite only; see apps/fio_runstore/search.py)
+
+from django.db import migrations
+
+
+CREATE = [
+    """
+    CREATE VIRTUAL TABLE fio_runstore_suggestion_fts USING fts5(
+        before_value,
+        suggested_value,
+        content='fio_runstore_suggestion',
+        content_rowid='id',
+        tokenize='unicode61 remove_diacritics 0'
+    )
+    """,
+    """
+    CREATE TRIGGER fio_runstore_suggestion_fts_ai AFTER INSERT ON fio_runstore_suggestion BEGIN
+        INSERT INTO fio_runstore_suggestion_fts(rowid, before_value, suggested_value)
+        VALUES (new.id, new.before_value, new.suggested_value);
+    END
+    """,
+    """
+    CREATE TRIGGER fio_runstore_suggestion_fts_ad AFTER DELETE ON fio_runstore_suggestion BEGIN
+        INSERT INTO fio_runstore_suggestion_fts(fio_runstore_suggestion_fts, rowid, before_value, suggested_value)
+        VALUES ('delete', old.id, old.before_value, old.suggested_value);
+    END
+    """,
+    """
+    CREATE TRIGGER fio_runstore_suggestion_fts_au AFTER UPDATE OF before_value, suggested_value
+    ON fio_runstore_suggestion BEGIN
+        INSERT INTO fio_runstore_suggestion_fts(fio_runstore_suggestion_fts, rowid, before_value, suggested_value)
+        VALUES ('delete', old.id, old.before_value, old.suggested_value);
+        INSERT INTO fio_runstore_suggestion_fts(rowid, before_value, suggested_value)
+        VALUES (new.id, new.before_value, new.suggested_value);
+    END
+    """,
+    "INSERT INTO fio_runstore_suggestion_fts(fio_runstore_suggestion_fts) VALUES ('rebuild')",
+]
+
+DROP = [
+    "DROP TRIGGER IF EXISTS fio_runstore_suggestion_fts_ai",
+    "DROP TRIGGER IF EXISTS fio_runstore_suggestion_fts_ad",
+    "DROP TRIGGER IF EXISTS fio_runstore_suggestion_fts_au",
+    "DROP TABLE IF EXISTS fio_runstore_suggestion_fts",
+]
+
+
+def _has_fts5(connection):
+    with connection.cursor() as cursor:
+        cursor.execute("PRAGMA compile_options")
+        return "ENABLE_FTS5" in {row[0] for row in cursor.fetchall()}
+
+
+def create_fts(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite" or not _has_fts5(schema_editor.connection):
+        return
+    for sql in CREATE:
+        schema_editor.execute(sql)
+
+
+def drop_fts(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    for sql in DROP:
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("fio_runstore", "0004_run_peak_memory_bytes"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fts, drop_fts),
+    ]
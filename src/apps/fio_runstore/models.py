@@ -33,6 +33,18 @@ class Run(models.Model):
         help_text="Detected CSV delimiter",
     )
 
+    metrics = models.JSONField(
+        null=True,
+        blank=True,
+        help_text="Run metrics: rows read, per-generator timing and hit counters",
+    )
+
+    peak_memory_bytes = models.BigIntegerField(
+        null=True,
+        blank=True,
+        help_text="Peak process RSS during a memory-tracked run",
+    )
+
     def __str__(self):
         return f"Run #{self.id} ({self.created_at:%Y-%m-%d %H:%M:%S})"
 
@@ -162,3 +174,59 @@ class Suggestion(models.Model):
             f"Suggestion(run={self.run_id}, row={self.row_id}, "
             f"field={self.field_name}, value={self.suggested_value})"
         )
+
+
+class ProfileReport(models.Model):
+    """
+    A stored profiling report for a request or a run (opt-in, see profiling.py).
+    """
+
+    KIND_REQUEST = "request"
+    KIND_RUN = "run"
+    KIND_CHOICES = [
+        (KIND_REQUEST, "request"),
+        (KIND_RUN, "run"),
+    ]
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    kind = models.CharField(
+        max_length=20,
+        choices=KIND_CHOICES,
+    )
+
+    target = models.CharField(
+        max_length=500,
+        help_text="Profiled request (method + path) or run",
+    )
+
+    mode = models.CharField(
+        max_length=20,
+        help_text="Profiler: cprofile or sampling",
+    )
+
+    duration_seconds = models.FloatField(
+        help_text="Wall-clock duration of the profiled block",
+    )
+
+    report_file = models.FileField(
+        upload_to="profiles/",
+        max_length=500,
+        help_text=".prof (cProfile) or collapsed stacks (sampling)",
+    )
+
+    summary = models.TextField(
+        blank=True,
+        help_text="Top functions / stacks",
+    )
+
+    run = models.ForeignKey(
+        Run,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="profile_reports",
+    )
+
+    def __str__(self):
+        return f"Profile #{self.id} {self.kind} {self.target}"
@@ -0,0 +1,173 @@
+"""
+Staged run pipeline: reader -> analysis -> writer.
+
+The reader stage (Prefetcher) iterates the CSV rows in its own thread and
+hands them to the analysis loop in chunks through a bounded queue; the
+writer stage is the suggestion writer thread (db_writer), also behind a
+bounded queue. File reads, native parsing (pyarrow) and SQLite commits
+release the GIL, so they overlap with the analysis, and a full queue
+holds the faster stage back instead of buffering the whole file.
+
+Errors in the reader are re-raised in the analysis loop; leaving the
+Prefetcher (an error in the analysis, or an early exit) cancels the
+reader and joins its thread.
+
+chunk_rows and max_chunks can be lowered while the reader runs (a run
+under memory pressure shrinks the queue); chunks already queued are kept.
+
+Settings (settings.FIO_PIPELINE, see DEFAULTS):
+    ENABLED     False reads rows in the analysis thread
+    CHUNK_ROWS  rows per hand-over
+    MAX_CHUNKS  queue bound
+
+This module does not import Django.
+"""
+
+from __future__ import annotations
+
+import queue
+import threading
+from contextlib import nullcontext
+from typing import Iterable, Iterator, Optional
+
+from apps.fio_runstore.instrumentation import NULL_METRICS, RunMetrics
+
+
+DEFAULTS = {
+    "ENABLED": True,
+    "CHUNK_ROWS": 512,
+    "MAX_CHUNKS": 16,
+}
+
+STAGE_WAIT = "wait"  # analysis blocked on the reader
+
+_END = object()
+_PUT_TIMEOUT = 0.1  # seconds between cancellation checks of a blocked reader
+
+
+def pipeline_settings() -> dict:
+    from django.conf import settings
+
+    return {**DEFAULTS, **getattr(settings, "FIO_PIPELINE", {})}
+
+
+class _ReaderError:
+    __slots__ = ("exc",)
+
+    def __init__(self, exc: BaseException):
+        self.exc = exc
+
+
+class Prefetcher:
+    """
+    Iterates `source` in a reader thread.
+
+        with Prefetcher(reader, metrics=metrics) as rows:
+            for row in rows:
+                ...
+    """
+
+    def __init__(
+        self,
+        source: Iterable,
+        *,
+        chunk_rows: int = DEFAULTS["CHUNK_ROWS"],
+        max_chunks: int = DEFAULTS["MAX_CHUNKS"],
+        metrics: RunMetrics = NULL_METRICS,
+        name: str = "fio-reader",
+    ):
+        self._source = source
+        self._chunk_rows = chunk_rows
+        self._queue: queue.Queue = queue.Queue(maxsize=max_chunks)
+        self._cancelled = threading.Event()
+        self._metrics = metrics
+        self._thread = threading.Thread(target=self._produce, name=name, daemon=True)
+
+    @property
+    def chunk_rows(self) -> int:
+        return self._chunk_rows
+
+    @chunk_rows.setter
+    def chunk_rows(self, value: int) -> None:
+        self._chunk_rows = value  # read by the reader before each hand-over
+
+    @property
+    def max_chunks(self) -> int:
+        return self._queue.maxsize
+
+    @max_chunks.setter
+    def max_chunks(self, value: int) -> None:
+        with self._queue.mutex:
+            self._queue.maxsize = value
+
+    def __enter__(self) -> "Prefetcher":
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def _put(self, item) -> bool:
+        while not self._cancelled.is_set():
+            try:
+                self._queue.put(item, timeout=_PUT_TIMEOUT)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _produce(self) -> None:
+        it = iter(self._source)
+        try:
+            chunk = []
+            for item in it:
+                chunk.append(item)
+                if len(chunk) >= self._chunk_rows:
+                    if not self._put(chunk):
+                        return
+                    chunk = []
+            if chunk and not self._put(chunk):
+                return
+            self._put(_END)
+        except BaseException as e:
+            self._put(_ReaderError(e))
+        finally:
+            close = getattr(it, "close", None)
+            if close is not None:
+                close()
+
+    def __iter__(self) -> Iterator:
+        get = self._queue.get
+        metrics = self._metrics
+        while True:
+            with metrics.stage(STAGE_WAIT):
+                chunk = get()
+            if chunk is _END:
+                return
+            if isinstance(chunk, _ReaderError):
+                raise chunk.exc
+            yield from chunk
+
+    def close(self) -> None:
+        """
+        Cancel the reader and wait for its thread.
+        """
+        self._cancelled.set()
+        while self._thread.is_alive():
+            try:
+                self._queue.get(timeout=_PUT_TIMEOUT)
+            except queue.Empty:
+                pass
+        self._thread.join()
+
+
+def prefetch(source: Iterable, metrics: RunMetrics = NULL_METRICS, *, enabled: Optional[bool] = None):
+    """
+    Context manager giving the rows of `source`: a Prefetcher configured
+    from settings, or `source` itself when the pipeline is off.
+    """
+    conf = pipeline_settings()
+    if not (conf["ENABLED"] if enabled is None else enabled):
+        return nullcontext(source)
+    return Prefetcher(source, chunk_rows=conf["CHUNK_ROWS"], max_chunks=conf["MAX_CHUNKS"], metrics=metrics)
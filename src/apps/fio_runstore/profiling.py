@@ -0,0 +1,208 @@
+"""
+Opt-in profiling of requests and runs.
+
+Two modes:
+- "cprofile": deterministic cProfile; the report is a .prof file (pstats /
+  snakeviz) plus a text summary of the top functions;
+- "sampling": wall-clock sampler thread that records the stack of the
+  profiled thread every interval; the report is in collapsed-stack format
+  (one "frame;frame;frame count" line per stack, flamegraph-ready).
+
+Both modes cover only the thread that enters the Profiler. In a pipelined
+run (apps/fio_runstore/pipeline.py) that is the analysis loop: the CSV
+reader thread and the suggestion writer thread are not in the report, and
+their work shows up only as the time the analysis spends waiting on them
+(the "wait" and "write" stages of the run metrics).
+
+Reports go to default_storage under profiles/ and are registered as
+ProfileReport rows; old reports are pruned by count and age.
+"""
+
+from __future__ import annotations
+
+import cProfile
+import io
+import marshal
+import pstats
+import sys
+import threading
+import time
+from datetime import timedelta
+from typing import Optional
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.utils import timezone
+
+
+MODE_CPROFILE = "cprofile"
+MODE_SAMPLING = "sampling"
+MODES = (MODE_CPROFILE, MODE_SAMPLING)
+
+DEFAULTS = {
+    "ENABLED": False,
+    "MODE": MODE_CPROFILE,
+    # Requests: always profile these paths, or any path with ?<QUERY_PARAM>=1 (staff only)
+    "PATHS": [],
+    "QUERY_PARAM": "_profile",
+    "SAMPLE_INTERVAL": 0.005,
+    "SUMMARY_LINES": 40,
+    "MAX_REPORTS": 50,
+    "MAX_AGE_DAYS": 14,
+}
+
+
+def profiling_settings() -> dict:
+    return {**DEFAULTS, **getattr(settings, "FIO_PROFILING", {})}
+
+
+class _Sampler:
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.counts: dict[str, int] = {}
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._loop, name="fio-profile-sampler", daemon=True)
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_filename}:{code.co_name}:{code.co_firstlineno}")
+                frame = frame.f_back
+            key = ";".join(reversed(stack))
+            self.counts[key] = self.counts.get(key, 0) + 1
+            self.samples += 1
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+
+class Profiler:
+    """
+    Context manager profiling the current thread.
+
+        with Profiler(MODE_SAMPLING) as p:
+            ...
+        report = p.report()  # (filename suffix, bytes, text summary)
+
+    If another profiler is already active (cProfile cannot nest), profiling
+    is silently skipped and report() returns None.
+    """
+
+    def __init__(self, mode: str = MODE_CPROFILE, *, interval: Optional[float] = None):
+        if mode not in MODES:
+            raise ValueError(f"Unknown profiling mode: {mode}")
+        self.mode = mode
+        self.interval = interval or profiling_settings()["SAMPLE_INTERVAL"]
+        self.duration = 0.0
+        self._profile: Optional[cProfile.Profile] = None
+        self._sampler: Optional[_Sampler] = None
+        self._started = 0.0
+
+    def __enter__(self):
+        if self.mode == MODE_CPROFILE:
+            profile = cProfile.Profile()
+            try:
+                profile.enable()
+            except ValueError:
+                profile = None
+            self._profile = profile
+        else:
+            self._sampler = _Sampler(threading.get_ident(), self.interval)
+            self._sampler.start()
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.duration = time.perf_counter() - self._started
+        if self._profile is not None:
+            self._profile.disable()
+        if self._sampler is not None:
+            self._sampler.stop()
+        return False
+
+    def report(self, summary_lines: Optional[int] = None) -> Optional[tuple[str, bytes, str]]:
+        summary_lines = summary_lines or profiling_settings()["SUMMARY_LINES"]
+        if self._profile is not None:
+            self._profile.create_stats()
+            # Same format as Profile.dump_stats(); must be taken before pstats consumes .stats
+            payload = marshal.dumps(self._profile.stats)
+            out = io.StringIO()
+            pstats.Stats(self._profile, stream=out).sort_stats("cumulative").print_stats(summary_lines)
+            return ".prof", payload, out.getvalue()
+
+        if self._sampler is not None:
+            ordered = sorted(self._sampler.counts.items(), key=lambda kv: -kv[1])
+            body = "\n".join(f"{stack} {count}" for stack, count in ordered)
+            top = "\n".join(
+                f"{count:>7}  {stack.rsplit(';', 1)[-1]}" for stack, count in ordered[:summary_lines]
+            )
+            summary = f"{self._sampler.samples} samples, interval {self.interval}s\n{top}"
+            return ".collapsed.txt", body.encode("utf-8"), summary
+
+        return None
+
+
+def save_profile_report(profiler: Profiler, *, kind: str, target: str, run=None):
+    """
+    Store the profiler report and register it; returns the ProfileReport or None.
+    """
+    from apps.fio_runstore.models import ProfileReport
+
+    report = profiler.report()
+    if report is None:
+        return None
+    suffix, payload, summary = report
+
+    stamp = timezone.now().strftime("%Y%m%d_%H%M%S_%f")
+    safe_target = "".join(ch if ch.isalnum() else "_" for ch in target).strip("_")[:60] or kind
+    name = f"{stamp}_{kind}_{safe_target}{suffix}"
+
+    obj = ProfileReport(
+        kind=kind,
+        target=target[:500],
+        mode=profiler.mode,
+        duration_seconds=profiler.duration,
+        summary=summary,
+        run=run,
+    )
+    obj.report_file.save(name, ContentFile(payload), save=False)
+    obj.save()
+
+    prune_profile_reports()
+    return obj
+
+
+def prune_profile_reports() -> int:
+    """
+    Retention: keep at most MAX_REPORTS reports, none older than MAX_AGE_DAYS.
+    Returns the number of deleted reports.
+    """
+    from apps.fio_runstore.models import ProfileReport
+
+    conf = profiling_settings()
+    expired = set(
+        ProfileReport.objects.filter(
+            created_at__lt=timezone.now() - timedelta(days=conf["MAX_AGE_DAYS"])
+        ).values_list("id", flat=True)
+    )
+    expired.update(
+        ProfileReport.objects.order_by("-created_at", "-id").values_list("id", flat=True)[conf["MAX_REPORTS"]:]
+    )
+
+    deleted = 0
+    for obj in ProfileReport.objects.filter(id__in=expired):
+        obj.report_file.delete(save=False)
+        obj.delete()
+        deleted += 1
+    return deleted
@@ -0,0 +1,334 @@
+"""
+Prometheus-style metrics (text exposition format, no client library).
+
+Every process keeps its own counters, gauges and histograms in memory. If
+settings.FIO_PROMETHEUS_DIR is set, the process state is also written (at
+most every FLUSH_INTERVAL seconds, atomically) to <dir>/<pid>.json, and the
+/metrics view sums the files of all workers:
+- counters and histograms of exited workers are kept (they are cumulative);
+- gauges of exited workers are dropped (in-flight runs, queue depth);
+- PER_PROCESS_GAUGES are not summed but shown per worker, with a pid label.
+
+A file is tagged with the instance id of the process that wrote it. When a
+new process gets the PID of an exited worker, its first flush moves the old
+file to <dir>/<pid>-<instance>.json (without its gauges) instead of
+overwriting the exited worker's counters.
+
+Without a directory /metrics only shows the serving process.
+
+Caches are registered with register_cache(name, cache_info); cache_info
+returns an object with .hits/.misses (functools.lru_cache().cache_info()
+fits) and is read at flush time.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import os
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Callable, Optional
+
+
+# name -> (type, help)
+METRICS = {
+    "fio_request_duration_seconds": ("histogram", "View latency in seconds."),
+    "fio_runs_total": ("counter", "Finished suggestion runs."),
+    "fio_run_rows_total": ("counter", "CSV rows read by suggestion runs."),
+    "fio_run_seconds_total": ("counter", "Wall time spent in suggestion runs."),
+    "fio_run_rows_per_second": ("gauge", "Throughput of the last finished run, per worker (pid label)."),
+    "fio_runs_in_flight": ("gauge", "Suggestion runs in progress."),
+    "fio_queue_depth": ("gauge", "Items waiting in an internal queue."),
+    "fio_cache_hits_total": ("counter", "Cache hits."),
+    "fio_cache_misses_total": ("counter", "Cache misses."),
+    "fio_cache_hit_ratio": ("gauge", "hits / (hits + misses) over all workers."),
+}
+
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+FLUSH_INTERVAL = 1.0
+
+# Gauges that make no sense summed over workers
+PER_PROCESS_GAUGES = frozenset({"fio_run_rows_per_second"})
+
+CACHE_HITS = "fio_cache_hits_total"
+CACHE_MISSES = "fio_cache_misses_total"
+
+
+def _key(name: str, labels: dict) -> tuple:
+    return (name, tuple(sorted((k, str(v)) for k, v in labels.items())))
+
+
+class _Registry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters: dict[tuple, float] = {}
+        self.gauges: dict[tuple, float] = {}
+        # key -> [count per bucket (non-cumulative, +Inf last), sum]
+        self.histograms: dict[tuple, list] = {}
+        self.caches: dict[str, Callable] = {}
+        self.last_flush = 0.0
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            counters = dict(self.counters)
+            gauges = dict(self.gauges)
+            histograms = {k: [list(v[0]), v[1]] for k, v in self.histograms.items()}
+            caches = dict(self.caches)
+        for cache_name, cache_info in caches.items():
+            try:
+                info = cache_info()
+            except Exception:  # a cache must never break the scrape
+                continue
+            for name, value in ((CACHE_HITS, info.hits), (CACHE_MISSES, info.misses)):
+                key = _key(name, {"cache": cache_name})
+                counters[key] = counters.get(key, 0) + value
+        return {
+            "pid": os.getpid(),
+            "instance": _instance_id(),
+            "counters": [[n, list(map(list, l)), v] for (n, l), v in counters.items()],
+            "gauges": [[n, list(map(list, l)), v] for (n, l), v in gauges.items()],
+            "histograms": [[n, list(map(list, l)), b, s] for (n, l), (b, s) in histograms.items()],
+        }
+
+
+_registry = _Registry()
+
+# (pid, instance id) of this process; a forked child gets a new one
+_instance: Optional[tuple[int, str]] = None
+# PID whose <pid>.json this process has taken over (see _claim)
+_claimed_pid: Optional[int] = None
+_claim_lock = threading.Lock()
+
+
+def _instance_id() -> str:
+    global _instance
+    pid = os.getpid()
+    if _instance is None or _instance[0] != pid:
+        _instance = (pid, uuid.uuid4().hex)
+    return _instance[1]
+
+
+def _metrics_dir() -> Optional[Path]:
+    from django.conf import settings
+
+    value = getattr(settings, "FIO_PROMETHEUS_DIR", None)
+    return Path(value) if value else None
+
+
+# --- recording -------------------------------------------------------------
+
+
+def inc_counter(name: str, value: float = 1, **labels) -> None:
+    key = _key(name, labels)
+    with _registry.lock:
+        _registry.counters[key] = _registry.counters.get(key, 0) + value
+    _maybe_flush()
+
+
+def set_gauge(name: str, value: float, **labels) -> None:
+    with _registry.lock:
+        _registry.gauges[_key(name, labels)] = value
+    _maybe_flush()
+
+
+def inc_gauge(name: str, delta: float = 1, **labels) -> None:
+    key = _key(name, labels)
+    with _registry.lock:
+        _registry.gauges[key] = _registry.gauges.get(key, 0) + delta
+    _maybe_flush()
+
+
+def observe(name: str, value: float, buckets=LATENCY_BUCKETS, **labels) -> None:
+    key = _key(name, labels)
+    with _registry.lock:
+        hist = _registry.histograms.get(key)
+        if hist is None:
+            hist = _registry.histograms[key] = [[0] * (len(buckets) + 1), 0.0]
+        for i, bound in enumerate(buckets):
+            if value <= bound:
+                break
+        else:
+            i = len(buckets)
+        hist[0][i] += 1
+        hist[1] += value
+    _maybe_flush()
+
+
+def register_cache(name: str, cache_info: Callable) -> None:
+    """
+    Export hits/misses of a cache; cache_info() returns .hits and .misses.
+    """
+    with _registry.lock:
+        _registry.caches[name] = cache_info
+
+
+def reset() -> None:
+    """
+    Forget the in-process state (tests).
+    """
+    global _registry
+    caches = _registry.caches
+    _registry = _Registry()
+    _registry.caches = caches
+
+
+# --- multi-process files ---------------------------------------------------
+
+
+def _write_atomic(path: Path, data: dict) -> None:
+    tmp = path.with_suffix(f".json.{threading.get_ident()}.tmp")
+    tmp.write_text(json.dumps(data), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def _claim(path: Path) -> None:
+    """
+    Before the first write of this process to `path`: keep the counters of
+    an exited process that had the same PID under another name.
+    """
+    global _claimed_pid
+    pid = os.getpid()
+    with _claim_lock:
+        if _claimed_pid == pid:
+            return
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            data = None
+        except (OSError, ValueError):
+            data = None  # unreadable: nothing to keep
+        if data is not None and data.get("instance") != _instance_id():
+            retired = data.get("instance") or uuid.uuid4().hex  # files written before instance ids
+            _write_atomic(path.with_name(f"{pid}-{retired}.json"), {**data, "gauges": []})
+        _claimed_pid = pid
+
+
+def flush() -> None:
+    """
+    Write this process state to <FIO_PROMETHEUS_DIR>/<pid>.json.
+    """
+    directory = _metrics_dir()
+    _registry.last_flush = time.monotonic()
+    if directory is None:
+        return
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"{os.getpid()}.json"
+    _claim(path)
+    _write_atomic(path, _registry.snapshot())
+
+
+def _maybe_flush() -> None:
+    if time.monotonic() - _registry.last_flush >= FLUSH_INTERVAL:
+        try:
+            flush()
+        except OSError:
+            pass  # metrics must not break the request; retried on next update
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _load_snapshots() -> list[dict]:
+    directory = _metrics_dir()
+    if directory is None or not directory.is_dir():
+        return [_registry.snapshot()]
+    flush()
+    snapshots = []
+    for path in sorted(directory.glob("*.json")):
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            continue  # being replaced or truncated
+        if not _pid_alive(int(data.get("pid", 0))):
+            data["gauges"] = []
+        snapshots.append(data)
+    return snapshots
+
+
+# --- exposition -------------------------------------------------------------
+
+
+def _format_labels(labels) -> str:
+    if not labels:
+        return ""
+    parts = []
+    for k, v in labels:
+        v = str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        parts.append(f'{k}="{v}"')
+    return "{" + ",".join(parts) + "}"
+
+
+def _format_value(value: float) -> str:
+    if isinstance(value, float) and math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def render_text(buckets=LATENCY_BUCKETS) -> str:
+    """
+    Aggregated metrics of all workers in the Prometheus text format (0.0.4).
+    """
+    counters: dict[tuple, float] = {}
+    gauges: dict[tuple, float] = {}
+    histograms: dict[tuple, list] = {}
+    for snap in _load_snapshots():
+        for name, labels, value in snap.get("counters", []):
+            key = (name, tuple(map(tuple, labels)))
+            counters[key] = counters.get(key, 0) + value
+        for name, labels, value in snap.get("gauges", []):
+            labels = tuple(map(tuple, labels))
+            if name in PER_PROCESS_GAUGES:
+                gauges[(name, labels + (("pid", str(snap.get("pid", 0))),))] = value
+                continue
+            key = (name, labels)
+            gauges[key] = gauges.get(key, 0) + value
+        for name, labels, counts, total in snap.get("histograms", []):
+            key = (name, tuple(map(tuple, labels)))
+            hist = histograms.setdefault(key, [[0] * len(counts), 0.0])
+            hist[0] = [a + b for a, b in zip(hist[0], counts)]
+            hist[1] += total
+
+    # Derived: hit ratio per cache
+    hits = {dict(l)["cache"]: v for (n, l), v in counters.items() if n == CACHE_HITS}
+    misses = {dict(l)["cache"]: v for (n, l), v in counters.items() if n == CACHE_MISSES}
+    for cache_name in sorted(set(hits) | set(misses)):
+        lookups = hits.get(cache_name, 0) + misses.get(cache_name, 0)
+        if lookups:
+            gauges[("fio_cache_hit_ratio", (("cache", cache_name),))] = hits.get(cache_name, 0) / lookups
+
+    samples: dict[str, list[str]] = {}
+    for (name, labels), value in sorted(counters.items()):
+        samples.setdefault(name, []).append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+    for (name, labels), value in sorted(gauges.items()):
+        samples.setdefault(name, []).append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+    for (name, labels), (counts, total) in sorted(histograms.items()):
+        lines = samples.setdefault(name, [])
+        cumulative = 0
+        for bound, count in zip(list(buckets) + [math.inf], counts):
+            cumulative += count
+            le = labels + (("le", _format_value(float(bound))),)
+            lines.append(f"{name}_bucket{_format_labels(le)} {cumulative}")
+        lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(total)}")
+        lines.append(f"{name}_count{_format_labels(labels)} {cumulative}")
+
+    out = []
+    for name, (metric_type, help_text) in METRICS.items():
+        out.append(f"# HELP {name} {help_text}")
+        out.append(f"# TYPE {name} {metric_type}")
+        out.extend(samples.pop(name, []))
+    for name, lines in sorted(samples.items()):
+        out.append(f"# TYPE {name} untyped")
+        out.extend(lines)
+    return "\n".join(out) + "\n"
@@ -0,0 +1,209 @@
+"""
+Retention: expired runs, orphaned uploads, database compaction.
+
+Runs are deleted with set-based statements, CHUNK_ROWS suggestions per
+statement (DELETE ... WHERE id IN (SELECT id ... LIMIT n)); no model
+instances are loaded, and each chunk is its own short transaction, so
+concurrent runs can write in between.
+
+An upload (MEDIA_ROOT/uploads/) is orphaned when no run refers to it and
+it is older than UPLOAD_MAX_AGE_DAYS (which should exceed the session
+age, so files of users who have not started a run yet are kept). Its
+sidecar indexes (<upload>.rows.idx, <upload>.preview-<16 hex>.idx) go
+with it. A file is only taken for a sidecar when its upload is there too:
+uploads keep the user's file name, so one may well end in ".rows.idx",
+and a sidecar left without its upload ages out like an upload.
+
+Settings (settings.FIO_RETENTION, see DEFAULTS):
+    RUN_MAX_AGE_DAYS     runs older than this are deleted (None: keep)
+    KEEP_RUNS            the latest N runs are always kept
+    UPLOAD_MAX_AGE_DAYS  orphaned uploads older than this are deleted (None: keep)
+    CHUNK_ROWS           suggestions per DELETE statement
+    VACUUM               None, "incremental" or "full" (SQLite)
+
+Used by `manage.py fio_retention` and the Run admin.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+from datetime import timedelta
+from typing import Iterable, Optional
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import connection
+from django.db.models import Subquery
+from django.utils import timezone
+
+from apps.fio_runstore.models import Run, Suggestion
+from apps.fio_runstore.profiling import prune_profile_reports
+from apps.fio_runstore.search import FTS_TABLE, fts_available
+
+
+DEFAULTS = {
+    "RUN_MAX_AGE_DAYS": 90,
+    "KEEP_RUNS": 20,
+    "UPLOAD_MAX_AGE_DAYS": 30,
+    "CHUNK_ROWS": 20_000,
+    "VACUUM": "incremental",
+}
+
+UPLOADS_DIR = "uploads"
+# <upload>.rows.idx, <upload>.preview-<key>.idx: see uploads/row_index.py, uploads/preview_index.py
+SIDECAR_RE = re.compile(r"(?P<upload>.+)\.(?:rows|preview-[0-9a-f]{16})\.idx")
+VACUUM_MODES = ("incremental", "full")
+INCREMENTAL_VACUUM_PAGES = 100_000
+
+
+def retention_settings() -> dict:
+    return {**DEFAULTS, **getattr(settings, "FIO_RETENTION", {})}
+
+
+def expired_run_ids(max_age_days: Optional[int], keep_runs: int = 0) -> list[int]:
+    """
+    Runs created more than max_age_days ago, except the latest keep_runs.
+    """
+    if max_age_days is None:
+        return []
+    kept = Run.objects.order_by("-id").values_list("id", flat=True)[:keep_runs]
+    return list(
+        Run.objects.filter(created_at__lt=timezone.now() - timedelta(days=max_age_days))
+        .exclude(id__in=list(kept))
+        .values_list("id", flat=True)
+    )
+
+
+def delete_runs(run_ids: Iterable[int], chunk_rows: Optional[int] = None) -> dict:
+    """
+    Delete runs with their suggestions without loading them.
+    Returns {"runs": n, "suggestions": n}.
+    """
+    run_ids = list(run_ids)
+    chunk_rows = chunk_rows or retention_settings()["CHUNK_ROWS"]
+    deleted = {"runs": 0, "suggestions": 0}
+    if not run_ids:
+        return deleted
+
+    suggestions = Suggestion.objects.filter(run_id__in=run_ids)
+    while True:
+        # Suggestion has no dependents, so delete() is a single DELETE (no collection)
+        n, _ = Suggestion.objects.filter(id__in=Subquery(suggestions.values("id")[:chunk_rows])).delete()
+        deleted["suggestions"] += n
+        if n < chunk_rows:
+            break
+    # Only the runs (profile reports are SET_NULL) are left
+    deleted["runs"] = Run.objects.filter(id__in=run_ids).delete()[1].get(Run._meta.label, 0)
+    return deleted
+
+
+def _upload_of(name: str) -> Optional[str]:
+    """
+    The upload a file named like a sidecar index belongs to, or None.
+    """
+    m = SIDECAR_RE.fullmatch(name)
+    return m["upload"] if m else None
+
+
+def orphaned_uploads(max_age_days: Optional[int]) -> list[str]:
+    """
+    Storage names of orphaned uploads and of their sidecar files.
+    """
+    if max_age_days is None:
+        return []
+    try:
+        _, files = default_storage.listdir(UPLOADS_DIR)
+    except FileNotFoundError:
+        return []
+    names = {f"{UPLOADS_DIR}/{f}" for f in files}
+    # sidecar -> its upload, for sidecars whose upload is there
+    sidecars = {n: upload for n in names if (upload := _upload_of(n)) in names}
+    uploads = names - sidecars.keys()
+    referenced = set(Run.objects.filter(source_csv_path__in=uploads).values_list("source_csv_path", flat=True))
+    cutoff = timezone.now() - timedelta(days=max_age_days)
+
+    removed = {n for n in uploads - referenced if default_storage.get_modified_time(n) < cutoff}
+    for n in sorted(sidecars, key=len):  # an upload before the sidecars of its name
+        if sidecars[n] in removed:
+            removed.add(n)
+    return sorted(removed)
+
+
+def delete_uploads(names: Iterable[str]) -> dict:
+    deleted = {"files": 0, "bytes": 0}
+    for name in names:
+        try:
+            size = default_storage.size(name)
+            default_storage.delete(name)
+        except FileNotFoundError:
+            continue
+        deleted["files"] += 1
+        deleted["bytes"] += size
+    return deleted
+
+
+def vacuum(mode: str) -> None:
+    """
+    Give the space of deleted rows back to the filesystem (SQLite only).
+
+    "incremental" switches the database to auto_vacuum=INCREMENTAL on the
+    first call (a one-time full VACUUM) and afterwards frees up to
+    INCREMENTAL_VACUUM_PAGES free pages per call; "full" rebuilds the file.
+    Also merges the search index and truncates the WAL.
+    """
+    if mode not in VACUUM_MODES:
+        raise ValueError(f"Unknown vacuum mode: {mode}")
+    if connection.vendor != "sqlite":
+        return
+    with connection.cursor() as cursor:
+        if fts_available():
+            cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('optimize')")
+        cursor.execute("PRAGMA auto_vacuum")
+        incremental = cursor.fetchone()[0] == 2
+        if mode == "incremental" and incremental:
+            cursor.execute(f"PRAGMA incremental_vacuum({INCREMENTAL_VACUUM_PAGES})")
+            cursor.fetchall()
+        else:
+            if mode == "incremental":
+                cursor.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            cursor.execute("VACUUM")
+        cursor.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+
+def database_size() -> Optional[int]:
+    """
+    Size of the SQLite database file (and its WAL) in bytes, or None.
+    """
+    if connection.vendor != "sqlite":
+        return None
+    path = str(connection.settings_dict["NAME"])
+    return sum(os.path.getsize(p) for p in (path, path + "-wal") if os.path.exists(p))
+
+
+def apply_retention(overrides: Optional[dict] = None, *, dry_run: bool = False) -> dict:
+    """
+    Apply the retention policy (settings, updated with `overrides`).
+    Returns what was (or, with dry_run, would be) deleted.
+    """
+    conf = {**retention_settings(), **(overrides or {})}
+    run_ids = expired_run_ids(conf["RUN_MAX_AGE_DAYS"], conf["KEEP_RUNS"])
+    if dry_run:
+        # Uploads of the expired runs become orphaned only once the runs are gone
+        return {
+            "runs": len(run_ids),
+            "suggestions": Suggestion.objects.filter(run_id__in=run_ids).count(),
+            "uploads": orphaned_uploads(conf["UPLOAD_MAX_AGE_DAYS"]),
+        }
+
+    result = delete_runs(run_ids, conf["CHUNK_ROWS"])
+    uploads = orphaned_uploads(conf["UPLOAD_MAX_AGE_DAYS"])
+    result["uploads"] = uploads
+    result["upload_bytes"] = delete_uploads(uploads)["bytes"]
+    result["profile_reports"] = prune_profile_reports()
+    if conf["VACUUM"]:
+        before = database_size()
+        vacuum(conf["VACUUM"])
+        if before is not None:
+            result["database_bytes"] = {"before": before, "after": database_size()}
+    return result
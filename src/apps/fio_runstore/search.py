@@ -0,0 +1,49 @@
+"""
+Full-text search over Suggestion.before_value / suggested_value.
+
+On SQLite the values are indexed in an FTS5 table (migration 0005),
+kept in sync with fio_runstore_suggestion by triggers; the admin search
+uses it instead of LIKE '%...%' over the whole table. Every word of the
+search term matches as a word prefix, case-insensitively (Cyrillic
+included): "иван" finds "Иванов Иван".
+
+Other databases (and SQLite builds without FTS5) keep Django's search.
+"""
+
+from __future__ import annotations
+
+from typing import Optional
+
+from django.db import connection
+from django.db.models.expressions import RawSQL
+
+
+FTS_TABLE = "fio_runstore_suggestion_fts"
+
+
+def fts_available() -> bool:
+    if connection.vendor != "sqlite":
+        return False
+    return FTS_TABLE in connection.introspection.table_names()
+
+
+def fts_query(search_term: str) -> Optional[str]:
+    """
+    FTS5 MATCH expression: all words, each as a quoted prefix.
+    None for a term without words.
+    """
+    words = [w.replace('"', '""') for w in search_term.split()]
+    if not words:
+        return None
+    return " AND ".join(f'"{w}"*' for w in words)
+
+
+def matching_ids(search_term: str) -> Optional[RawSQL]:
+    """
+    Subquery of matching suggestion ids, for .filter(id__in=...);
+    None when the term has no words.
+    """
+    query = fts_query(search_term)
+    if query is None:
+        return None
+    return RawSQL(f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s", [query])
@@ -0,0 +1,38 @@
+"""
+SQLite connection tuning, applied to every new connection
+(connected to django.db.backends.signals.connection_created in apps.py).
+
+WAL lets readers (admin, preview pages) run while a run writes, and
+busy_timeout makes writers from other processes wait for the lock instead
+of failing with "database is locked". synchronous=NORMAL is durable in WAL
+mode except for the last transactions on power loss.
+
+settings.FIO_SQLITE_PRAGMAS overrides DEFAULT_PRAGMAS; a None value drops
+a pragma.
+"""
+
+from __future__ import annotations
+
+
+DEFAULT_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "busy_timeout": 20_000,  # ms
+    "temp_store": "MEMORY",
+    "cache_size": -64_000,  # KiB
+}
+
+
+def sqlite_pragmas() -> dict:
+    from django.conf import settings
+
+    pragmas = {**DEFAULT_PRAGMAS, **getattr(settings, "FIO_SQLITE_PRAGMAS", {})}
+    return {name: value for name, value in pragmas.items() if value is not None}
+
+
+def configure_sqlite_connection(sender, connection, **kwargs) -> None:
+    if connection.vendor != "sqlite":
+        return
+    with connection.cursor() as cursor:
+        for name, value in sqlite_pragmas().items():
+            cursor.execute(f"PRAGMA {name} = {value}")
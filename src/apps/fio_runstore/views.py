@@ -1,3 +1,17 @@
-from django.shortcuts import render
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
 
-# Create your views here.
+from apps.fio_runstore import prometheus
+
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def metrics(request):
+    """
+    Prometheus scrape endpoint; only served to settings.FIO_METRICS_ALLOWED_IPS.
+    """
+    allowed = getattr(settings, "FIO_METRICS_ALLOWED_IPS", ["127.0.0.1", "::1"])
+    if request.META.get("REMOTE_ADDR") not in allowed:
+        return HttpResponseForbidden()
+    return HttpResponse(prometheus.render_text(), content_type=PROMETHEUS_CONTENT_TYPE)
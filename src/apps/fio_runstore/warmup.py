@@ -0,0 +1,95 @@
+"""
+Warm-up: load the names dictionary and build everything derived from it
+before the first run needs it.
+
+warm_up() parses names.csv into the process-wide cache
+(get_name_dictionary), builds the typo index, imports and instantiates the
+generators and runs the domain code once on a few sample values (lazy
+tables, compiled patterns). Called from FioRunstoreConfig.ready() when
+settings.FIO_WARMUP["ENABLED"] is set: under `gunicorn --preload` that
+happens in the master before it forks, so the workers share the loaded
+structures as copy-on-write pages. FREEZE_GC then moves everything loaded
+so far out of the collector's reach (gc.freeze()), so collections in the
+workers do not write to (and copy) those pages.
+
+The CLI (apps/fio_runstore/cli.py) warms each pool worker once before its
+first file.
+
+Settings (settings.FIO_WARMUP, see DEFAULTS):
+    ENABLED    warm up in FioRunstoreConfig.ready()
+    FREEZE_GC  gc.freeze() after the warm-up
+
+This module does not import Django.
+"""
+
+from __future__ import annotations
+
+import gc
+import logging
+import time
+from pathlib import Path
+
+from apps.fio_runstore.generator.name_dictionary import DEFAULT_NAMES_CSV_PATH, get_name_dictionary
+from apps.fio_runstore.generator.registry import ValueInfo, build_generators
+from domain.fio.quality_checks import detect_warnings
+
+
+DEFAULTS = {
+    "ENABLED": False,
+    "FREEZE_GC": True,
+}
+
+# One value per code path: clean, latin, homoglyphs/digits, typo, punctuation
+SAMPLE_VALUES = ("Иванов Иван Иванович", "Ivanov Ivan", "Ив4нов Иbан", "Алексанр", "«сидоров»,  пётр")
+
+logger = logging.getLogger(__name__)
+
+
+def warmup_settings() -> dict:
+    from django.conf import settings
+
+    return {**DEFAULTS, **getattr(settings, "FIO_WARMUP", {})}
+
+
+def warm_up(csv_path: str | Path = DEFAULT_NAMES_CSV_PATH, *, freeze_gc: bool = False) -> dict:
+    """
+    Returns {"seconds", "dictionary_hash", "names"}.
+    Raises FileNotFoundError / ValueError for a missing or invalid dictionary.
+    """
+    started = time.perf_counter()
+    name_dictionary = get_name_dictionary(csv_path=Path(csv_path))
+    name_dictionary.typo_index  # noqa: B018 - built on first access
+
+    generators = build_generators(name_dictionary)
+    for value in SAMPLE_VALUES:
+        detect_warnings(value)
+        info = ValueInfo(value)
+        info.normalized, info.flags  # noqa: B018 - computed on first access
+        for g in generators:
+            if g.accepts(info):
+                g.suggest(info)
+
+    if freeze_gc:
+        gc.collect()
+        gc.freeze()
+    return {
+        "seconds": round(time.perf_counter() - started, 6),
+        "dictionary_hash": name_dictionary.meta.sha256,
+        "names": len(name_dictionary.canonical_names),
+    }
+
+
+def warm_up_from_settings() -> None:
+    """
+    FioRunstoreConfig.ready(): warm up if enabled. A missing or broken
+    dictionary is logged, not raised: runs report it themselves.
+    """
+    conf = warmup_settings()
+    if not conf["ENABLED"]:
+        return
+    try:
+        result = warm_up(freeze_gc=conf["FREEZE_GC"])
+    except (FileNotFoundError, ValueError) as e:
+        logger.warning("FIO warm-up skipped: %s", e)
+        return
+    logger.info("FIO warm-up: %s", result)
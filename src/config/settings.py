@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -50,6 +51,7 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "apps.fio_runstore.middleware.ProfilingMiddleware",
 ]
 
 ROOT_URLCONF = "config.urls"
@@ -124,3 +126,78 @@ from pathlib import Path
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+
+# FIO runs: per-stage timers and counters (Run.metrics, preview logging)
+FIO_METRICS_ENABLED = True
+
+# /metrics (Prometheus text format). With several workers point
+# FIO_PROMETHEUS_DIR at a directory shared by them (cleared on deploy);
+# without it every worker only reports itself.
+FIO_PROMETHEUS_DIR = os.environ.get("FIO_PROMETHEUS_DIR") or None
+FIO_METRICS_ALLOWED_IPS = ["127.0.0.1", "::1"]
+
+# Full CSV passes over local files (FileSystemStorage) use a memory map and
+# decode only the selected columns; False forces the streamed csv.reader.
+FIO_CSV_MMAP = True
+# Parser for full CSV passes: "pyarrow" (native, multithreaded; optional
+# dependency), "python" (stdlib) or "auto" (pyarrow when installed).
+FIO_CSV_BACKEND = "auto"
+
+# Column metrics of the upload page (uploads/column_profile.py): one pass
+# over the whole file inside the request. MAX_ROWS caps it; the page then
+# labels the metrics as covering the first rows only.
+FIO_COLUMN_PROFILE = {
+    "MAX_ROWS": None,
+}
+
+# Memory-bounded runs (apps/fio_runstore/memory.py): per-stage tracemalloc /
+# RSS samples; buffers shrink when usage approaches the budget.
+FIO_MEMORY = {
+    "ENABLED": False,
+    "BUDGET_MB": 512,
+    "TRACEMALLOC": True,
+}
+
+# SQLite: one writer thread per process commits the suggestion batches of
+# all runs (apps/fio_runstore/db_writer.py); connections use WAL and a busy
+# timeout (apps/fio_runstore/sqlite.py, override with FIO_SQLITE_PRAGMAS).
+FIO_DB_WRITER = {
+    "ENABLED": True,
+    "MAX_QUEUED_BATCHES": 64,
+    "MAX_ROWS_PER_COMMIT": 20_000,
+}
+
+# Runs read rows in a separate thread (apps/fio_runstore/pipeline.py), so
+# file reads and parsing overlap with the analysis.
+FIO_PIPELINE = {
+    "ENABLED": True,
+    "CHUNK_ROWS": 512,
+    "MAX_CHUNKS": 16,
+}
+
+# Retention policy (apps/fio_runstore/retention.py), applied by
+# `manage.py fio_retention` (e.g. from cron) and the Run admin action.
+FIO_RETENTION = {
+    "RUN_MAX_AGE_DAYS": 90,
+    "KEEP_RUNS": 20,
+    "UPLOAD_MAX_AGE_DAYS": 30,
+    "CHUNK_ROWS": 20_000,
+    "VACUUM": "incremental",
+}
+
+# Load names.csv and build its indexes in AppConfig.ready(); with
+# `gunicorn --preload` the workers then share them. See apps/fio_runstore/warmup.py.
+FIO_WARMUP = {
+    "ENABLED": False,
+    "FREEZE_GC": True,
+}
+
+# Opt-in profiling of requests and runs; reports are listed in the admin.
+# See apps/fio_runstore/profiling.py for all keys.
+FIO_PROFILING = {
+    "ENABLED": False,
+    "MODE": "cprofile",  # or "sampling"
+    "PATHS": [],  # e.g. ["/normalize-preview/"]
+    "MAX_REPORTS": 50,
+    "MAX_AGE_DAYS": 14,
+}
@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+from typing import Any, Iterable, Optional
+
+from .constants import FLAG_NAME_PATRONYMIC_MISMATCH, GENDER_FEMALE, GENDER_MALE
+
+
+# Male names ending in -а/-я and female names ending in a consonant/-ь.
+_MALE_NAMES_VOWEL_ENDING = {
+    "данила",
+    "илья",
+    "кузьма",
+    "лука",
+    "никита",
+    "савва",
+    "фома",
+}
+_FEMALE_NAMES_CONSONANT_ENDING = {
+    "любовь",
+}
+
+# Patronymic endings -> gender. Looked up from the longest ending down,
+# so each value costs at most len(_PATRONYMIC_SUFFIX_LENGTHS) dict hits.
+_PATRONYMIC_SUFFIXES = {
+    "ович": GENDER_MALE,
+    "евич": GENDER_MALE,
+    "ьич": GENDER_MALE,  # Ильич, Кузьмич
+    "ич": GENDER_MALE,  # Никитич, Лукич
+    "оглы": GENDER_MALE,
+    "улы": GENDER_MALE,
+    "овна": GENDER_FEMALE,
+    "евна": GENDER_FEMALE,
+    "ична": GENDER_FEMALE,
+    "инична": GENDER_FEMALE,
+    "кызы": GENDER_FEMALE,
+}
+_PATRONYMIC_SUFFIX_LENGTHS = sorted({len(s) for s in _PATRONYMIC_SUFFIXES}, reverse=True)
+
+
+def guess_gender_by_name(canonical: Any) -> Optional[str]:
+    """
+    Gender of a canonical first name by its ending (with known exceptions).
+    """
+    if not canonical:
+        return None
+    s = str(canonical).strip().lower()
+    if not s:
+        return None
+    if s in _MALE_NAMES_VOWEL_ENDING:
+        return GENDER_MALE
+    if s in _FEMALE_NAMES_CONSONANT_ENDING:
+        return GENDER_FEMALE
+    return GENDER_FEMALE if s[-1] in "ая" else GENDER_MALE
+
+
+def build_name_gender_table(pairs: Iterable[tuple[str, str]]) -> dict[str, str]:
+    """
+    Build name -> gender lookup (lowercase keys) from (name, canonical) pairs.
+
+    A name gets the gender of its canonical form. Names that map to canonical
+    forms of different genders (e.g. a shared diminutive) are left out:
+    ambiguous data never produces a flag.
+    """
+    table: dict[str, str] = {}
+    ambiguous: set[str] = set()
+    for name, canonical in pairs:
+        key = (name or "").strip().lower()
+        gender = guess_gender_by_name(canonical)
+        if not key or gender is None or key in ambiguous:
+            continue
+        known = table.get(key)
+        if known is None:
+            table[key] = gender
+        elif known != gender:
+            ambiguous.add(key)
+            del table[key]
+    return table
+
+
+def patronymic_gender(middle: Any) -> Optional[str]:
+    """
+    Gender implied by the patronymic ending (-ович/-евич/-ич vs -овна/-евна/-ична).
+    """
+    if not middle:
+        return None
+    s = str(middle).strip().lower()
+    for n in _PATRONYMIC_SUFFIX_LENGTHS:
+        if len(s) > n:
+            gender = _PATRONYMIC_SUFFIXES.get(s[-n:])
+            if gender is not None:
+                return gender
+    return None
+
+
+class NamePatronymicChecker:
+    """
+    Logical check: first name and patronymic must imply the same gender.
+
+    Both lookups are plain dict hits over precomputed tables, so the checker
+    can run per row inside a streaming pass. Rows with a missing, unknown or
+    ambiguous part are never flagged.
+    """
+
+    def __init__(self, name_gender: dict[str, str]):
+        self._name_gender = name_gender
+
+    def name_gender(self, first: Any) -> Optional[str]:
+        if not first:
+            return None
+        return self._name_gender.get(str(first).strip().lower())
+
+    def check(self, first: Any, middle: Any) -> list[str]:
+        """
+        Split mode: returns row-level flag codes for (first name, patronymic).
+        """
+        g_name = self.name_gender(first)
+        if g_name is None:
+            return []
+        g_patronymic = patronymic_gender(middle)
+        if g_patronymic is None or g_patronymic == g_name:
+            return []
+        return [FLAG_NAME_PATRONYMIC_MISMATCH]
+
+    def check_fio(self, fio: Any) -> list[str]:
+        """
+        Single mode: 'Фамилия Имя Отчество'. Values that are not exactly
+        three words are treated as incomplete and not checked.
+        """
+        if not fio:
+            return []
+        parts = str(fio).split()
+        if len(parts) != 3:
+            return []
+        return self.check(parts[1], parts[2])
@@ -59,6 +59,9 @@ FLAG_LATIN_ONLY = "latin_only"
 FLAG_TOO_MANY_WORDS = "too_many_words"
 FLAG_TOO_SHORT = "too_short"
 
+# Logical (row-level) flags: need several fields of the same row
+FLAG_NAME_PATRONYMIC_MISMATCH = "name_patronymic_mismatch"
+
 FLAG_LABELS_RU = {
     FLAG_HAS_DIGITS: "цифры",
     FLAG_HAS_FORBIDDEN_CHARS: "недопустимые символы",
@@ -66,4 +69,20 @@ FLAG_LABELS_RU = {
     FLAG_LATIN_ONLY: "латиница",
     FLAG_TOO_MANY_WORDS: "слишком много слов",
     FLAG_TOO_SHORT: "слишком коротко",
+    FLAG_NAME_PATRONYMIC_MISMATCH: "возможно несоответствие имени и отчества",
+}
+
+
+# Grammatical gender (name / patronymic consistency)
+GENDER_MALE = "m"
+GENDER_FEMALE = "f"
+
+
+# Suggestions (Step 3.5): confidence scale; nothing below medium is produced
+CONFIDENCE_HIGH = "high"
+CONFIDENCE_MEDIUM = "medium"
+
+CONFIDENCE_LABELS_RU = {
+    CONFIDENCE_HIGH: "высокая",
+    CONFIDENCE_MEDIUM: "средняя",
 }
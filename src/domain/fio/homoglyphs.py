@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+from typing import Any, Optional
+
+from .types import HomoglyphFix
+
+
+SCRIPT_CYRILLIC = "cyrillic"
+SCRIPT_LATIN = "latin"
+
+# Step 3.5: visual twins (C↔С, O↔О, A↔А, E↔Е, 0↔О, ...).
+# Pairs are (latin, cyrillic); only shapes that are indistinguishable in
+# common fonts are listed.
+_LOOKALIKE_PAIRS = [
+    ("A", "А"),
+    ("a", "а"),
+    ("B", "В"),
+    ("C", "С"),
+    ("c", "с"),
+    ("E", "Е"),
+    ("e", "е"),
+    ("H", "Н"),
+    ("K", "К"),
+    ("M", "М"),
+    ("O", "О"),
+    ("o", "о"),
+    ("P", "Р"),
+    ("p", "р"),
+    ("T", "Т"),
+    ("X", "Х"),
+    ("x", "х"),
+    ("Y", "У"),
+    ("y", "у"),
+]
+
+# Digits that are typed instead of letters. Lowercase targets; a replaced
+# digit at the start of a word is upper-cased separately.
+_DIGIT_TO_CYRILLIC = {"0": "о", "3": "з", "6": "б"}
+_DIGIT_TO_LATIN = {"0": "o"}
+
+_TO_CYRILLIC = str.maketrans(
+    {**{lat: cyr for lat, cyr in _LOOKALIKE_PAIRS}, **_DIGIT_TO_CYRILLIC}
+)
+_TO_LATIN = str.maketrans(
+    {**{cyr: lat for lat, cyr in _LOOKALIKE_PAIRS}, **_DIGIT_TO_LATIN}
+)
+
+
+def _is_cyrillic(ch: str) -> bool:
+    return ("А" <= ch <= "я") or ch in "Ёё"
+
+
+def _is_latin(ch: str) -> bool:
+    return ("A" <= ch <= "Z") or ("a" <= ch <= "z")
+
+
+def fix_homoglyphs(value: Any) -> Optional[HomoglyphFix]:
+    """
+    Step 3.5: replace lookalike characters so the value uses one alphabet.
+
+    The target alphabet is the one with more letters in the value (ties go to
+    Cyrillic). Returns None if nothing was replaced or if the result still
+    mixes alphabets or contains digits (the substitution did not explain the
+    whole problem).
+    """
+    if value is None:
+        return None
+    s = value if isinstance(value, str) else str(value)
+
+    cyr = sum(1 for ch in s if _is_cyrillic(ch))
+    lat = sum(1 for ch in s if _is_latin(ch))
+    if cyr == 0 and lat == 0:
+        return None
+
+    if cyr >= lat:
+        target, table, foreign = SCRIPT_CYRILLIC, _TO_CYRILLIC, _is_latin
+    else:
+        target, table, foreign = SCRIPT_LATIN, _TO_LATIN, _is_cyrillic
+
+    after = s.translate(table)
+    if after == s:
+        return None
+
+    chars = list(after)
+    replacements: list[tuple[int, str, str]] = []
+    for i, (a, b) in enumerate(zip(s, after)):
+        if a == b:
+            continue
+        if a.isdigit() and (i == 0 or not s[i - 1].isalpha()):
+            b = b.upper()
+            chars[i] = b
+        replacements.append((i, a, b))
+    after = "".join(chars)
+
+    if any(foreign(ch) or ch.isdigit() for ch in after):
+        return None
+
+    return HomoglyphFix(after=after, target_script=target, replacements=replacements)
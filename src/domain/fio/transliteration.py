@@ -0,0 +1,253 @@
+from __future__ import annotations
+
+from functools import lru_cache
+from itertools import islice, product
+from typing import NamedTuple, Optional
+
+
+# Step 3.5: Latin -> Cyrillic transliteration (reverse of the passport scheme).
+#
+# The table is compiled once into a character trie and matched with a single
+# left-to-right longest-match scan: every position is visited at most
+# _MAX_KEY_LEN times, so there is no backtracking on adversarial input.
+#
+# Trigraphs with "y" between vowels resolve the й/я/ю ambiguity without
+# lookahead: "iya" -> "ия", "eye" -> "ее", while a final "iy" -> "ий". The
+# older "j" spellings (Jurij, Tatjana, Marija) are read the same way.
+#
+# Some matches have several readings depending on their neighbours
+# (_choices): "ia"/"iu" after a consonant (Diana, Tatiana, Tania), a soft
+# sign the schemes drop (Natalya, Olga / Volkov), "c" before e/i/y
+# (Cecilia). Each word then gets all of its
+# readings, most likely first; a reading is "ambiguous" when another one is
+# about as likely, and callers should not trust the first one blindly.
+
+_SCHEME = {
+    # single letters
+    "a": "а",
+    "b": "б",
+    "v": "в",
+    "g": "г",
+    "d": "д",
+    "e": "е",
+    "z": "з",
+    "i": "и",
+    "k": "к",
+    "l": "л",
+    "m": "м",
+    "n": "н",
+    "o": "о",
+    "p": "п",
+    "r": "р",
+    "s": "с",
+    "t": "т",
+    "u": "у",
+    "f": "ф",
+    "h": "х",
+    "y": "ы",
+    "x": "кс",
+    "c": "к",
+    "j": "й",
+    "q": "к",
+    "w": "в",
+    # digraphs
+    "zh": "ж",
+    "kh": "х",
+    "ts": "ц",
+    "tc": "ц",
+    "ch": "ч",
+    "ck": "к",
+    "qu": "кв",
+    "sh": "ш",
+    "ya": "я",
+    "ia": "я",
+    "yu": "ю",
+    "iu": "ю",
+    "yo": "ё",
+    "ye": "е",
+    "ja": "я",
+    "ju": "ю",
+    "jo": "ё",
+    "je": "е",
+    "ay": "ай",
+    "ey": "ей",
+    "iy": "ий",
+    "ii": "ий",
+    "oy": "ой",
+    "uy": "уй",
+    "yy": "ый",
+    "ij": "ий",
+    "yj": "ый",
+    # trigraphs / tetragraphs
+    "sch": "щ",
+    "shch": "щ",
+    "iia": "ия",
+    "iiu": "ию",
+    # separators are kept as-is
+    " ": " ",
+    "-": "-",
+}
+
+_VOWELS_LAT_TO_CYR = {"a": "а", "e": "е", "i": "и", "o": "о", "u": "у", "y": "ы"}
+_IOTATED = {"a": "я", "u": "ю", "o": "ё", "e": "е"}
+
+
+def _add_vowel_y_vowel(scheme: dict[str, str]) -> None:
+    for v, v_cyr in _VOWELS_LAT_TO_CYR.items():
+        for w, w_cyr in _IOTATED.items():
+            scheme.setdefault(f"{v}y{w}", v_cyr + w_cyr)
+            scheme.setdefault(f"{v}j{w}", v_cyr + w_cyr)
+
+
+_add_vowel_y_vowel(_SCHEME)
+
+_TERMINAL = ""  # trie key for the replacement stored at a node
+
+
+def _compile_trie(scheme: dict[str, str]) -> dict:
+    root: dict = {}
+    for key, replacement in scheme.items():
+        node = root
+        for ch in key:
+            node = node.setdefault(ch, {})
+        node[_TERMINAL] = replacement
+    return root
+
+
+_TRIE = _compile_trie(_SCHEME)
+_MAX_KEY_LEN = max(len(k) for k in _SCHEME)
+
+
+_SEPARATORS = frozenset(" -")
+_VOWELS = frozenset("aeiouy")
+# Consonants that take a soft sign before an iotated vowel: Natalya, Ilya, Darya
+_SOFTENED = frozenset("lntdr")
+_IOTATED_DIGRAPHS = frozenset({"ya", "yu", "yo", "ye", "ja", "ju", "jo", "je"})
+# Readings of one word tried at most (most likely first)
+MAX_READINGS = 8
+
+
+class TransliterationPart(NamedTuple):
+    """
+    One word (or separator) of a transliterated value.
+    """
+
+    readings: tuple[str, ...]  # Title Case, most likely first
+    ambiguous: bool  # another reading is about as likely as the first
+
+
+def _choices(s: str, i: int, j: int, replacement: str) -> tuple[tuple[str, ...], bool]:
+    """
+    Readings of the match s[i:j] in its context and whether they are
+    equally plausible (False: the others are only worth a dictionary check).
+    """
+    key = s[i:j]
+    prev = s[i - 1] if i else " "
+    word_end = j == len(s) or s[j] in _SEPARATORS
+
+    if key in ("ia", "iu") and prev not in _SEPARATORS and prev not in _VOWELS:
+        # After a consonant: Diana / Tatiana / Tania, Maria / Daria; Liudmila / Viuga
+        if key == "iu":
+            return ("ю", "ью", "иу"), True
+        return ("ия" if word_end else "иа", "ья", "я"), True
+    if key in _IOTATED_DIGRAPHS and prev in _SOFTENED and i >= 2 and s[i - 2] in _VOWELS:
+        # Natalya, Vasilyevich / Polyakov
+        return ("ь" + replacement, replacement), True
+    if key == "y" and word_end and prev not in _SEPARATORS:
+        # Vitaly, Dmitry; a final soft sign after l/n/t/d/r
+        return ("ий", "ь", "ы") if prev in _SOFTENED else ("ий", "ы"), False
+    if key == "l" and prev in _VOWELS and word_end:
+        # Pavel, Gogol / Igor'
+        return ("л", "ль"), False
+    if key == "l" and prev in _VOWELS and s[j] not in _VOWELS:
+        # Olga, Melnikov / Volkov, Belkin: as likely either way
+        return ("л", "ль"), True
+    if key == "c" and not word_end and s[j] in "eiy":
+        # Cecilia, Lucia / Marcel
+        return ("ц", "с"), True
+    return (replacement,), False
+
+
+def _parse_lower(s: str) -> Optional[list[tuple[tuple[str, ...], bool]]]:
+    """
+    Longest-match scan: the readings of every match, or None if some part
+    of the string does not parse.
+    """
+    out = []
+    i = 0
+    n = len(s)
+    while i < n:
+        node = _TRIE
+        match = None
+        match_end = i
+        j = i
+        while j < n:
+            node = node.get(s[j])
+            if node is None:
+                break
+            j += 1
+            replacement = node.get(_TERMINAL)
+            if replacement is not None:
+                match = replacement
+                match_end = j
+        if match is None:
+            return None
+        out.append(_choices(s, i, match_end, match))
+        i = match_end
+    return out
+
+
+def _capitalize(word: str) -> str:
+    return word[:1].upper() + word[1:]
+
+
+@lru_cache(maxsize=65536)
+def transliterate_latin_parts(value: str) -> Optional[tuple[TransliterationPart, ...]]:
+    """
+    Step 3.5: the readings of every word of a Latin-only FIO value, with the
+    separators (spaces, hyphens) as single-reading parts; None unless the
+    WHOLE value parses with the scheme. Callers are expected to pass an
+    already normalized value.
+    """
+    if not value:
+        return None
+    matches = _parse_lower(value.lower())
+    if matches is None:
+        return None
+
+    parts: list[TransliterationPart] = []
+    word: list[tuple[tuple[str, ...], bool]] = []
+
+    def close_word() -> None:
+        if word:
+            readings = islice(product(*(choices for choices, _ in word)), MAX_READINGS)
+            parts.append(
+                TransliterationPart(
+                    tuple(_capitalize("".join(r)) for r in readings),
+                    any(ambiguous for _, ambiguous in word),
+                )
+            )
+            word.clear()
+
+    for choices, ambiguous in matches:
+        if choices[0] in _SEPARATORS:
+            close_word()
+            parts.append(TransliterationPart(choices, False))
+        else:
+            word.append((choices, ambiguous))
+    close_word()
+    return tuple(parts)
+
+
+def transliterate_latin(value: str) -> Optional[str]:
+    """
+    Step 3.5: transliterate a Latin-only FIO value to Cyrillic.
+
+    Returns the most likely reading in Title Case (spacing and hyphens
+    preserved) only if the WHOLE value parses with the scheme; otherwise
+    returns None. See transliterate_latin_parts() for all readings.
+    """
+    parts = transliterate_latin_parts(value)
+    if parts is None:
+        return None
+    return "".join(part.readings[0] for part in parts)
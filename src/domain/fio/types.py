@@ -19,3 +19,18 @@ class NormalizationResult:
     after: str
     status: str
     applied_rules: list[str]
+
+
+@dataclass(frozen=True)
+class HomoglyphFix:
+    """
+    Result of a lookalike-character substitution.
+
+    after: value with lookalikes replaced (same length as the input)
+    target_script: "cyrillic" or "latin"
+    replacements: list of (position, from_char, to_char), positions are 0-based
+    """
+
+    after: str
+    target_script: str
+    replacements: list[tuple[int, str, str]]
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+from typing import Iterable, Optional
+
+
+def _deletes(word: str, max_distance: int) -> set[str]:
+    """
+    All strings obtainable from word by deleting up to max_distance characters
+    (including the word itself).
+    """
+    result = {word}
+    frontier = {word}
+    for _ in range(max_distance):
+        next_frontier: set[str] = set()
+        for w in frontier:
+            if len(w) <= 1:
+                continue
+            for i in range(len(w)):
+                next_frontier.add(w[:i] + w[i + 1 :])
+        next_frontier -= result
+        result |= next_frontier
+        frontier = next_frontier
+    return result
+
+
+def edit_distance(a: str, b: str, max_distance: int) -> Optional[int]:
+    """
+    Optimal string alignment distance (Levenshtein + adjacent transpositions).
+    Returns None as soon as the distance is known to exceed max_distance.
+    """
+    if abs(len(a) - len(b)) > max_distance:
+        return None
+    if a == b:
+        return 0
+
+    prev2: list[int] = []
+    prev = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        cur = [i] + [0] * len(b)
+        row_min = i
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            v = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                v = min(v, prev2[j - 2] + 1)
+            cur[j] = v
+            if v < row_min:
+                row_min = v
+        if row_min > max_distance:
+            return None
+        prev2, prev = prev, cur
+
+    d = prev[len(b)]
+    return d if d <= max_distance else None
+
+
+class SymSpellIndex:
+    """
+    Symmetric-delete index for typo lookup over a fixed word list.
+
+    Each word is stored under all of its deletion variants (up to max_distance
+    deletions). A query generates its own deletion variants and only verifies
+    the words that share one of them, so lookup cost does not depend on the
+    size of the word list. Matching is case-insensitive; results are returned
+    in their original spelling.
+    """
+
+    def __init__(self, words: Iterable[str], max_distance: int = 2):
+        self.max_distance = max_distance
+        self._words: dict[str, str] = {}
+        self._deletes: dict[str, list[str]] = {}
+        for word in words:
+            key = word.lower()
+            if not key or key in self._words:
+                continue
+            self._words[key] = word
+            for d in _deletes(key, max_distance):
+                self._deletes.setdefault(d, []).append(key)
+
+    def __len__(self) -> int:
+        return len(self._words)
+
+    def __contains__(self, word: str) -> bool:
+        return word.lower() in self._words
+
+    def lookup(self, term: str, max_distance: Optional[int] = None) -> list[tuple[str, int]]:
+        """
+        Returns all words at the smallest distance <= max_distance from term,
+        as (word, distance) pairs sorted by word. Empty list if none.
+        """
+        limit = self.max_distance if max_distance is None else min(max_distance, self.max_distance)
+        key = term.lower()
+        if key in self._words:
+            return [(self._words[key], 0)]
+
+        best = limit + 1
+        found: list[str] = []
+        seen: set[str] = set()
+        for d in _deletes(key, limit):
+            for candidate in self._deletes.get(d, ()):
+                if candidate in seen:
+                    continue
+                seen.add(candidate)
+                dist = edit_distance(key, candidate, min(limit, best))
+                if dist is None:
+                    continue
+                if dist < best:
+                    best = dist
+                    found = [candidate]
+                elif dist == best:
+                    found.append(candidate)
+
+        return sorted((self._words[c], best) for c in found)
@@ -0,0 +1,9 @@
+#!/usr/bin/env python
+"""FIO batch export without booting Django (see apps/fio_runstore/cli.py)."""
+import sys
+
+from apps.fio_runstore.cli import main
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,221 @@
+"""
+One-pass profile of the selected columns over the whole file. A deployment
+can cap the pass at settings.FIO_COLUMN_PROFILE["MAX_ROWS"] data rows (it
+runs inside the request); the result then says it is partial and the page
+labels every number as covering the first rows only.
+
+Per column, in memory independent of the file size:
+  - exact row and fill counts;
+  - approximate distinct count (HyperLogLog, ~1.6% standard error);
+  - most frequent values (space-saving counter: every value occurring more
+    than rows / TOP_CAPACITY times is kept; counts are upper bounds,
+    "guaranteed" lower bounds);
+  - examples: a reservoir sample of distinct non-empty values with a fixed
+    seed, so the same file always shows the same examples.
+
+    rows_checked, stats, warnings, complete = profile_columns(path, ["ФИО"], encoding="utf-8", delimiter=";")
+"""
+
+from __future__ import annotations
+
+import hashlib
+import math
+import random
+from typing import Optional, Sequence
+
+from apps.fio_runstore.instrumentation import COUNTER_ROWS_READ, NULL_METRICS, RunMetrics
+from uploads.csv_projection import ProjectedReader
+
+
+HLL_PRECISION = 12  # 4096 one-byte registers per column
+TOP_CAPACITY = 64
+TOP_VALUES = 5
+EXAMPLES = 5
+PROFILE_SEED = 20240501
+
+DEFAULTS = {
+    "MAX_ROWS": None,  # data rows profiled by the upload page (None: the whole file)
+}
+
+
+def profile_settings() -> dict:
+    from django.conf import settings
+
+    return {**DEFAULTS, **getattr(settings, "FIO_COLUMN_PROFILE", {})}
+
+
+def _hash64(value: str) -> int:
+    # Stable across processes, unlike hash()
+    return int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+class HyperLogLog:
+    def __init__(self, precision: int = HLL_PRECISION):
+        self.p = precision
+        self.m = 1 << precision
+        self.registers = bytearray(self.m)
+        self._rest_bits = 64 - precision
+        self._rest_mask = (1 << self._rest_bits) - 1
+
+    def add(self, value: str) -> None:
+        h = _hash64(value)
+        idx = h >> self._rest_bits
+        rank = self._rest_bits - (h & self._rest_mask).bit_length() + 1
+        if rank > self.registers[idx]:
+            self.registers[idx] = rank
+
+    def estimate(self) -> int:
+        m = self.m
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if raw <= 2.5 * m and zeros:
+            return round(m * math.log(m / zeros))  # linear counting for small cardinalities
+        return round(raw)
+
+
+class SpaceSaving:
+    """
+    Heavy hitters in `capacity` counters. A new value evicts the current
+    minimum and inherits its count as the error bound.
+    """
+
+    def __init__(self, capacity: int = TOP_CAPACITY):
+        self.capacity = capacity
+        self.counts: dict[str, int] = {}
+        self.errors: dict[str, int] = {}
+        self._min_count = 0
+        self._min_candidates: list[str] = []
+
+    def add(self, value: str) -> None:
+        counts = self.counts
+        if value in counts:
+            counts[value] += 1
+            return
+        if len(counts) < self.capacity:
+            counts[value] = 1
+            self.errors[value] = 0
+            return
+        victim = self._pop_min()
+        floor = counts.pop(victim)
+        del self.errors[victim]
+        counts[value] = floor + 1
+        self.errors[value] = floor
+
+    def _pop_min(self) -> str:
+        # Counts only grow and newcomers enter above the minimum, so a
+        # candidate still at _min_count is a minimum.
+        while self._min_candidates:
+            value = self._min_candidates.pop()
+            if self.counts.get(value) == self._min_count:
+                return value
+        self._min_count = min(self.counts.values())
+        self._min_candidates = [v for v, c in self.counts.items() if c == self._min_count]
+        return self._min_candidates.pop()
+
+    def top(self, n: int = TOP_VALUES) -> list[dict]:
+        """
+        Most frequent values; counters that are mostly inherited error
+        (churn of rare values) are left out.
+        """
+        ranked = sorted(
+            ((v, c) for v, c in self.counts.items() if c - self.errors[v] > self.errors[v]),
+            key=lambda kv: (-kv[1], kv[0]),
+        )[:n]
+        return [{"value": v, "count": c, "guaranteed": c - self.errors[v]} for v, c in ranked]
+
+
+class Reservoir:
+    """
+    Uniform sample of `size` items (Algorithm L: one random draw per
+    replacement, not per item).
+    """
+
+    def __init__(self, size: int = EXAMPLES, seed=PROFILE_SEED):
+        self.size = size
+        self.items: list[str] = []
+        self.seen = 0
+        self._rng = random.Random(seed)
+        self._w = 1.0
+        self._next = size
+
+    def _draw(self) -> float:
+        return 1.0 - self._rng.random()  # (0, 1]
+
+    def _advance(self) -> None:
+        self._w *= math.exp(math.log(self._draw()) / self.size)
+        if self._w >= 1.0:
+            self._next = self.seen + 1
+        else:
+            self._next = self.seen + math.floor(math.log(self._draw()) / math.log(1.0 - self._w)) + 1
+
+    def add(self, item: str) -> None:
+        self.seen += 1
+        if self.seen <= self.size:
+            self.items.append(item)
+            if self.seen == self.size:
+                self._advance()
+        elif self.seen == self._next:
+            self.items[self._rng.randrange(self.size)] = item
+            self._advance()
+
+
+class ColumnProfile:
+    def __init__(self, name: str, *, seed=PROFILE_SEED, top_capacity: int = TOP_CAPACITY, examples: int = EXAMPLES):
+        self.name = name
+        self.rows = 0
+        self.filled = 0
+        self.distinct = HyperLogLog()
+        self.frequent = SpaceSaving(top_capacity)
+        self.sample = Reservoir(examples, seed=f"{seed}:{name}")
+
+    def add(self, value: Optional[str]) -> None:
+        self.rows += 1
+        if value:
+            self.filled += 1
+            self.distinct.add(value)
+            self.frequent.add(value)
+            if value not in self.sample.items:  # examples are distinct, at most EXAMPLES compares
+                self.sample.add(value)
+
+    def as_dict(self, top: int = TOP_VALUES) -> dict:
+        return {
+            "filled_count": self.filled,
+            "fill_rate": round(self.filled / self.rows * 100.0, 1) if self.rows else 0.0,
+            "distinct_estimate": min(self.distinct.estimate(), self.filled),
+            "top_values": self.frequent.top(top),
+            "examples": list(self.sample.items),
+        }
+
+
+def profile_columns(
+    storage_path: str,
+    column_names: Sequence[str],
+    *,
+    encoding: str,
+    delimiter: str,
+    seed=PROFILE_SEED,
+    max_rows: Optional[int] = None,
+    metrics: RunMetrics = NULL_METRICS,
+):
+    """
+    Profiles the named columns over the first max_rows data rows (None: all).
+    Returns (rows_checked, stats_dict, warnings_list, complete); complete is
+    False when the file has more rows than were profiled.
+    """
+    names = list(dict.fromkeys(column_names))
+    with ProjectedReader(storage_path, names, encoding=encoding, delimiter=delimiter, metrics=metrics) as reader:
+        warnings = [f"Столбец «{name}» не найден в заголовках." for name in reader.missing]
+        present = [(k, ColumnProfile(name, seed=seed)) for k, name in enumerate(names) if name not in reader.missing]
+        rows_checked = 0
+        complete = True
+        for values in reader:
+            if rows_checked == max_rows:
+                complete = False
+                break
+            rows_checked += 1
+            for k, profile in present:
+                profile.add(values[k])
+    metrics.incr(COUNTER_ROWS_READ, rows_checked)
+
+    return rows_checked, {p.name: p.as_dict() for _, p in present}, warnings, complete
@@ -0,0 +1,173 @@
+"""
+Optional pyarrow backend for ProjectedReader.
+
+pyarrow.csv parses in native code and converts only the selected columns
+(include_columns), yielding record batches; pyarrow is not a dependency of
+the project and this module is only used when it can be imported.
+
+The data rows are read in segments (next_segment) that start and end on
+record boundaries, found on the raw bytes like uploads.csv_stream does: a
+newline after an even number of quote bytes. A segment ends before the
+next blank line, after about SEGMENT_BYTES, or at the end of the file.
+Arrow reads a blank line as a row of empty strings where csv.reader gives
+no cells (None), so blank lines, and a tail with an unbalanced quote, are
+segments for the stdlib parser. pyarrow also rejects rows whose field
+count differs from the header (short rows) where csv.reader accepts them:
+such a segment raises ArrowFallback, and ProjectedReader reads it again
+with the stdlib parser after the rows already yielded. Row numbering stays
+identical, and a fallback re-reads at most one segment.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import BinaryIO, Iterator, Optional, Sequence
+
+
+BLOCK_SIZE = 4 * 1024 * 1024
+SEGMENT_BYTES = 16 * BLOCK_SIZE  # bounds what a fallback reads again
+SCAN_CHUNK_BYTES = 1024 * 1024
+
+QUOTE = b'"'
+# A newline followed by a blank line; the blank line starts at m.end()
+_BLANK_LINE = re.compile(rb"\n(?=\r?\n)")
+
+# Python codec name -> Arrow encoding (Arrow skips a UTF-8 BOM itself)
+_ENCODINGS = {"utf-8": "utf8", "utf-8-sig": "utf8", "utf8": "utf8"}
+
+
+class ArrowFallback(Exception):
+    """The file has rows pyarrow cannot read the way csv.reader does."""
+
+
+def pyarrow_available() -> bool:
+    try:
+        import pyarrow.csv  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def next_segment(raw: BinaryIO, start: int, size: int, limit: int = SEGMENT_BYTES) -> tuple[int, bool]:
+    """
+    The segment of data rows starting at record boundary `start`.
+    Returns (end, arrow): arrow False for a blank line at `start` or a tail
+    with an unbalanced quote, which go through the stdlib parser.
+    """
+    raw.seek(start)
+    head = raw.read(2)
+    if head[:1] == b"\n":
+        return start + 1, False
+    if head == b"\r\n":
+        return start + 2, False
+
+    raw.seek(start)
+    base = start  # file offset of the chunk
+    odd = False  # quote parity since `start`
+    carry = b""
+    while True:
+        chunk = raw.read(SCAN_CHUNK_BYTES)
+        data = carry + chunk
+        if chunk:
+            cut = data.rfind(b"\n") + 1
+            if not cut:
+                carry = data
+                continue
+            data, carry = data[:cut], data[cut:]
+        # data follows a newline (or `start`), and ends on one unless at EOF
+        counted = 0
+        if base > start and (data[:1] == b"\n" or data[:2] == b"\r\n"):
+            if not odd:
+                return base, True
+        for m in _BLANK_LINE.finditer(data):
+            odd ^= bool(data.count(QUOTE, counted, m.end()) & 1)
+            counted = m.end()
+            if not odd:
+                return base + m.end(), True
+        odd ^= bool(data.count(QUOTE, counted) & 1)
+        base += len(data)
+        if not chunk:
+            return size, not odd
+        if not odd and base - start >= limit:
+            return base, True
+
+
+class _Range:
+    """
+    Read-only file over raw[start:end].
+    """
+
+    closed = False
+
+    def __init__(self, raw: BinaryIO, start: int, end: int):
+        self._raw = raw
+        self._pos = start
+        self._end = end
+
+    def readable(self) -> bool:
+        return True
+
+    def read(self, size: int = -1) -> bytes:
+        n = self._end - self._pos if size is None or size < 0 else min(size, self._end - self._pos)
+        self._raw.seek(self._pos)
+        data = self._raw.read(n)
+        self._pos += len(data)
+        return data
+
+    def close(self) -> None:
+        self.closed = True
+
+
+def iter_arrow_rows(
+    raw: BinaryIO,
+    start: int,
+    end: int,
+    header_width: int,
+    indexes: Sequence[Optional[int]],
+    *,
+    encoding: str,
+    delimiter: str,
+    strip: bool = True,
+) -> Iterator[list[Optional[str]]]:
+    """
+    Values at `indexes` (None for a None index) per data row of the segment
+    raw[start:end] (see next_segment).
+    """
+    import pyarrow as pa
+    from pyarrow import csv as pa_csv
+
+    names = [f"c{i}" for i in range(header_width)]
+    selected = sorted({i for i in indexes if i is not None})
+    include = [names[i] for i in selected] or names[:1]  # [] would mean every column
+
+    try:
+        reader = pa_csv.open_csv(
+            _Range(raw, start, end),
+            read_options=pa_csv.ReadOptions(
+                encoding=_ENCODINGS.get(encoding.lower(), encoding),
+                column_names=names,
+                use_threads=True,
+                block_size=BLOCK_SIZE,
+            ),
+            parse_options=pa_csv.ParseOptions(
+                delimiter=delimiter,
+                newlines_in_values=True,
+                ignore_empty_lines=False,
+            ),
+            convert_options=pa_csv.ConvertOptions(
+                include_columns=include,
+                column_types={name: pa.string() for name in include},
+                strings_can_be_null=False,
+                quoted_strings_can_be_null=False,
+            ),
+        )
+        for batch in reader:
+            columns = {i: batch.column(names[i]).to_pylist() for i in selected}
+            per_index = [columns[i] if i is not None else None for i in indexes]
+            for r in range(batch.num_rows):
+                values = [col[r] if col is not None else None for col in per_index]
+                if strip:
+                    values = [v.strip() if v is not None else None for v in values]
+                yield values
+    except pa.ArrowInvalid as e:
+        raise ArrowFallback(str(e)) from e
@@ -0,0 +1,197 @@
+"""
+Projection-aware CSV reading: only the selected columns of every row.
+
+    with ProjectedReader(path, ["Фамилия", "Имя"], encoding="utf-8-sig", delimiter=";") as reader:
+        reader.header    # stripped column names (None for an empty file)
+        reader.missing   # requested columns that are not in the header
+        for values in reader:  # [value or None] per requested column
+            ...
+
+Records are located on the raw bytes (uploads.csv_stream) and only the
+requested cells are decoded and stripped; the other 60-200 columns of a
+wide export are never turned into strings. Local files are memory-mapped
+(settings.FIO_CSV_MMAP), other storages are read in chunks. Row numbering
+is the same as csv.reader's: one data row per record, blank lines included.
+
+settings.FIO_CSV_BACKEND selects the parser for full passes: "python"
+(above), "pyarrow" (uploads.csv_arrow, native and multithreaded) or "auto"
+(pyarrow when installed). With pyarrow the data rows are parsed segment by
+segment; a segment pyarrow cannot read like csv.reader would (blank lines,
+short rows, an unbalanced quote at the end) is read with the stdlib parser
+from its start offset, after the rows pyarrow already produced.
+"""
+
+from __future__ import annotations
+
+import os
+from typing import BinaryIO, Iterator, Optional, Sequence
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+
+from apps.fio_runstore.instrumentation import COUNTER_BYTES_READ, NULL_METRICS, STAGE_READ, RunMetrics
+from apps.fio_runstore.memory import NULL_MEMORY, MemoryGuard
+from uploads.csv_arrow import ArrowFallback, iter_arrow_rows, next_segment, pyarrow_available
+from uploads.csv_stream import iter_records, iter_records_mmap, local_path, parse_record, project_record
+
+
+BACKEND_AUTO = "auto"
+BACKEND_PYTHON = "python"
+BACKEND_PYARROW = "pyarrow"
+BACKENDS = (BACKEND_AUTO, BACKEND_PYTHON, BACKEND_PYARROW)
+
+
+def resolve_backend(backend: Optional[str] = None) -> str:
+    """
+    BACKEND_PYTHON or BACKEND_PYARROW; None follows settings.FIO_CSV_BACKEND.
+    """
+    if backend is None:
+        backend = getattr(settings, "FIO_CSV_BACKEND", BACKEND_AUTO)
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown CSV backend: {backend}")
+    if backend == BACKEND_PYTHON:
+        return BACKEND_PYTHON
+    if pyarrow_available():
+        return BACKEND_PYARROW
+    if backend == BACKEND_PYARROW:
+        raise ValueError("CSV backend 'pyarrow' is configured but pyarrow is not installed")
+    return BACKEND_PYTHON
+
+
+def project_values(
+    record: bytes,
+    indexes: Sequence[Optional[int]],
+    encoding: str,
+    delimiter: str,
+    strip: bool = True,
+) -> list[Optional[str]]:
+    """
+    Cells at `indexes` of one raw record; None for a None index or a short row.
+    """
+    if None in indexes:
+        present = [i for i in indexes if i is not None]
+        cells = iter(project_record(record, present, encoding, delimiter) if present else ())
+        values = [next(cells) if i is not None else None for i in indexes]
+    else:
+        values = project_record(record, indexes, encoding, delimiter)
+    if strip:
+        values = [v.strip() if v is not None else None for v in values]
+    return values
+
+
+class _MeteredRaw:
+    """
+    Binary file wrapper timing reads as the "read" stage.
+    """
+
+    def __init__(self, raw: BinaryIO, metrics: RunMetrics, memory: MemoryGuard):
+        self._raw = raw
+        self._metrics = metrics
+        self._memory = memory
+
+    def seek(self, offset: int, whence: int = 0) -> int:
+        return self._raw.seek(offset, whence)
+
+    def read(self, size: int = -1) -> bytes:
+        with self._metrics.stage(STAGE_READ):
+            chunk = self._raw.read(size)
+        self._metrics.incr(COUNTER_BYTES_READ, len(chunk))
+        self._memory.sample(STAGE_READ)
+        return chunk
+
+
+class ProjectedReader:
+    def __init__(
+        self,
+        storage_path: str,
+        columns: Sequence[str],
+        *,
+        encoding: str,
+        delimiter: str,
+        strip: bool = True,
+        metrics: RunMetrics = NULL_METRICS,
+        memory: MemoryGuard = NULL_MEMORY,
+        use_mmap: Optional[bool] = None,
+        backend: Optional[str] = None,
+    ):
+        self.storage_path = storage_path
+        self.columns = list(columns)
+        self.encoding = encoding
+        self.delimiter = delimiter
+        self.strip = strip
+        self.backend = resolve_backend(backend)
+        self._raw = None
+        self._arrow_raw = None
+
+        if use_mmap is None:
+            use_mmap = getattr(settings, "FIO_CSV_MMAP", True)
+        path = local_path(default_storage, storage_path) if use_mmap else None
+        if path:
+            self._records = iter_records_mmap(path)
+            metrics.incr(COUNTER_BYTES_READ, os.path.getsize(path))
+        else:
+            self._raw = default_storage.open(storage_path, "rb")
+            self._records = iter_records(_MeteredRaw(self._raw, metrics, memory))
+
+        first = next(self._records, None)
+        self.header: Optional[list[str]] = (
+            [c.strip() for c in parse_record(first[1], encoding, delimiter)] if first else None
+        )
+        col_index = {name: i for i, name in enumerate(self.header or [])}
+        self.indexes: list[Optional[int]] = [col_index.get(c) for c in self.columns]
+        self.missing = [c for c, i in zip(self.columns, self.indexes) if i is None]
+        self._data_start = first[0] + len(first[1]) if first else 0
+
+    def _iter_python(self) -> Iterator[list[Optional[str]]]:
+        indexes, encoding, delimiter, strip = self.indexes, self.encoding, self.delimiter, self.strip
+        for _, record in self._records:
+            yield project_values(record, indexes, encoding, delimiter, strip)
+
+    def __iter__(self) -> Iterator[list[Optional[str]]]:
+        if self.backend != BACKEND_PYARROW or self.header is None:
+            yield from self._iter_python()
+            return
+
+        indexes, encoding, delimiter, strip = self.indexes, self.encoding, self.delimiter, self.strip
+        raw = self._arrow_raw = default_storage.open(self.storage_path, "rb")
+        size = default_storage.size(self.storage_path)
+        pos = self._data_start
+        try:
+            while pos < size:
+                end, arrow = next_segment(raw, pos, size)
+                yielded = 0
+                if arrow:
+                    try:
+                        for values in iter_arrow_rows(
+                            raw, pos, end, len(self.header), indexes,
+                            encoding=encoding, delimiter=delimiter, strip=strip,
+                        ):
+                            yielded += 1
+                            yield values
+                        pos = end
+                        continue
+                    except ArrowFallback:
+                        pass
+                # Only this segment is read again, after the rows pyarrow already produced.
+                for n, (offset, record) in enumerate(iter_records(raw, pos)):
+                    if offset >= end:
+                        break
+                    if n >= yielded:
+                        yield project_values(record, indexes, encoding, delimiter, strip)
+                pos = end
+        finally:
+            raw.close()
+
+    def close(self) -> None:
+        self._records.close()  # unmaps a memory-mapped file
+        if self._raw is not None:
+            self._raw.close()
+        if self._arrow_raw is not None:
+            self._arrow_raw.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
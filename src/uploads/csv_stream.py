@@ -0,0 +1,161 @@
+"""
+Byte-level CSV record scanning.
+
+iter_records() splits a binary stream into raw records without decoding it:
+a "\\n" ends a record only when the number of quote bytes seen in the record
+so far is even, so quoted fields spanning several lines stay in one record.
+Every record comes with its byte offset, which can be stored and later used
+to seek straight to that record.
+
+This works for UTF-8 and single-byte encodings (cp1251): the quote byte
+never occurs inside a multi-byte UTF-8 sequence. Bare "\\r" line endings are
+not supported; a stray quote inside an unquoted field (malformed CSV) makes
+the scanner join records until the next stray quote. If none follows, the
+record is ended at its first line when the end of the file is reached
+and scanning resumes after it, so no rows are lost.
+
+For full passes over local files, iter_records_mmap() scans a memory map
+instead of reading chunks, and project_record() splits a raw record on the
+delimiter byte and decodes only the requested columns, so the cells of the
+other columns are never turned into Python strings.
+"""
+
+from __future__ import annotations
+
+import csv
+import mmap
+from typing import BinaryIO, Iterator, Optional, Sequence
+
+
+READ_CHUNK_BYTES = 1024 * 1024
+QUOTE = b'"'
+
+
+def iter_records(raw: BinaryIO, start: int = 0, chunk_size: int = READ_CHUNK_BYTES) -> Iterator[tuple[int, bytes]]:
+    """
+    Yield (byte offset, raw record bytes including the line ending) starting
+    at byte offset `start`, which must be the start of a record.
+    """
+    raw.seek(start)
+    buf = b""
+    base = start  # file offset of buf[0]
+    rec = 0  # start of the current record in buf
+    pos = 0  # buf[:pos] is already scanned
+    in_quotes = False
+    while True:
+        chunk = raw.read(chunk_size)
+        if chunk:
+            buf = buf[rec:] + chunk
+            base += rec
+            pos -= rec
+            rec = 0
+        while True:
+            nl = buf.find(b"\n", pos)
+            if nl < 0:
+                if buf.count(QUOTE, pos) & 1:
+                    in_quotes = not in_quotes
+                pos = len(buf)
+                break
+            if buf.count(QUOTE, pos, nl) & 1:
+                in_quotes = not in_quotes
+            pos = nl + 1
+            if not in_quotes:
+                yield base + rec, buf[rec:pos]
+                rec = pos
+        if not chunk:
+            if rec < len(buf):
+                if in_quotes:
+                    # Unbalanced quote: end the record at its first line and rescan the rest
+                    nl = buf.find(b"\n", rec)
+                    if 0 <= nl < len(buf) - 1:
+                        yield base + rec, buf[rec : nl + 1]
+                        rec = pos = nl + 1
+                        in_quotes = False
+                        continue
+                yield base + rec, buf[rec:]
+            return
+
+
+def parse_record(record: bytes, encoding: str, delimiter: str) -> list[str]:
+    """
+    Decode and split one raw record from iter_records().
+    """
+    return next(csv.reader([record.decode(encoding)], delimiter=delimiter), [])
+
+
+def read_record_at(raw: BinaryIO, offset: int) -> bytes:
+    """
+    The raw record starting at `offset` (b"" past the end of the file).
+    """
+    for _, record in iter_records(raw, offset, chunk_size=64 * 1024):
+        return record
+    return b""
+
+
+def local_path(storage, name: str) -> Optional[str]:
+    """
+    Filesystem path of a stored file, or None for non-local storages.
+    """
+    try:
+        return storage.path(name)
+    except NotImplementedError:
+        return None
+
+
+def iter_records_mmap(path: str, start: int = 0) -> Iterator[tuple[int, bytes]]:
+    """
+    Same as iter_records(), over a memory map of a local file.
+    """
+    with open(path, "rb") as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty file
+            return
+        with mm:
+            size = len(mm)
+            rec = start
+            pos = start
+            in_quotes = False
+            while rec < size:
+                if pos == size:
+                    # Unbalanced quote: end the record at its first line and rescan the rest
+                    nl = mm.find(b"\n", rec)
+                    end = size if nl < 0 else nl + 1
+                    yield rec, mm[rec:end]
+                    rec = pos = end
+                    in_quotes = False
+                    continue
+                nl = mm.find(b"\n", pos)
+                end = size if nl < 0 else nl + 1
+                q = mm.find(QUOTE, pos, end)
+                if q >= 0 and mm[q:end].count(QUOTE) & 1:
+                    in_quotes = not in_quotes
+                pos = end
+                if not in_quotes:
+                    yield rec, mm[rec:end]
+                    rec = end
+
+
+def project_record(
+    record: bytes,
+    columns: Sequence[int],
+    encoding: str,
+    delimiter: str,
+) -> list[Optional[str]]:
+    """
+    Values of the given column indexes (None where the row is too short).
+
+    Records without quotes are split on the raw delimiter byte up to the
+    last needed column and only the needed slices are decoded; quoted
+    records go through csv.reader.
+    """
+    if QUOTE in record:
+        row = parse_record(record, encoding, delimiter)
+        return [row[i] if i < len(row) else None for i in columns]
+
+    record = record.rstrip(b"\r\n")
+    if not record:
+        return [None] * len(columns)
+    # Delimiters are ASCII (no BOM from "utf-8-sig", same byte in cp1251)
+    cells = record.split(delimiter.encode("ascii"), max(columns) + 1 if columns else 0)
+    return [cells[i].decode(encoding) if i < len(cells) else None for i in columns]
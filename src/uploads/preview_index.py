@@ -0,0 +1,134 @@
+"""
+Lazily built index of the rows matching a preview filter.
+
+For one (upload, selection, filter) the index keeps the row numbers and byte
+offsets of the matching rows found so far, plus where the scan stopped. A
+page is served from the index with one seek per row; the scan only goes
+further when a page beyond the known matches is requested, and by at most
+SCAN_ROWS_PER_REQUEST rows per request.
+
+The index is stored next to the upload:
+    <upload path>.preview-<key>.idx
+(a JSON header line followed by two uint64 arrays: row numbers, offsets).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import sys
+from array import array
+from typing import Callable, Optional, Sequence
+
+from django.core.files.storage import default_storage
+
+from uploads.csv_projection import project_values
+from uploads.csv_stream import iter_records
+from uploads.row_index import replace_file
+
+
+INDEX_VERSION = 1
+SCAN_ROWS_PER_REQUEST = 200_000
+
+
+def index_storage_path(upload_path: str, key_parts: dict) -> str:
+    key = hashlib.sha1(
+        json.dumps({"v": INDEX_VERSION, **key_parts}, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    ).hexdigest()[:16]
+    return f"{upload_path}.preview-{key}.idx"
+
+
+class PreviewIndex:
+    def __init__(self, data_start: int):
+        self.rows = array("Q")
+        self.offsets = array("Q")
+        self.scanned_offset = data_start  # next record to scan
+        self.scanned_rows = 0
+        self.complete = False
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def entries(self, start: int, stop: int) -> list[tuple[int, int]]:
+        return list(zip(self.rows[start:stop], self.offsets[start:stop]))
+
+    def extend(
+        self,
+        upload_path: str,
+        *,
+        encoding: str,
+        delimiter: str,
+        matches: Optional[Callable[[int, list[Optional[str]]], bool]],
+        indexes: Sequence[Optional[int]] = (),
+        until: int,
+        max_rows: int = SCAN_ROWS_PER_REQUEST,
+    ) -> int:
+        """
+        Scan further until `until` matches are known, the file ends or
+        max_rows rows were scanned. matches(row number, values at `indexes`)
+        decides; matches=None accepts every row.
+        Returns the number of rows scanned.
+        """
+        if self.complete or len(self) >= until:
+            return 0
+        scanned = 0
+        with default_storage.open(upload_path, "rb") as raw:
+            for offset, record in iter_records(raw, self.scanned_offset):
+                row_num = self.scanned_rows + 1
+                self.scanned_offset = offset + len(record)
+                self.scanned_rows = row_num
+                scanned += 1
+                if matches is None or matches(row_num, project_values(record, indexes, encoding, delimiter)):
+                    self.rows.append(row_num)
+                    self.offsets.append(offset)
+                    if len(self) >= until:
+                        return scanned
+                if scanned >= max_rows:
+                    return scanned
+        self.complete = True
+        return scanned
+
+    # --- storage ---
+
+    def to_bytes(self) -> bytes:
+        header = {
+            "v": INDEX_VERSION,
+            "byteorder": sys.byteorder,
+            "count": len(self),
+            "scanned_offset": self.scanned_offset,
+            "scanned_rows": self.scanned_rows,
+            "complete": self.complete,
+        }
+        return json.dumps(header).encode("ascii") + b"\n" + self.rows.tobytes() + self.offsets.tobytes()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> Optional["PreviewIndex"]:
+        head, sep, body = data.partition(b"\n")
+        try:
+            header = json.loads(head)
+        except ValueError:
+            return None
+        if not sep or header.get("v") != INDEX_VERSION or header.get("byteorder") != sys.byteorder:
+            return None
+        count = header["count"]
+        rows, offsets = array("Q"), array("Q")
+        if len(body) != 2 * count * rows.itemsize:
+            return None
+        rows.frombytes(body[: count * rows.itemsize])
+        offsets.frombytes(body[count * rows.itemsize :])
+
+        index = cls(header["scanned_offset"])
+        index.rows, index.offsets = rows, offsets
+        index.scanned_rows = header["scanned_rows"]
+        index.complete = header["complete"]
+        return index
+
+    @classmethod
+    def load(cls, storage_path: str) -> Optional["PreviewIndex"]:
+        if not default_storage.exists(storage_path):
+            return None
+        with default_storage.open(storage_path, "rb") as f:
+            return cls.from_bytes(f.read())
+
+    def save(self, storage_path: str) -> None:
+        replace_file(storage_path, self.to_bytes())
@@ -0,0 +1,245 @@
+"""
+Sparse row-offset index of an uploaded CSV.
+
+The byte offset of every `step`-th record is stored, so any row range is
+opened with one seek plus a scan of fewer than `step` records. Records are
+counted like csv.reader does (quoted newlines stay inside the record); the
+header is record 0, so data row N is record N.
+
+Stored next to the upload as <upload path>.rows.idx: a JSON header line and
+a uint64 array of offsets (8 bytes per `step` rows). Index files are
+replaced atomically (replace_file), so concurrent requests building the
+same index never leave suffixed copies behind.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+import tempfile
+from array import array
+from typing import BinaryIO, Iterator, Optional
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+
+from uploads.csv_stream import QUOTE, READ_CHUNK_BYTES, iter_records, local_path
+
+
+ROW_INDEX_VERSION = 1
+ROW_INDEX_STEP = 1000
+
+
+class RowIndex:
+    def __init__(self, step: int, offsets: array, records: int, size: int):
+        self.step = step
+        self.offsets = offsets  # offsets[k]: start of record k * step
+        self.records = records  # including the header
+        self.size = size  # file size the index was built for
+
+    @property
+    def data_rows(self) -> int:
+        return max(0, self.records - 1)
+
+    def seek(self, record: int) -> tuple[int, int]:
+        """
+        (offset of the closest indexed record <= record, records to skip from there).
+        """
+        k = min(record // self.step, len(self.offsets) - 1)
+        return self.offsets[k], record - k * self.step
+
+    def iter_rows(self, raw: BinaryIO, first_row: int = 1) -> Iterator[tuple[int, int, bytes]]:
+        """
+        Yield (row number, offset, raw record) for data rows from first_row on.
+        """
+        if first_row > self.data_rows:
+            return
+        offset, skip = self.seek(first_row)
+        row_num = first_row - skip
+        for offset, record in iter_records(raw, offset):
+            if row_num >= first_row:
+                yield row_num, offset, record
+            row_num += 1
+
+    def offset_of(self, raw: BinaryIO, row: int) -> int:
+        """
+        Byte offset of data row `row` (the file size past the last row).
+        """
+        for _, offset, _ in self.iter_rows(raw, row):
+            return offset
+        return self.size
+
+    def shards(self, raw: BinaryIO, count: int) -> list[tuple[int, int, int]]:
+        """
+        Split the data rows into up to `count` contiguous ranges on indexed
+        boundaries: [(first row, start offset, end offset)], for parallel
+        workers; every range ends where the next one starts.
+        """
+        rows = self.data_rows
+        if rows == 0:
+            return []
+        per_shard = max(self.step, -(-rows // max(1, count)))
+        per_shard = -(-per_shard // self.step) * self.step  # round up to the index step
+        firsts = list(range(1, rows + 1, per_shard))
+        starts = [self.offset_of(raw, first) for first in firsts]
+        ends = starts[1:] + [self.size]
+        return list(zip(firsts, starts, ends))
+
+    # --- storage ---
+
+    def to_bytes(self) -> bytes:
+        header = {
+            "v": ROW_INDEX_VERSION,
+            "byteorder": sys.byteorder,
+            "step": self.step,
+            "records": self.records,
+            "size": self.size,
+            "count": len(self.offsets),
+        }
+        return json.dumps(header).encode("ascii") + b"\n" + self.offsets.tobytes()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> Optional["RowIndex"]:
+        head, sep, body = data.partition(b"\n")
+        try:
+            header = json.loads(head)
+        except ValueError:
+            return None
+        if not sep or header.get("v") != ROW_INDEX_VERSION or header.get("byteorder") != sys.byteorder:
+            return None
+        offsets = array("Q")
+        if len(body) != header["count"] * offsets.itemsize:
+            return None
+        offsets.frombytes(body)
+        return cls(header["step"], offsets, header["records"], header["size"])
+
+
+def build_row_index(raw: BinaryIO, step: int = ROW_INDEX_STEP, chunk_size: int = READ_CHUNK_BYTES) -> RowIndex:
+    """
+    One pass over the raw bytes. Newlines between two quote bytes are
+    counted in bulk; only every step-th record end is located exactly.
+    """
+    raw.seek(0)
+    offsets = array("Q", [0])
+    records = 0  # completed records
+    since = 0  # records since the last indexed one
+    base = 0  # file offset of the current chunk
+    in_quotes = False
+    last_byte = b"\n"
+    while True:
+        buf = raw.read(chunk_size)
+        if not buf:
+            break
+        last_byte = buf[-1:]
+        pos = 0
+        end_of_buf = len(buf)
+        while pos < end_of_buf:
+            q = buf.find(QUOTE, pos)
+            if in_quotes:
+                if q < 0:
+                    break
+                in_quotes = False
+                pos = q + 1
+                continue
+            end = q if q >= 0 else end_of_buf
+            n = buf.count(b"\n", pos, end)
+            if since + n >= step:
+                # Locate the record end that completes this step.
+                p = pos
+                for _ in range(step - since):
+                    p = buf.find(b"\n", p, end) + 1
+                records += step - since
+                since = 0
+                offsets.append(base + p)
+                pos = p
+                continue
+            since += n
+            records += n
+            if q < 0:
+                break
+            in_quotes = True
+            pos = q + 1
+        base += len(buf)
+
+    size = base
+    if in_quotes:
+        return _finish_with_scanner(raw, step, offsets, size)
+    if size and last_byte != b"\n":
+        records += 1  # last record without a line ending
+    if offsets[-1] >= size and len(offsets) > 1:
+        offsets.pop()  # the file ends exactly on an indexed boundary
+    return RowIndex(step, offsets, records, size)
+
+
+def _finish_with_scanner(raw: BinaryIO, step: int, offsets: array, size: int) -> RowIndex:
+    """
+    The file ends inside quotes (a stray quote in an unquoted field): count
+    again from the last indexed record with iter_records(), which ends such
+    a record at its first line.
+    """
+    records = (len(offsets) - 1) * step
+    since = 0
+    for offset, _ in iter_records(raw, offsets[-1]):
+        if since == step:
+            offsets.append(offset)
+            since = 0
+        records += 1
+        since += 1
+    return RowIndex(step, offsets, records, size)
+
+
+def replace_file(name: str, content: bytes) -> None:
+    """
+    Write a sidecar file under exactly `name`, replacing it if present.
+
+    Local storages: written to a temporary file next to it and renamed over
+    it, so concurrent writers do not clash (the last one wins) and readers
+    never see a partial file. Other storages: delete, then save.
+    """
+    path = local_path(default_storage, name)
+    if path is None:
+        if default_storage.exists(name):
+            default_storage.delete(name)
+        default_storage.save(name, ContentFile(content))
+        return
+    directory, base = os.path.split(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=f"{base}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(content)
+        mode = default_storage.file_permissions_mode
+        if mode is not None:
+            os.chmod(tmp, mode)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def row_index_path(upload_path: str) -> str:
+    return f"{upload_path}.rows.idx"
+
+
+def load_row_index(upload_path: str) -> Optional[RowIndex]:
+    path = row_index_path(upload_path)
+    if not default_storage.exists(path):
+        return None
+    with default_storage.open(path, "rb") as f:
+        index = RowIndex.from_bytes(f.read())
+    if index is None or index.size != default_storage.size(upload_path):
+        return None
+    return index
+
+
+def ensure_row_index(upload_path: str, step: int = ROW_INDEX_STEP) -> RowIndex:
+    """
+    The stored index of the upload, built and saved on first use.
+    """
+    index = load_row_index(upload_path)
+    if index is None:
+        with default_storage.open(upload_path, "rb") as raw:
+            index = build_row_index(raw, step)
+        replace_file(row_index_path(upload_path), index.to_bytes())
+    return index
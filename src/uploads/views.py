@@ -1,6 +1,7 @@
 import csv
 import io
 import os
+from urllib.parse import urlencode
 
 from django.core.files.storage import default_storage
 from django.shortcuts import render
@@ -11,28 +12,52 @@ from django.utils import timezone
 from domain.fio.normalize_value import normalize_fio_value
 from domain.fio.quality_checks import detect_warnings
 from domain.fio.quality_checks import detect_flags
-from domain.fio.constants import ATTENTION_LABEL_RU, WARNING_LABELS_RU, FLAG_LABELS_RU
-PREVIEW_ROWS = 20
-SNIFF_BYTES = 8192
+from domain.fio.constants import ATTENTION_LABEL_RU, WARNING_LABELS_RU, FLAG_LABELS_RU, UI_STATUS_LABELS_RU
+from domain.fio.consistency import NamePatronymicChecker
+from apps.fio_runstore.generator.name_dictionary import get_name_dictionary
+from apps.fio_runstore.instrumentation import (
+    COUNTER_BYTES_READ,
+    COUNTER_ROWS_READ,
+    COUNTER_VALUES_ANALYZED,
+    NULL_METRICS,
+    STAGE_ANALYZE,
+    STAGE_PARSE,
+    STAGE_READ,
+    instrument_view,
+    request_metrics,
+)
+from uploads.column_profile import profile_columns, profile_settings
+from uploads.csv_dialect import detect_format
+from uploads.csv_projection import project_values
+from uploads.csv_stream import iter_records, parse_record, read_record_at
+from uploads.preview_index import PreviewIndex, index_storage_path
+from uploads.row_index import ensure_row_index
 
-# Practical set for real-world Russian CSV
-ENCODINGS_TO_TRY = ["utf-8-sig", "cp1251"]
+PREVIEW_ROWS = 20
 
 # Session keys
 S_ACTIVE_FILE = "active_csv_path"
 S_SELECTION = "fio_selection"
 
 
-def _decode_sample(sample_bytes: bytes):
-    for enc in ENCODINGS_TO_TRY:
-        try:
-            return sample_bytes.decode(enc), enc
-        except UnicodeDecodeError:
-            continue
-    raise ValueError("Не удалось прочитать файл. Поддерживаются UTF-8 и Windows-1251 (cp1251).")
+def _detect_csv_format(storage_path: str, metrics=NULL_METRICS):
+    """
+    Encoding and delimiter of an uploaded file (uploads.csv_dialect.detect_format).
+    Returns (encoding_used, delimiter_used, DialectGuess).
+    Raises ValueError with a user-friendly message on failure.
+    """
+
+    def read_sample(size):
+        with metrics.stage(STAGE_READ):
+            with default_storage.open(storage_path, "rb") as f:
+                sample_bytes = f.read(size)
+        metrics.incr(COUNTER_BYTES_READ, len(sample_bytes))
+        return sample_bytes
 
+    return detect_format(read_sample, metrics)
 
-def _read_csv_preview(storage_path: str):
+
+def _read_csv_preview(storage_path: str, metrics=NULL_METRICS):
     """
     Returns:
       columns: list[str]
@@ -41,29 +66,11 @@ def _read_csv_preview(storage_path: str):
       delimiter_used: str
     Raises ValueError with a user-friendly message on failure.
     """
-    with default_storage.open(storage_path, "rb") as f:
-        sample_bytes = f.read(SNIFF_BYTES)
-
-    if not sample_bytes:
-        raise ValueError("Файл пустой: нет данных для предпросмотра.")
+    encoding_used, delimiter_used, _ = _detect_csv_format(storage_path, metrics)
 
-    sample_text, encoding_used = _decode_sample(sample_bytes)
-
-    # Delimiter: sniff, else comma.
-    delimiter_used = ","
-    dialect = csv.get_dialect("excel")
-    try:
-        sniffed = csv.Sniffer().sniff(sample_text)
-        if sniffed.delimiter in [",", ";", "\t", "|"]:
-            dialect = sniffed
-            delimiter_used = sniffed.delimiter
-    except Exception:
-        dialect = csv.get_dialect("excel")
-        delimiter_used = ","
-
-    with default_storage.open(storage_path, "rb") as raw:
+    with metrics.stage(STAGE_PARSE), default_storage.open(storage_path, "rb") as raw:
         text = io.TextIOWrapper(raw, encoding=encoding_used, newline="")
-        reader = csv.reader(text, dialect=dialect)
+        reader = csv.reader(text, delimiter=delimiter_used)
 
         header = next(reader, None)
         if header is None:
@@ -79,48 +86,139 @@ def _read_csv_preview(storage_path: str):
             if row is None:
                 break
             rows.append([str(c).strip() for c in row])
+    metrics.incr(COUNTER_ROWS_READ, len(rows))
 
     return columns, rows, encoding_used, delimiter_used
 
 
-def _compute_column_stats(columns, rows, selected_column_names, examples_limit=5):
+def _read_csv_header(storage_path: str, encoding: str, delimiter: str):
     """
-    For each selected column name computes:
-      - filled_count
-      - fill_rate (%)
-      - examples (up to examples_limit non-empty values)
-    Returns (rows_checked, stats_dict, warnings_list).
+    Returns (columns, byte offset of the first data row).
+    Raises ValueError with a user-friendly message on failure.
     """
-    col_index = {name: i for i, name in enumerate(columns)}
-    rows_checked = len(rows)
-    warnings = []
-    stats = {}
-
-    for name in selected_column_names:
-        if name not in col_index:
-            warnings.append(f"Столбец «{name}» не найден в заголовках.")
-            continue
-
-        idx = col_index[name]
-        filled = 0
-        examples = []
-
-        for r in rows:
-            val = r[idx] if idx < len(r) else ""
-            val = (val or "").strip()
-            if val:
-                filled += 1
-                if len(examples) < examples_limit and val not in examples:
-                    examples.append(val)
-
-        fill_rate = (filled / rows_checked * 100.0) if rows_checked > 0 else 0.0
-        stats[name] = {
-            "filled_count": filled,
-            "fill_rate": round(fill_rate, 1),
-            "examples": examples,
+    with default_storage.open(storage_path, "rb") as raw:
+        for _, record in iter_records(raw):
+            columns = [str(c).strip() for c in parse_record(record, encoding, delimiter)]
+            if not any(columns):
+                raise ValueError("Не удалось прочитать заголовки столбцов.")
+            return columns, len(record)
+    raise ValueError("Файл пустой: нет данных для предпросмотра.")
+
+
+def _get_name_dictionary():
+    """
+    The current names dictionary (shared by the process, reloaded after
+    edits); taken once per request. None if it is not available: the
+    logical check is then skipped, format flags still work.
+    """
+    try:
+        return get_name_dictionary()
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def _row_logical_flags(checker, mode, after_by_label):
+    """
+    Row-level flags for the preview.
+    Returns (field_label the flags belong to, flags) or (None, []).
+    """
+    if checker is None:
+        return None, []
+    if mode == "single":
+        return "фио", checker.check_fio(after_by_label.get("фио"))
+    if "имя" not in after_by_label or "отчество" not in after_by_label:
+        return None, []
+    return "отчество", checker.check(after_by_label["имя"], after_by_label["отчество"])
+
+
+def _build_row_items(row_num, r, col_index, selected_fields, mode, checker):
+    """
+    Preview items (one per selected field) for a single CSV row:
+    normalization, warnings, format flags and row-level logical flags
+    (checker: NamePatronymicChecker or None).
+    """
+    items = []
+    row_items = {}
+    after_by_label = {}
+    for field_label, col_name in selected_fields:
+        idx = col_index.get(col_name)
+        before_val = (r[idx] if idx is not None and idx < len(r) else "") or ""
+        result = normalize_fio_value(before_val)
+        warnings = detect_warnings(before_val)
+        flags = detect_flags(before_val)
+
+        if flags:
+            status = "needs_review"
+            flags_str = ", ".join(flags)
+            comment = ", ".join(FLAG_LABELS_RU[f] for f in flags)
+        else:
+            status = result.status
+            flags_str = ""
+            comment = ""
+
+        item = {
+            "row_num": row_num,
+            "field_label": field_label,
+            "column_name": col_name,
+            "before": before_val,
+            "after": result.after,
+            "status": status,
+            "applied_rules": ", ".join(result.applied_rules) if result.applied_rules else "",
+            "warnings": warnings,
+            "attention": ATTENTION_LABEL_RU if warnings else "",
+            "attention_reasons": ", ".join(WARNING_LABELS_RU[w] for w in warnings) if warnings else "",
+            "flags": flags_str,
+            "flag_codes": list(flags),
+            "comment": comment,
         }
+        items.append(item)
+        row_items[field_label] = item
+        after_by_label[field_label] = result.after
+
+    target_label, row_flags = _row_logical_flags(checker, mode, after_by_label)
+    if row_flags:
+        it = row_items[target_label]
+        it["status"] = "needs_review"
+        it["flag_codes"] = it["flag_codes"] + list(row_flags)
+        it["flags"] = ", ".join(f for f in [it["flags"], *row_flags] if f)
+        it["comment"] = ", ".join(
+            c for c in [it["comment"], *(FLAG_LABELS_RU[f] for f in row_flags)] if c
+        )
+    return items
+
+
+# Preview filters: GET parameter -> allowed codes
+PREVIEW_FILTERS = {
+    "status": UI_STATUS_LABELS_RU,
+    "warning": WARNING_LABELS_RU,
+    "flag": FLAG_LABELS_RU,
+}
+
+
+def _preview_filters(params):
+    """
+    Valid filters from the query string: {"status"|"warning"|"flag": code}.
+    """
+    return {
+        name: params.get(name)
+        for name, choices in PREVIEW_FILTERS.items()
+        if params.get(name) in choices
+    }
+
 
-    return rows_checked, stats, warnings
+def _item_matches(item, filters):
+    return (
+        ("status" not in filters or item["status"] == filters["status"])
+        and ("warning" not in filters or filters["warning"] in item["warnings"])
+        and ("flag" not in filters or filters["flag"] in item["flag_codes"])
+    )
+
+
+def _parse_page(value):
+    try:
+        return max(1, int(value))
+    except (TypeError, ValueError):
+        return 1
 
 
 def _load_active_file_from_session(request):
@@ -136,7 +234,9 @@ def _get_selection_from_session(request):
     return request.session.get(S_SELECTION)
 
 
+@instrument_view("upload_csv")
 def upload_csv(request):
+    metrics = request_metrics(request)
     context = {
         "preview_rows_limit": PREVIEW_ROWS,
         "selection_modes": [
@@ -155,7 +255,7 @@ def upload_csv(request):
         if not active_path:
             return
         try:
-            columns, rows, encoding_used, delimiter_used = _read_csv_preview(active_path)
+            columns, rows, encoding_used, delimiter_used = _read_csv_preview(active_path, metrics)
             context["has_active_file"] = True
             context["preview_columns"] = columns
             context["preview_rows"] = rows
@@ -192,6 +292,12 @@ def upload_csv(request):
             safe_name = f"{base}_{timestamp}{ext}"
 
             saved_path = default_storage.save(f"uploads/{safe_name}", uploaded)
+            try:
+                # One pass now; pagination and sharding then seek instead of scanning.
+                with metrics.stage(STAGE_READ):
+                    ensure_row_index(saved_path)
+            except OSError:
+                pass  # built lazily on first use
 
             # Save active file in session and reset selection for new file
             request.session[S_ACTIVE_FILE] = saved_path
@@ -205,7 +311,7 @@ def upload_csv(request):
             context["has_active_file"] = True
 
             try:
-                columns, rows, encoding_used, delimiter_used = _read_csv_preview(saved_path)
+                columns, rows, encoding_used, delimiter_used = _read_csv_preview(saved_path, metrics)
                 context["preview_columns"] = columns
                 context["preview_rows"] = rows
                 context["preview_encoding"] = encoding_used
@@ -227,7 +333,7 @@ def upload_csv(request):
 
             # Read preview data to compute metrics
             try:
-                columns, rows, encoding_used, delimiter_used = _read_csv_preview(active_path)
+                columns, rows, encoding_used, delimiter_used = _read_csv_preview(active_path, metrics)
                 context["has_active_file"] = True
                 context["preview_columns"] = columns
                 context["preview_rows"] = rows
@@ -294,15 +400,23 @@ def upload_csv(request):
             context["saved_selection"] = selection_payload
             context["selection_saved"] = True
 
-            rows_checked, stats, warnings = _compute_column_stats(
-                columns=columns,
-                rows=rows,
-                selected_column_names=selected_columns_for_metrics,
-                examples_limit=5,
-            )
+            try:
+                with metrics.stage(STAGE_PARSE):
+                    rows_checked, stats, warnings, complete = profile_columns(
+                        active_path,
+                        selected_columns_for_metrics,
+                        encoding=encoding_used,
+                        delimiter=delimiter_used,
+                        max_rows=profile_settings()["MAX_ROWS"],
+                        metrics=metrics,
+                    )
+            except Exception:
+                context["selection_error"] = "Выбор сохранён, но не удалось посчитать метрики по файлу."
+                return render(request, "uploads/upload.html", context)
 
             context["selection_human"] = human_labels
             context["metrics_rows_checked"] = rows_checked
+            context["metrics_complete"] = complete
             context["metrics_stats"] = stats
             context["metrics_warnings"] = warnings
 
@@ -319,11 +433,13 @@ def upload_csv(request):
     hydrate_preview_for_active_file()
     return render(request, "uploads/upload.html", context)
 
+@instrument_view("normalize_preview")
 def normalize_preview(request):
     """
     Step 2.3: normalization preview page (no persistence).
     Shows how Step 2.2 safe normalization changes values for selected FIO columns.
     """
+    metrics = request_metrics(request)
     active_path = _load_active_file_from_session(request)
     selection = _get_selection_from_session(request)
 
@@ -344,7 +460,8 @@ def normalize_preview(request):
         return render(request, "uploads/normalize_preview.html", context)
 
     try:
-        columns, rows, encoding_used, delimiter_used = _read_csv_preview(active_path)
+        encoding_used, delimiter_used, _ = _detect_csv_format(active_path, metrics)
+        columns, data_start = _read_csv_header(active_path, encoding_used, delimiter_used)
         context["preview_encoding"] = encoding_used
         context["preview_delimiter"] = delimiter_used
     except ValueError as e:
@@ -376,45 +493,95 @@ def normalize_preview(request):
         context["error"] = "Выбор полей ФИО пустой. Вернитесь назад и выберите хотя бы одно поле."
         return render(request, "uploads/normalize_preview.html", context)
 
-    # Prepare preview items
-    items = []
-    for row_i, r in enumerate(rows, start=1):
-        for field_label, col_name in selected_fields:
-            idx = col_index.get(col_name)
-            before_val = r[idx] if idx is not None and idx < len(r) else ""
-            result = normalize_fio_value(before_val)
+    mode = selection["mode"]
+    filters = _preview_filters(request.GET)
+    page = _parse_page(request.GET.get("page"))
+    first = (page - 1) * PREVIEW_ROWS
 
-            items.append(
-                {
-                    "row_num": row_i,
-                    "field_label": field_label,
-                    "column_name": col_name,
-                    "before": before_val,
-                    "after": result.after,
-                    "status": None,  # computed below
-                    "applied_rules": ", ".join(result.applied_rules) if result.applied_rules else "",
-                    "warnings": detect_warnings(before_val),
-                    "attention": ATTENTION_LABEL_RU if detect_warnings(before_val) else "",
-                    "attention_reasons": ", ".join(WARNING_LABELS_RU[w] for w in detect_warnings(before_val)) if detect_warnings(before_val) else "",
-                    "flags": "",
-                    "comment": "",
-                }
-            )
-            flags = detect_flags(before_val)
+    # Only the selected columns are decoded: values[k] belongs to selected_fields[k].
+    indexes = [col_index.get(col) for _, col in selected_fields]
+    value_index = {col: k for k, (_, col) in enumerate(selected_fields)}
+    name_dictionary = _get_name_dictionary()
+    checker = NamePatronymicChecker(name_dictionary.name_gender) if name_dictionary else None
 
-            if flags:
-                status = "needs_review"
-                flags_str = ", ".join(flags)
-                comment = ", ".join(FLAG_LABELS_RU[f] for f in flags)
-            else:
-                status = result.status
-                flags_str = ""
-                comment = ""
+    def row_matches(row_num, values):
+        return any(
+            _item_matches(it, filters)
+            for it in _build_row_items(row_num, values, value_index, selected_fields, mode, checker)
+        )
 
-            items[-1]["status"] = status
-            items[-1]["flags"] = flags_str
-            items[-1]["comment"] = comment
+    # Decoding errors past the sniffed sample and malformed rows surface here.
+    try:
+        if filters:
+            # Row numbers / offsets of the matching rows, extended only as far as this page needs.
+            index_path = index_storage_path(
+                active_path,
+                {
+                    "encoding": encoding_used,
+                    "delimiter": delimiter_used,
+                    "selection": selection,
+                    "filters": filters,
+                    # name_patronymic_mismatch depends on the dictionary
+                    "dictionary": name_dictionary.meta.sha256 if name_dictionary else None,
+                },
+            )
+            index = PreviewIndex.load(index_path) or PreviewIndex(data_start)
+            with metrics.stage(STAGE_PARSE):
+                scanned = index.extend(
+                    active_path,
+                    encoding=encoding_used,
+                    delimiter=delimiter_used,
+                    matches=row_matches,
+                    indexes=indexes,
+                    until=first + PREVIEW_ROWS,
+                )
+            if scanned:
+                index.save(index_path)
+            entries = index.entries(first, first + PREVIEW_ROWS)
+            matched_rows, index_complete, scanned_rows = len(index), index.complete, index.scanned_rows
+        else:
+            # All rows: seek through the sparse row index.
+            scanned = 0
+            row_index = ensure_row_index(active_path)
+            with metrics.stage(STAGE_PARSE), default_storage.open(active_path, "rb") as raw:
+                entries = []
+                for row_num, offset, _ in row_index.iter_rows(raw, first + 1):
+                    entries.append((row_num, offset))
+                    if len(entries) >= PREVIEW_ROWS:
+                        break
+            matched_rows = scanned_rows = row_index.data_rows
+            index_complete = True
+        metrics.incr(COUNTER_ROWS_READ, scanned + len(entries))
+
+        # Prepare preview items (this page only)
+        items = []
+        with metrics.stage(STAGE_ANALYZE), default_storage.open(active_path, "rb") as raw:
+            for row_num, offset in entries:
+                values = project_values(read_record_at(raw, offset), indexes, encoding_used, delimiter_used)
+                items.extend(_build_row_items(row_num, values, value_index, selected_fields, mode, checker))
+    except UnicodeDecodeError:
+        context["error"] = f"Не удалось прочитать файл в кодировке {encoding_used}: в нём есть недопустимые байты."
+        return render(request, "uploads/normalize_preview.html", context)
+    except Exception:
+        context["error"] = "Не удалось построить предпросмотр файла."
+        return render(request, "uploads/normalize_preview.html", context)
+    metrics.incr(COUNTER_VALUES_ANALYZED, len(items))
 
+    # A short page before the end of the scan: "show more" continues the same page.
+    if len(entries) < PREVIEW_ROWS and not index_complete:
+        next_page = page
+    elif matched_rows > first + PREVIEW_ROWS or not index_complete:
+        next_page = page + 1
+    else:
+        next_page = None
+    context["page"] = page
+    context["filters"] = filters
+    context["filter_choices"] = {name: list(choices.items()) for name, choices in PREVIEW_FILTERS.items()}
+    context["matched_rows"] = matched_rows
+    context["index_complete"] = index_complete
+    context["scanned_rows"] = scanned_rows
+    context["next_url"] = "?" + urlencode({**filters, "page": next_page}) if next_page else None
+    context["prev_url"] = "?" + urlencode({**filters, "page": page - 1}) if page > 1 else None
 
     total = len(items)
     ok_count = sum(1 for it in items if it.get("status") == "ok")
@@ -0,0 +1,34 @@
+"""
+Django for the view and database tests: config.settings with a temporary
+database and MEDIA_ROOT, migrated once per test process.
+"""
+
+import atexit
+import os
+import shutil
+import sys
+import tempfile
+
+sys.path.insert(0, "src")
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+
+_tmp = None
+
+
+def setup() -> None:
+    global _tmp
+    if _tmp is not None:
+        return
+    import django
+    from django.conf import settings
+
+    _tmp = tempfile.mkdtemp()
+    atexit.register(shutil.rmtree, _tmp, ignore_errors=True)
+    settings.DATABASES["default"]["NAME"] = os.path.join(_tmp, "db.sqlite3")
+    settings.MEDIA_ROOT = os.path.join(_tmp, "media")
+    django.setup()
+    from django.core.management import call_command
+    from django.test.utils import setup_test_environment
+
+    setup_test_environment()  # testserver host, response.context
+    call_command("migrate", verbosity=0)
@@ -0,0 +1,54 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Import of the CLI entry point (best of a few runs, in a fresh interpreter)
+IMPORT_BUDGET_SECONDS = 0.1
+
+PROBE = """
+import sys, time
+sys.path.insert(0, "src")
+started = time.perf_counter()
+from apps.fio_runstore import cli
+elapsed = time.perf_counter() - started
+if len(sys.argv) > 1:
+    cli.main(sys.argv[1:])
+django = sorted(m for m in sys.modules if m == "django" or m.startswith("django."))
+print(elapsed, len(django), file=sys.stderr)
+"""
+
+
+def _probe(*args):
+    proc = subprocess.run(
+        [sys.executable, "-c", PROBE, *args],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    elapsed, django_modules = proc.stderr.strip().splitlines()[-1].split()
+    return float(elapsed), int(django_modules)
+
+
+class TestCliStartup(unittest.TestCase):
+    def test_import_budget(self):
+        elapsed = min(_probe()[0] for _ in range(3))
+        self.assertLess(elapsed, IMPORT_BUDGET_SECONDS)
+
+    def test_export_does_not_import_django(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            source = os.path.join(tmp, "a.csv")
+            with open(source, "w", encoding="utf-8") as f:
+                f.write("ФИО;x\nИванов Иван;1\nIvanov Ivan;2\n")
+            _, django_modules = _probe(source, "--fio-column", "ФИО", "--workers", "1")
+            self.assertTrue(os.path.exists(os.path.join(tmp, "a.fio.csv")))
+        self.assertEqual(django_modules, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
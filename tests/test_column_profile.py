@@ -0,0 +1,80 @@
+import sys
+import unittest
+
+sys.path.insert(0, "src")
+
+from uploads.column_profile import ColumnProfile, HyperLogLog, Reservoir, SpaceSaving  # noqa: E402
+
+
+class TestHyperLogLog(unittest.TestCase):
+    def test_estimate_within_error(self):
+        for n in (10, 1000, 50_000):
+            hll = HyperLogLog()
+            for i in range(n):
+                hll.add(f"Иванов{i}")
+                hll.add(f"Иванов{i}")  # duplicates do not count
+            self.assertLess(abs(hll.estimate() - n) / n, 0.05, n)
+
+
+class TestSpaceSaving(unittest.TestCase):
+    def test_finds_heavy_hitters(self):
+        counter = SpaceSaving(capacity=16)
+        for i in range(20_000):
+            counter.add("Иванов" if i % 5 == 0 else "Петров" if i % 7 == 0 else f"редкое{i}")
+        top = counter.top(2)
+        self.assertEqual([t["value"] for t in top], ["Иванов", "Петров"])
+        self.assertLessEqual(top[0]["guaranteed"], 4000)
+        self.assertGreaterEqual(top[0]["count"], 4000)
+
+    def test_exact_when_under_capacity(self):
+        counter = SpaceSaving(capacity=8)
+        for v in "aabbbc":
+            counter.add(v)
+        self.assertEqual(counter.top(3), [
+            {"value": "b", "count": 3, "guaranteed": 3},
+            {"value": "a", "count": 2, "guaranteed": 2},
+            {"value": "c", "count": 1, "guaranteed": 1},
+        ])
+
+
+class TestReservoir(unittest.TestCase):
+    def _sample(self, seed, n=10_000):
+        r = Reservoir(5, seed=seed)
+        for i in range(n):
+            r.add(str(i))
+        return r.items
+
+    def test_fixed_seed_is_reproducible(self):
+        self.assertEqual(self._sample("a"), self._sample("a"))
+        self.assertNotEqual(self._sample("a"), self._sample("b"))
+
+    def test_short_stream_kept_whole(self):
+        self.assertEqual(self._sample(1, n=3), ["0", "1", "2"])
+
+    def test_roughly_uniform(self):
+        late = sum(int(v) >= 5000 for seed in range(200) for v in self._sample(seed))
+        self.assertGreater(late, 400)
+        self.assertLess(late, 600)
+
+
+class TestColumnProfile(unittest.TestCase):
+    def test_counts(self):
+        profile = ColumnProfile("ФИО")
+        for v in ["Иванов", "", None, "Петров", "Иванов"]:
+            profile.add(v)
+        stats = profile.as_dict()
+        self.assertEqual((stats["filled_count"], stats["fill_rate"], stats["distinct_estimate"]), (3, 60.0, 2))
+        self.assertEqual(stats["top_values"][0]["value"], "Иванов")
+        self.assertEqual(sorted(stats["examples"]), ["Иванов", "Петров"])
+
+    def test_examples_are_distinct(self):
+        profile = ColumnProfile("ФИО")
+        for i in range(10_000):
+            profile.add("Иванов" if i % 2 else f"Петров{i % 7}")
+        examples = profile.as_dict()["examples"]
+        self.assertEqual(len(examples), 5)
+        self.assertEqual(len(set(examples)), 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,48 @@
+import sys
+import unittest
+
+sys.path.insert(0, "src")
+
+from uploads.csv_dialect import guess_delimiter  # noqa: E402
+
+
+def _sample(delimiter, rows=50, width=6):
+    header = delimiter.join(f"поле{i}" for i in range(width))
+    body = [delimiter.join(f"Иванов{r}" if i == 0 else str(r * i) for i in range(width)) for r in range(rows)]
+    return "\r\n".join([header] + body) + "\r\n"
+
+
+class TestGuessDelimiter(unittest.TestCase):
+    def test_candidates(self):
+        for delimiter in (";", ",", "\t", "|"):
+            guess = guess_delimiter(_sample(delimiter))
+            self.assertEqual((guess.delimiter, guess.fields), (delimiter, 6), repr(delimiter))
+            self.assertGreater(guess.confidence, 0.9)
+
+    def test_commas_inside_values_of_semicolon_export(self):
+        text = "ФИО;Город\n" + "".join(f"Иванов, Иван {i};Москва, ул. {i}\n" for i in range(30))
+        guess = guess_delimiter(text)
+        self.assertEqual(guess.delimiter, ";")
+
+    def test_delimiters_inside_quotes_are_ignored(self):
+        text = "a;b\n" + "".join(f'"x, y, {i}\nz|w";{i}\n' for i in range(30))
+        guess = guess_delimiter(text)
+        self.assertEqual((guess.delimiter, guess.records), (";", 31))
+        self.assertEqual(guess.confidence, 1.0)
+
+    def test_cut_last_record_is_dropped(self):
+        text = _sample(";", rows=10) + "Иванов;1;2"
+        self.assertEqual(guess_delimiter(text).records, 11)
+        self.assertEqual(guess_delimiter(text, complete=True).records, 12)
+
+    def test_single_column(self):
+        guess = guess_delimiter("ФИО\nИванов Иван\nПетров Петр\n", complete=True)
+        self.assertEqual((guess.delimiter, guess.confidence, guess.fields), (",", 1.0, 1))
+
+    def test_ambiguous_has_low_confidence(self):
+        text = "a;b,c\n" + "".join(f"{i};x,y\n" for i in range(20))
+        self.assertEqual(guess_delimiter(text).confidence, 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,263 @@
+import csv
+import io
+import os
+import sys
+import tempfile
+import unittest
+from itertools import islice
+from unittest import mock
+
+sys.path.insert(0, "src")
+sys.path.insert(0, "tests")
+
+import django_env  # noqa: E402
+from uploads import csv_arrow  # noqa: E402
+from uploads.csv_arrow import ArrowFallback, iter_arrow_rows, next_segment, pyarrow_available  # noqa: E402
+from uploads.csv_stream import iter_records, iter_records_mmap, parse_record, project_record  # noqa: E402
+from apps.fio_runstore.instrumentation import COUNTER_BYTES_READ, RunMetrics  # noqa: E402
+from apps.fio_runstore.memory import NULL_MEMORY  # noqa: E402
+from uploads.csv_projection import _MeteredRaw, project_values  # noqa: E402
+from uploads.row_index import RowIndex, build_row_index  # noqa: E402
+
+
+def _csv_bytes(rows):
+    out = io.StringIO()
+    csv.writer(out, delimiter=";", lineterminator="\n").writerows(rows)
+    return out.getvalue().encode("utf-8")
+
+
+ROWS = [["фио", "комментарий"]] + [
+    [f"Иванов{i} Иван", f'строка "{i}"\nс переносом' if i % 3 == 0 else str(i)] for i in range(1, 48)
+]
+DATA = _csv_bytes(ROWS)
+
+
+class TestIterRecords(unittest.TestCase):
+    def test_quoted_newlines_stay_in_record(self):
+        records = list(iter_records(io.BytesIO(DATA)))
+        self.assertEqual(len(records), len(ROWS))
+        self.assertEqual([parse_record(r, "utf-8", ";") for _, r in records], ROWS)
+
+    def test_offsets_allow_seeking(self):
+        records = list(iter_records(io.BytesIO(DATA), chunk_size=7))
+        offset, record = records[9]
+        self.assertEqual(DATA[offset : offset + len(record)], record)
+        self.assertEqual(next(iter_records(io.BytesIO(DATA), offset))[1], record)
+
+    def test_last_record_without_newline(self):
+        records = list(iter_records(io.BytesIO(b'a;b\n"x\ny";z')))
+        self.assertEqual([r for _, r in records], [b"a;b\n", b'"x\ny";z'])
+
+    def test_stray_quote_keeps_later_rows(self):
+        data = b'a,b\n1,ab"c\n2,3\n'
+        expected = list(csv.reader(io.StringIO(data.decode())))
+        with tempfile.NamedTemporaryFile(delete=False) as f:
+            f.write(data)
+        try:
+            for records in (
+                list(iter_records(io.BytesIO(data))),
+                list(iter_records(io.BytesIO(data), chunk_size=3)),
+                list(iter_records_mmap(f.name)),
+            ):
+                self.assertEqual([parse_record(r, "utf-8", ",") for _, r in records], expected)
+                self.assertEqual([data[o : o + len(r)] for o, r in records], [r for _, r in records])
+        finally:
+            os.unlink(f.name)
+
+    def test_stray_quote_on_last_line_without_newline(self):
+        data = b'a,b\n1,2\n3,x"y'
+        with tempfile.NamedTemporaryFile(delete=False) as f:
+            f.write(data)
+        try:
+            for records in (
+                list(islice(iter_records(io.BytesIO(data)), 10)),
+                list(islice(iter_records(io.BytesIO(data), chunk_size=3), 10)),
+                list(islice(iter_records_mmap(f.name), 10)),
+            ):
+                self.assertEqual(records, [(0, b"a,b\n"), (4, b"1,2\n"), (8, b'3,x"y')])
+        finally:
+            os.unlink(f.name)
+
+
+class TestProjection(unittest.TestCase):
+    def test_matches_csv_reader(self):
+        for _, record in iter_records(io.BytesIO(DATA)):
+            row = parse_record(record, "utf-8", ";")
+            self.assertEqual(project_record(record, [1, 0, 5], "utf-8", ";"), [row[1], row[0], None])
+
+    def test_crlf_and_bom(self):
+        self.assertEqual(project_record(b"a;b\r\n", [1], "utf-8-sig", ";"), ["b"])
+        self.assertEqual(project_record(b"\r\n", [0], "utf-8", ";"), [None])
+
+    def test_project_values_strips_and_marks_missing(self):
+        self.assertEqual(project_values(b" a ; b ;c\n", [2, None, 0, 7], "utf-8", ";"), ["c", None, "a", None])
+
+    def test_mmap_records_match_stream(self):
+        with tempfile.NamedTemporaryFile(delete=False) as f:
+            f.write(DATA)
+        try:
+            self.assertEqual(list(iter_records_mmap(f.name)), list(iter_records(io.BytesIO(DATA))))
+        finally:
+            os.unlink(f.name)
+
+    def test_metered_reads_match_stream(self):
+        metrics = RunMetrics()
+        raw = _MeteredRaw(io.BytesIO(DATA), metrics, NULL_MEMORY)
+        self.assertEqual(list(iter_records(raw, chunk_size=64)), list(iter_records(io.BytesIO(DATA))))
+        self.assertEqual(metrics.counters[COUNTER_BYTES_READ], len(DATA))
+
+
+def _arrow_rows(data, indexes, *, encoding="utf-8", delimiter=";"):
+    """iter_arrow_rows over the data rows after the header."""
+    header = next(iter_records(io.BytesIO(data)))[1]
+    width = len(parse_record(header, encoding, delimiter))
+    return iter_arrow_rows(io.BytesIO(data), len(header), len(data), width, indexes, encoding=encoding, delimiter=delimiter)
+
+
+def _segments(data, limit=csv_arrow.SEGMENT_BYTES):
+    raw, pos, out = io.BytesIO(data), len(next(iter_records(io.BytesIO(data)))[1]), []
+    while pos < len(data):
+        end, arrow = next_segment(raw, pos, len(data), limit)
+        out.append((data[pos:end], arrow))
+        pos = end
+    return out
+
+
+@unittest.skipUnless(pyarrow_available(), "pyarrow is not installed")
+class TestArrowRows(unittest.TestCase):
+    def test_matches_projection(self):
+        expected = [project_values(r, [1, None, 0], "utf-8", ";") for _, r in list(iter_records(io.BytesIO(DATA)))[1:]]
+        self.assertEqual(list(_arrow_rows(DATA, [1, None, 0])), expected)
+
+    def test_cp1251(self):
+        data = "а|б\r\n1|Петров \r\n".encode("cp1251")
+        self.assertEqual(list(_arrow_rows(data, [1], encoding="cp1251", delimiter="|")), [["Петров"]])
+
+    def test_short_row_falls_back(self):
+        with self.assertRaises(ArrowFallback):
+            list(_arrow_rows(b"a;b\n1;2\n3\n", [0]))
+
+    def test_empty_selected_cells_stay_on_arrow(self):
+        self.assertEqual(list(_arrow_rows(b"a;b\n;2\n3;\n", [0])), [[""], ["3"]])
+
+    def test_missing_columns_only(self):
+        self.assertEqual(list(_arrow_rows(b"a;b\n1;2\n", [None])), [[None]])
+
+
+class TestSegments(unittest.TestCase):
+    def test_blank_lines_are_own_segments(self):
+        data = b"a;b\n1;2\n\n3;4\r\n\r\n\n5;6\n"
+        self.assertEqual(
+            _segments(data),
+            [(b"1;2\n", True), (b"\n", False), (b"3;4\r\n", True), (b"\r\n", False), (b"\n", False), (b"5;6\n", True)],
+        )
+
+    def test_blank_line_inside_quotes(self):
+        data = b'a;b\n1;"x\n\ny"\n2;3\n'
+        self.assertEqual(_segments(data), [(data[4:], True)])
+
+    def test_unbalanced_quote_at_the_end(self):
+        data = b'a;b\n1;2\n3;"x\n4;5\n'
+        self.assertEqual(_segments(data), [(data[4:], False)])
+
+    def test_limit_splits_on_records(self):
+        with mock.patch.object(csv_arrow, "SCAN_CHUNK_BYTES", 64):
+            segments = _segments(DATA, limit=100)
+        self.assertGreater(len(segments), 2)
+        self.assertEqual(b"".join(s for s, _ in segments), DATA[len(next(iter_records(io.BytesIO(DATA)))[1]):])
+        offsets = {offset for offset, _ in iter_records(io.BytesIO(DATA))}
+        end = len(DATA) - sum(len(s) for s, _ in segments)
+        for segment, arrow in segments:
+            self.assertIn(end, offsets)
+            self.assertTrue(arrow)
+            end += len(segment)
+
+
+@unittest.skipUnless(pyarrow_available(), "pyarrow is not installed")
+class TestProjectedReaderBackends(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        django_env.setup()
+
+    def _read(self, data, backend, columns=("a", "b")):
+        from django.core.files.base import ContentFile
+        from django.core.files.storage import default_storage
+        from uploads.csv_projection import ProjectedReader
+
+        path = default_storage.save("uploads/backends.csv", ContentFile(data))
+        try:
+            with ProjectedReader(path, columns, encoding="utf-8", delimiter=";", backend=backend) as reader:
+                return list(reader)
+        finally:
+            default_storage.delete(path)
+
+    def assertSameRows(self, data, columns=("a", "b")):
+        expected = self._read(data, "python", columns)
+        self.assertEqual(self._read(data, "pyarrow", columns), expected)
+        return expected
+
+    def test_blank_lines(self):
+        rows = self.assertSameRows(b"a;b\n1;2\n\n3;4\n\n")
+        self.assertEqual(rows, [["1", "2"], [None, None], ["3", "4"], [None, None]])
+
+    def test_single_column(self):
+        self.assertSameRows(b"a\nx\n\ny\n", ("a",))
+
+    def test_short_row_resumes_in_segment(self):
+        data = b"a;b\n" + b"".join(b"%d;x\n" % i for i in range(20)) + b"7\n" + b"8;y\n"
+        with mock.patch.object(csv_arrow, "SCAN_CHUNK_BYTES", 16):
+            with mock.patch.object(csv_arrow, "SEGMENT_BYTES", 32):
+                rows = self.assertSameRows(data)
+        self.assertEqual(len(rows), 22)
+
+    def test_quoted_newlines_and_unbalanced_tail(self):
+        self.assertSameRows(DATA.replace("фио".encode(), b"a").replace("комментарий".encode(), b"b") + b'1;"x\n2;3')
+
+class TestRowIndex(unittest.TestCase):
+    def test_matches_full_scan(self):
+        offsets = [offset for offset, _ in iter_records(io.BytesIO(DATA))]
+        for chunk_size in (5, 64, 1 << 20):
+            index = build_row_index(io.BytesIO(DATA), step=10, chunk_size=chunk_size)
+            self.assertEqual(index.records, len(ROWS))
+            self.assertEqual(list(index.offsets), offsets[::10])
+
+    def test_stray_quote_matches_full_scan(self):
+        data = DATA + b'1;ab"c\n' + b"".join(b"%d;x\n" % i for i in range(25))
+        offsets = [offset for offset, _ in iter_records(io.BytesIO(data))]
+        for chunk_size in (5, 1 << 20):
+            index = build_row_index(io.BytesIO(data), step=10, chunk_size=chunk_size)
+            self.assertEqual(index.records, len(offsets))
+            self.assertEqual(list(index.offsets), offsets[::10])
+
+    def test_stray_quote_on_last_line_without_newline(self):
+        index = build_row_index(io.BytesIO(b'fio,x\nIvanov,1\nPetrov "x,2'), step=1)
+        self.assertEqual(index.records, 3)
+        self.assertEqual(list(index.offsets), [0, 6, 15])
+
+    def test_iter_rows_from_any_row(self):
+        raw = io.BytesIO(DATA)
+        index = build_row_index(raw, step=10)
+        row_num, _, record = next(index.iter_rows(raw, 23))
+        self.assertEqual(row_num, 23)
+        self.assertEqual(parse_record(record, "utf-8", ";"), ROWS[23])
+        self.assertEqual(list(index.iter_rows(raw, len(ROWS))), [])
+
+    def test_shards_cover_all_bytes(self):
+        raw = io.BytesIO(DATA)
+        index = build_row_index(raw, step=10)
+        shards = index.shards(raw, 3)
+        self.assertEqual([first for first, _, _ in shards], [1, 21, 41])
+        self.assertEqual(shards[-1][2], len(DATA))
+        for (_, _, end), (_, start, _) in zip(shards, shards[1:]):
+            self.assertEqual(end, start)
+
+    def test_round_trip(self):
+        index = build_row_index(io.BytesIO(DATA), step=10)
+        restored = RowIndex.from_bytes(index.to_bytes())
+        self.assertEqual(list(restored.offsets), list(index.offsets))
+        self.assertEqual((restored.records, restored.size), (index.records, index.size))
+        self.assertIsNone(RowIndex.from_bytes(b"garbage"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, "tests")
+
+import django_env  # noqa: E402
+
+
+def setUpModule():
+    django_env.setup()
+
+
+class TestSuggestionWriter(unittest.TestCase):
+    def setUp(self):
+        from apps.fio_runstore import db_writer
+        from apps.fio_runstore.models import Run, Suggestion
+
+        self.db_writer = db_writer
+        run = Run.objects.create(source_csv_path="uploads/writer.csv", selection={})
+        self.batch = [
+            Suggestion(
+                run=run,
+                row_id=i,
+                field_name="fio",
+                before_value="x",
+                suggested_value="y",
+                suggestion_code="TEST",
+                confidence="high",
+                message="",
+                generator="test",
+                generator_version="1",
+            )
+            for i in range(1, 4)
+        ]
+
+    def test_connection_error_goes_through_the_retry(self):
+        writer = self.db_writer.SuggestionWriter(4, 100)
+        ticket = self.db_writer.WriteTicket()
+        with mock.patch.object(self.db_writer, "close_old_connections", side_effect=RuntimeError("gone")):
+            writer.submit(ticket, self.batch)
+            ticket.wait()
+        self.assertEqual(ticket.written, 3)
+        self.assertTrue(writer.alive)
+        writer.stop(timeout=5)
+
+    def test_dead_writer_fails_its_batches_and_is_replaced(self):
+        writer = self.db_writer.SuggestionWriter(1, 100)
+        first, second = self.db_writer.WriteTicket(), self.db_writer.WriteTicket()
+        # threading.excepthook: the thread dies as intended
+        with mock.patch.object(writer, "_write", side_effect=SystemExit), mock.patch("threading.excepthook"):
+            writer.submit(first, self.batch)
+            writer._thread.join(timeout=5)
+        self.assertFalse(writer.alive)
+        writer.submit(second, self.batch)  # does not block on the dead writer
+        for ticket in (first, second):
+            with self.assertRaises(SystemExit):
+                ticket.wait()
+
+        with mock.patch.object(self.db_writer, "_writer", writer), mock.patch.object(
+            self.db_writer, "_writer_pid", os.getpid()
+        ):
+            replacement = self.db_writer.get_writer()
+            self.assertIsNot(replacement, writer)
+            self.assertTrue(replacement.alive)
+            replacement.stop(timeout=5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+import csv
+import io
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, "src")
+
+from apps.fio_runstore.export import EXPORT_COLUMNS, export_csv, export_stream  # noqa: E402
+from apps.fio_runstore.generator.name_dictionary import NameDictMeta, NameDictionary  # noqa: E402
+from domain.fio.consistency import build_name_gender_table  # noqa: E402
+
+
+NAMES = [("Александр", "Саша"), ("Иван", ""), ("Анна", ""), ("Дарья", ""), ("Ольга", "")]
+
+
+def _dictionary():
+    return NameDictionary(
+        variant_map={variant: canonical for canonical, variant in NAMES if variant},
+        canonical_names=sorted(canonical for canonical, _ in NAMES),
+        name_gender=build_name_gender_table([(c, c) for c, _ in NAMES]),
+        meta=NameDictMeta(path="names.csv", sha256="0" * 64, total_rows=len(NAMES), enabled_rows=1),
+    )
+
+
+def _export(text, selection, delimiter=";"):
+    out = io.StringIO()
+    result = export_csv(io.StringIO(text), out, selection, _dictionary(), delimiter=delimiter)
+    rows = list(csv.reader(io.StringIO(out.getvalue()), delimiter=delimiter))
+    return result, rows
+
+
+class _Unseekable(io.RawIOBase):
+    def __init__(self, data):
+        self._data = io.BytesIO(data)
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        return self._data.readinto(b)
+
+
+class TestExport(unittest.TestCase):
+    def test_single_field(self):
+        text = "id;ФИО\n1;  ИВАНОВ   ИВАН  \n2;Петров Алексанр\n3;Ivanov Ivan\n4;Смирнова Анна Иванович\n5;Петров Иван\n"
+        result, rows = _export(text, {"mode": "single", "fio_column": "ФИО"})
+
+        self.assertEqual(rows[0], ["id", "ФИО", *EXPORT_COLUMNS])
+        by_id = {row[0]: dict(zip(EXPORT_COLUMNS, row[2:])) for row in rows[1:]}
+        self.assertEqual(by_id["1"]["fio_norm"], "Иванов Иван")
+        self.assertEqual((by_id["1"]["fio_status"], by_id["1"]["fio_suggest"]), ("fixed", ""))
+        self.assertEqual(by_id["2"]["fio_suggest"], "Петров Александр")  # typo in the first name
+        self.assertEqual(by_id["2"]["fio_status"], "needs_review")
+        self.assertEqual(by_id["3"]["fio_suggest"], "Иванов Иван")
+        self.assertEqual(by_id["3"]["fio_flags"], "latin_only")
+        self.assertEqual(by_id["4"]["fio_flags"], "name_patronymic_mismatch")
+        self.assertEqual(by_id["5"]["fio_status"], "ok")
+        self.assertEqual(result, {"rows": 5, "ok": 1, "fixed": 1, "needs_review": 3})
+
+    def test_split_fields_and_short_rows(self):
+        text = "Фамилия,Имя,Отчество,x\nиванов,Саша,,1\nПетрова\n"
+        selection = {"mode": "split", "last_name_column": "Фамилия", "first_name_column": "Имя"}
+        _, rows = _export(text, selection, delimiter=",")
+
+        self.assertEqual(rows[1][4:8], ["иванов Саша", "Иванов Саша", "Иванов Александр", "needs_review"])
+        self.assertEqual(len(rows[2]), len(rows[0]))  # padded to the header
+        self.assertEqual(rows[2][4:8], ["Петрова", "Петрова", "", "ok"])
+
+    def test_missing_column(self):
+        with self.assertRaises(ValueError):
+            _export("a;b\n1;2\n", {"mode": "single", "fio_column": "ФИО"})
+
+    def test_stream_detects_format(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            names = os.path.join(tmp, "names.csv")
+            with open(names, "w", encoding="utf-8") as f:
+                f.write("canonical,variant,enabled,note,source\nИван,,1,,base\n")
+            data = "ФИО;Город\n" + "".join(f"Иванов Иван;Город {i}\n" for i in range(5000))
+            out = io.StringIO()
+            result = export_stream(
+                _Unseekable(data.encode("cp1251")),
+                out,
+                {"mode": "single", "fio_column": "ФИО"},
+                dictionary_path=names,
+            )
+
+        self.assertEqual((result["encoding"], result["delimiter"], result["rows"]), ("cp1251", ";", 5000))
+        self.assertEqual(out.getvalue().splitlines()[-1], "Иванов Иван;Город 4999;Иванов Иван;Иванов Иван;;ok;;")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+import sys
+import unittest
+
+sys.path.insert(0, "src")
+
+from domain.fio.consistency import (  # noqa: E402
+    NamePatronymicChecker,
+    build_name_gender_table,
+    guess_gender_by_name,
+    patronymic_gender,
+)
+from domain.fio.constants import (  # noqa: E402
+    FLAG_NAME_PATRONYMIC_MISMATCH,
+    GENDER_FEMALE,
+    GENDER_MALE,
+)
+
+
+PAIRS = [
+    ("Иван", "Иван"),
+    ("Ваня", "Иван"),
+    ("Анна", "Анна"),
+    ("Никита", "Никита"),
+    ("Валентин", "Валентин"),
+    ("Валентина", "Валентина"),
+    ("Валя", "Валентин"),
+    ("Валя", "Валентина"),
+]
+
+
+class TestGenderTables(unittest.TestCase):
+    def test_guess_gender_by_name(self):
+        self.assertEqual(guess_gender_by_name("Иван"), GENDER_MALE)
+        self.assertEqual(guess_gender_by_name("Анна"), GENDER_FEMALE)
+        self.assertEqual(guess_gender_by_name("Никита"), GENDER_MALE)
+        self.assertEqual(guess_gender_by_name("Любовь"), GENDER_FEMALE)
+
+    def test_variants_inherit_gender_and_ambiguous_are_dropped(self):
+        table = build_name_gender_table(PAIRS)
+        self.assertEqual(table["ваня"], GENDER_MALE)
+        self.assertNotIn("валя", table)
+
+    def test_patronymic_gender(self):
+        self.assertEqual(patronymic_gender("Петрович"), GENDER_MALE)
+        self.assertEqual(patronymic_gender("Ильич"), GENDER_MALE)
+        self.assertEqual(patronymic_gender("Ильинична"), GENDER_FEMALE)
+        self.assertEqual(patronymic_gender("Никитична"), GENDER_FEMALE)
+        self.assertIsNone(patronymic_gender("Иванов"))
+
+
+class TestNamePatronymicChecker(unittest.TestCase):
+    def setUp(self):
+        self.checker = NamePatronymicChecker(build_name_gender_table(PAIRS))
+
+    def test_mismatch_is_flagged(self):
+        self.assertEqual(self.checker.check("Иван", "Петровна"), [FLAG_NAME_PATRONYMIC_MISMATCH])
+        self.assertEqual(self.checker.check("Ваня", "Петровна"), [FLAG_NAME_PATRONYMIC_MISMATCH])
+
+    def test_consistent_incomplete_or_ambiguous_rows_are_not_flagged(self):
+        self.assertEqual(self.checker.check("Анна", "Петровна"), [])
+        self.assertEqual(self.checker.check("Анна", ""), [])
+        self.assertEqual(self.checker.check("Валя", "Петрович"), [])
+        self.assertEqual(self.checker.check("Джон", "Петровна"), [])
+
+    def test_single_field_mode(self):
+        self.assertEqual(self.checker.check_fio("Иванов Иван Петровна"), [FLAG_NAME_PATRONYMIC_MISMATCH])
+        self.assertEqual(self.checker.check_fio("Иванов Иван"), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
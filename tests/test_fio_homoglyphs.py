@@ -0,0 +1,41 @@
+import sys
+import unittest
+
+sys.path.insert(0, "src")
+
+from domain.fio.homoglyphs import (  # noqa: E402
+    SCRIPT_CYRILLIC,
+    SCRIPT_LATIN,
+    fix_homoglyphs,
+)
+
+
+class TestFixHomoglyphs(unittest.TestCase):
+    def test_latin_lookalikes_in_cyrillic_value(self):
+        fix = fix_homoglyphs("Cидоров")
+        self.assertEqual(fix.after, "Сидоров")
+        self.assertEqual(fix.target_script, SCRIPT_CYRILLIC)
+        self.assertEqual(fix.replacements, [(0, "C", "С")])
+
+    def test_digit_zero_at_word_start_is_uppercased(self):
+        fix = fix_homoglyphs("Сидоров 0лег")
+        self.assertEqual(fix.after, "Сидоров Олег")
+        self.assertEqual(fix.replacements, [(8, "0", "О")])
+
+    def test_cyrillic_lookalikes_in_latin_value(self):
+        fix = fix_homoglyphs("Ivanоv")
+        self.assertEqual(fix.after, "Ivanov")
+        self.assertEqual(fix.target_script, SCRIPT_LATIN)
+
+    def test_unexplained_mix_is_not_fixed(self):
+        # "J", "h", "n" have no Cyrillic twins
+        self.assertIsNone(fix_homoglyphs("Иванов John"))
+        self.assertIsNone(fix_homoglyphs("Анна9"))
+
+    def test_clean_value_is_not_fixed(self):
+        self.assertIsNone(fix_homoglyphs("Иванов"))
+        self.assertIsNone(fix_homoglyphs(None))
+
+
+if __name__ == "__main__":
+    unittest.main()
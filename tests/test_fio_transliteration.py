@@ -0,0 +1,115 @@
+import sys
+import time
+import unittest
+
+sys.path.insert(0, "src")
+
+from apps.fio_runstore.generator.generators import TransliterationGenerator  # noqa: E402
+from apps.fio_runstore.generator.name_dictionary import NameDictMeta, NameDictionary  # noqa: E402
+from apps.fio_runstore.generator.registry import ValueInfo  # noqa: E402
+from domain.fio.consistency import build_name_gender_table  # noqa: E402
+from domain.fio.transliteration import transliterate_latin, transliterate_latin_parts  # noqa: E402
+
+
+class TestTransliterateLatin(unittest.TestCase):
+    def test_simple_full_parse(self):
+        self.assertEqual(transliterate_latin("Ivanov Ivan"), "Иванов Иван")
+
+    def test_digraphs_and_tetragraph(self):
+        self.assertEqual(transliterate_latin("Zhukov"), "Жуков")
+        self.assertEqual(transliterate_latin("Shchukin"), "Щукин")
+        self.assertEqual(transliterate_latin("Khrushchev"), "Хрущев")
+        self.assertEqual(transliterate_latin("Kuznetsov"), "Кузнецов")
+
+    def test_ya_ia_variants(self):
+        self.assertEqual(transliterate_latin("Mariya"), "Мария")
+        self.assertEqual(transliterate_latin("Mariia"), "Мария")
+        self.assertEqual(transliterate_latin("Iuliia"), "Юлия")
+
+    def test_y_between_vowels_and_final_iy(self):
+        self.assertEqual(transliterate_latin("Sergeyevich"), "Сергеевич")
+        self.assertEqual(transliterate_latin("Dmitriy"), "Дмитрий")
+
+    def test_hyphen_preserved_and_title_cased(self):
+        self.assertEqual(transliterate_latin("RIMSKIY-KORSAKOV"), "Римский-Корсаков")
+
+    def test_ia_after_consonant(self):
+        self.assertEqual(transliterate_latin("Diana"), "Диана")
+        self.assertEqual(transliterate_latin("Kristian"), "Кристиан")
+        self.assertEqual(transliterate_latin("Iakov"), "Яков")
+        (daria,) = transliterate_latin_parts("Daria")
+        self.assertEqual(daria.readings, ("Дария", "Дарья", "Даря"))
+        self.assertTrue(daria.ambiguous)
+        self.assertIn("Татьяна", transliterate_latin_parts("Tatiana")[0].readings)
+
+    def test_soft_sign(self):
+        self.assertEqual(transliterate_latin("Natalya"), "Наталья")
+        self.assertEqual(transliterate_latin("Ilya"), "Илья")
+        self.assertEqual(transliterate_latin("Vasilyevich"), "Васильевич")
+        self.assertEqual(transliterate_latin("Lyudmila"), "Людмила")  # not after a consonant at the start
+        self.assertEqual(transliterate_latin("Vitaly"), "Виталий")
+
+    def test_soft_l_before_a_consonant_is_ambiguous(self):
+        (olga,) = transliterate_latin_parts("Olga")
+        self.assertEqual((olga.readings, olga.ambiguous), (("Олга", "Ольга"), True))
+        self.assertTrue(transliterate_latin_parts("Volkov")[0].ambiguous)
+
+    def test_weak_alternatives_are_not_ambiguous(self):
+        (pavel,) = transliterate_latin_parts("Pavel")
+        self.assertEqual((pavel.readings, pavel.ambiguous), (("Павел", "Павель"), False))
+
+    def test_c_j_q_w(self):
+        self.assertEqual(transliterate_latin("Victor"), "Виктор")
+        self.assertEqual(transliterate_latin("Wagner"), "Вагнер")
+        self.assertEqual(transliterate_latin("Quentin"), "Квентин")
+        self.assertEqual(transliterate_latin("Jurij Aleksej"), "Юрий Алексей")
+        self.assertEqual(transliterate_latin("Marija"), "Мария")
+        self.assertEqual(transliterate_latin("Tatjana"), "Татьяна")
+        self.assertTrue(transliterate_latin_parts("Lucia")[0].ambiguous)
+
+    def test_parts_keep_separators(self):
+        parts = transliterate_latin_parts("Rimskiy-Korsakov Ivan")
+        self.assertEqual([p.readings[0] for p in parts], ["Римский", "-", "Корсаков", " ", "Иван"])
+
+    def test_partial_parse_returns_none(self):
+        # apostrophes and digits are not part of the scheme
+        self.assertIsNone(transliterate_latin("O'Brien"))
+        self.assertIsNone(transliterate_latin("Ivanov2"))
+        self.assertIsNone(transliterate_latin(""))
+
+    def test_adversarial_input_is_linear(self):
+        started = time.perf_counter()
+        self.assertIsNone(transliterate_latin("shc" * 20000 + "'"))
+        self.assertLess(time.perf_counter() - started, 1.0)
+
+
+NAMES = ["Дарья", "Иван", "Ольга"]
+
+
+def _dictionary():
+    return NameDictionary(
+        variant_map={},
+        canonical_names=NAMES,
+        name_gender=build_name_gender_table([(n, n) for n in NAMES]),
+        meta=NameDictMeta(path="names.csv", sha256="0" * 64, total_rows=len(NAMES), enabled_rows=len(NAMES)),
+    )
+
+
+class TestTransliterationGenerator(unittest.TestCase):
+    def _suggest(self, value):
+        (suggestion,) = TransliterationGenerator(_dictionary()).suggest(ValueInfo(value))
+        return suggestion["suggested_value"], suggestion["confidence"]
+
+    def test_dictionary_picks_the_reading(self):
+        self.assertEqual(self._suggest("Ivanova Daria"), ("Иванова Дарья", "high"))
+        self.assertEqual(self._suggest("Petrova Olga"), ("Петрова Ольга", "high"))
+        self.assertEqual(self._suggest("Victor"), ("Виктор", "high"))
+
+    def test_unresolved_reading_is_medium(self):
+        self.assertEqual(self._suggest("Diana"), ("Диана", "medium"))
+        self.assertEqual(self._suggest("Olga"), ("Ольга", "high"))
+        self.assertEqual(self._suggest("Volkov Ivan"), ("Волков Иван", "medium"))
+
+
+if __name__ == "__main__":
+    unittest.main()
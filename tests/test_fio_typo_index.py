@@ -0,0 +1,42 @@
+import sys
+import unittest
+
+sys.path.insert(0, "src")
+
+from domain.fio.typo_index import SymSpellIndex, edit_distance  # noqa: E402
+
+
+NAMES = ["Александр", "Александра", "Иван", "Мария", "Марина", "Сергей"]
+
+
+class TestEditDistance(unittest.TestCase):
+    def test_transposition_counts_as_one(self):
+        self.assertEqual(edit_distance("Иавн", "Иван", 2), 1)
+
+    def test_exceeding_limit_returns_none(self):
+        self.assertIsNone(edit_distance("Иван", "Сергей", 2))
+
+
+class TestSymSpellIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = SymSpellIndex(NAMES, max_distance=2)
+
+    def test_exact_match_is_distance_zero(self):
+        self.assertEqual(self.index.lookup("иван"), [("Иван", 0)])
+
+    def test_single_typo(self):
+        self.assertEqual(self.index.lookup("Алексаднр"), [("Александр", 1)])
+        self.assertEqual(self.index.lookup("Сергй"), [("Сергей", 1)])
+
+    def test_ties_are_all_returned(self):
+        # one edit away from both "Мария" and "Марина"
+        self.assertEqual(self.index.lookup("Марiя"), [("Мария", 1)])
+        self.assertEqual(self.index.lookup("Мариа", max_distance=1), [("Марина", 1), ("Мария", 1)])
+
+    def test_no_candidate_within_limit(self):
+        self.assertEqual(self.index.lookup("Ксюша"), [])
+        self.assertEqual(self.index.lookup("Сргй", max_distance=1), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+import sys
+import threading
+import tracemalloc
+import unittest
+
+sys.path.insert(0, "src")
+
+from apps.fio_runstore.memory import MemoryGuard  # noqa: E402
+
+
+class TestMemoryGuard(unittest.TestCase):
+    def tearDown(self):
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    def test_overlapping_guards_share_tracemalloc(self):
+        first = MemoryGuard(None)
+        second = MemoryGuard(None)
+        first.start()
+        second.start()
+        first.stop()
+        self.assertTrue(tracemalloc.is_tracing())  # still used by the second guard
+        data = [bytes(1000) for _ in range(1000)]
+        self.assertGreater(second.sample("analyze"), 500_000)
+        second.stop()
+        self.assertFalse(tracemalloc.is_tracing())
+        del data
+
+    def test_tracing_started_elsewhere_is_left_on(self):
+        tracemalloc.start()
+        guard = MemoryGuard(None)
+        guard.start()
+        guard.stop()
+        self.assertTrue(tracemalloc.is_tracing())
+
+    def test_sample_from_several_threads(self):
+        guard = MemoryGuard(None, use_tracemalloc=False)
+        guard.start()
+
+        def sample():
+            for _ in range(500):
+                guard.sample("read")
+
+        threads = [threading.Thread(target=sample) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        guard.stop()
+        self.assertEqual(guard.stages["read"]["samples"], 2000)
+        self.assertEqual(guard.stages["end"]["samples"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
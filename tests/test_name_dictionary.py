@@ -0,0 +1,93 @@
+import os
+import sys
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+sys.path.insert(0, "src")
+
+from apps.fio_runstore.generator import name_dictionary as nd  # noqa: E402
+
+
+HEADER = "canonical,variant,enabled,note,source\n"
+BASE = HEADER + "Иван,,1,,base\n"
+
+
+def _wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("timed out")
+        time.sleep(0.01)
+
+
+class TestDictionaryReload(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self._tmp.name, "names.csv")
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write(BASE)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _get(self):
+        return nd.get_name_dictionary(csv_path=self.path)
+
+    def test_edit_is_swapped_in_the_background(self):
+        before = self._get()
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write("Анна,,1,,base\n")
+
+        with mock.patch.object(nd, "RELOAD_CHECK_SECONDS", 0):
+            self.assertIs(self._get(), before)  # served while the reload runs
+            _wait_for(lambda: self._get() is not before)
+        after = self._get()
+        self.assertIn("Анна", after.canonical_names)
+        self.assertIn("typo_index", vars(after))  # built before the swap
+        self.assertNotEqual(after.meta.sha256, before.meta.sha256)
+
+    def test_checks_are_throttled(self):
+        before = self._get()
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write("Анна,,1,,base\n")
+        with mock.patch.object(nd, "RELOAD_CHECK_SECONDS", 3600):
+            self.assertIs(self._get(), before)
+            time.sleep(0.05)
+            self.assertIs(self._get(), before)
+
+    def test_publish_bumps_the_version(self):
+        self._get()
+        self.assertEqual(nd.dictionary_version(csv_path=self.path), 0)
+
+        published = nd.publish_name_dictionary((BASE + "Анна,,1,,base\n").encode(), csv_path=self.path)
+
+        self.assertEqual(nd.dictionary_version(csv_path=self.path), 1)
+        self.assertIs(self._get(), published)  # this process switches at once
+        self.assertEqual(sorted(os.listdir(self._tmp.name)), ["names.csv", "names.csv.version"])
+
+    def test_invalid_publish_keeps_the_file(self):
+        before = self._get()
+        with self.assertRaises(ValueError):
+            nd.publish_name_dictionary("canonical,variant\nАнна,\n".encode(), csv_path=self.path)
+
+        self.assertIs(self._get(), before)
+        self.assertEqual(nd.dictionary_version(csv_path=self.path), 0)
+        with open(self.path, encoding="utf-8") as f:
+            self.assertEqual(f.read(), BASE)
+
+    def test_broken_edit_keeps_the_previous_dictionary(self):
+        before = self._get()
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write("canonical,variant\nАнна,\n")
+        nd.bump_dictionary_version(csv_path=self.path)
+
+        with mock.patch.object(nd, "RELOAD_CHECK_SECONDS", 0), self.assertLogs(nd.logger, "WARNING"):
+            self._get()
+            _wait_for(lambda: nd._cache[nd.Path(self.path)].reloading_pid is None)
+        self.assertIs(self._get(), before)
+
+
+if __name__ == "__main__":
+    unittest.main()
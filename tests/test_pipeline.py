@@ -0,0 +1,57 @@
+import itertools
+import sys
+import threading
+import unittest
+
+sys.path.insert(0, "src")
+
+from apps.fio_runstore.pipeline import Prefetcher  # noqa: E402
+
+
+class TestPrefetcher(unittest.TestCase):
+    def test_yields_everything_in_order(self):
+        with Prefetcher(range(1000), chunk_rows=7, max_chunks=2) as rows:
+            self.assertEqual(list(rows), list(range(1000)))
+
+    def test_reader_error_is_raised_in_consumer(self):
+        def source():
+            yield from range(10)
+            raise UnicodeDecodeError("utf-8", b"\xff", 0, 1, "invalid start byte")
+
+        with Prefetcher(source(), chunk_rows=4) as rows:
+            seen = []
+            with self.assertRaises(UnicodeDecodeError):
+                for row in rows:
+                    seen.append(row)
+        self.assertEqual(seen, list(range(8)))  # the last, partial chunk is lost with the error
+
+    def test_leaving_early_cancels_reader(self):
+        closed = threading.Event()
+
+        def endless():
+            try:
+                yield from itertools.count()
+            finally:
+                closed.set()
+
+        prefetcher = Prefetcher(endless(), chunk_rows=10, max_chunks=2)
+        with self.assertRaises(RuntimeError):
+            with prefetcher as rows:
+                for row in rows:
+                    if row == 25:
+                        raise RuntimeError("analysis failed")
+        self.assertFalse(prefetcher._thread.is_alive())
+        self.assertTrue(closed.is_set())
+
+    def test_shrinking_while_reading(self):
+        with Prefetcher(range(1000), chunk_rows=100, max_chunks=8) as rows:
+            it = iter(rows)
+            seen = [next(it)]
+            rows.max_chunks, rows.chunk_rows = 2, 10
+            seen.extend(it)
+        self.assertEqual(seen, list(range(1000)))
+        self.assertEqual((rows.max_chunks, rows.chunk_rows), (2, 10))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, "src")
+
+from apps.fio_runstore import prometheus  # noqa: E402
+
+
+class TestMultiProcessFiles(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.directory = Path(self._tmp.name)
+        patcher = mock.patch.object(prometheus, "_metrics_dir", return_value=self.directory)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        prometheus.reset()
+        prometheus._claimed_pid = None
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _write_worker(self, name, pid, counters=(), gauges=(), instance="other"):
+        data = {"pid": pid, "instance": instance, "counters": list(counters), "gauges": list(gauges), "histograms": []}
+        (self.directory / name).write_text(json.dumps(data), encoding="utf-8")
+
+    def test_rows_per_second_is_per_worker(self):
+        other = os.getppid()  # a live process
+        self._write_worker(f"{other}.json", other, gauges=[["fio_run_rows_per_second", [], 100.0]])
+        prometheus.set_gauge("fio_run_rows_per_second", 300.0)
+        text = prometheus.render_text()
+        self.assertIn(f'fio_run_rows_per_second{{pid="{other}"}} 100', text)
+        self.assertIn(f'fio_run_rows_per_second{{pid="{os.getpid()}"}} 300', text)
+
+    def test_reused_pid_keeps_counters_of_the_exited_process(self):
+        pid = os.getpid()
+        self._write_worker(
+            f"{pid}.json",
+            pid,
+            counters=[["fio_runs_total", [], 5]],
+            gauges=[["fio_runs_in_flight", [], 1]],
+        )
+        prometheus.inc_counter("fio_runs_total", 2)
+        text = prometheus.render_text()
+        self.assertIn("fio_runs_total 7", text)
+        self.assertNotIn("fio_runs_in_flight 1", text)
+
+        prometheus.inc_counter("fio_runs_total", 1)
+        prometheus.flush()  # later flushes only rewrite this process's own file
+        self.assertIn("fio_runs_total 8", prometheus.render_text())
+        self.assertEqual(len(list(self.directory.glob("*.json"))), 2)
+
+    def test_reset_keeps_registered_caches(self):
+        info = mock.Mock(return_value=mock.Mock(hits=3, misses=1))
+        prometheus.register_cache("test", info)
+        prometheus.reset()
+        self.assertIn('fio_cache_hit_ratio{cache="test"} 0.75', prometheus.render_text())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+import sys
+import threading
+import unittest
+
+sys.path.insert(0, "tests")
+
+import django_env  # noqa: E402
+from uploads.csv_dialect import SNIFF_BYTES  # noqa: E402
+
+
+def setUpModule():
+    django_env.setup()
+
+
+class TestNormalizePreview(unittest.TestCase):
+    def setUp(self):
+        from django.core.files.base import ContentFile
+        from django.core.files.storage import default_storage
+        from django.test import Client
+
+        self.client = Client()
+        self.storage = default_storage
+        self.ContentFile = ContentFile
+
+    def _activate(self, data: bytes, selection: dict) -> None:
+        path = self.storage.save("uploads/preview.csv", self.ContentFile(data))
+        session = self.client.session
+        session["active_csv_path"] = path
+        session["fio_selection"] = selection
+        session.save()
+
+    def test_invalid_byte_past_the_sniffed_sample(self):
+        rows = [b"fio;note\n"] + [b"Ivanov Ivan;" + b"x" * 1000 + b"\n" for _ in range(SNIFF_BYTES // 1000 + 1)]
+        rows.append(b"Petrov \xff;y\n")
+        self._activate(b"".join(rows), {"mode": "single", "fio_column": "fio"})
+
+        for query in ("", "?status=needs_review"):
+            response = self.client.get("/normalize-preview/" + query)
+            self.assertEqual(response.status_code, 200)
+            self.assertIn("utf-8", response.context["error"])
+
+
+class TestUpload(unittest.TestCase):
+    def test_stray_quote_on_last_line_without_newline(self):
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        from django.test import Client
+
+        client = Client()
+        responses = []
+
+        def upload():
+            data = b'fio,x\nIvanov Ivan,1\nPetrov "x,2'
+            responses.append(client.post("/", {"csv_file": SimpleUploadedFile("stray.csv", data)}))
+            responses.append(client.get("/normalize-preview/"))
+
+        thread = threading.Thread(target=upload, daemon=True)
+        thread.start()
+        thread.join(timeout=30)
+        self.assertFalse(thread.is_alive(), "the upload request did not return")
+        self.assertEqual([r.status_code for r in responses], [200, 200])
+        self.assertTrue(responses[0].context["success"])
+
+
+class TestColumnMetrics(unittest.TestCase):
+    def _select(self):
+        from django.core.files.base import ContentFile
+        from django.core.files.storage import default_storage
+        from django.test import Client
+
+        client = Client()
+        session = client.session
+        data = "fio;x\n" + "".join(f"Иванов Иван{i % 3};{i}\n" for i in range(10))
+        session["active_csv_path"] = default_storage.save("uploads/metrics.csv", ContentFile(data.encode()))
+        session.save()
+        return client.post("/", {"action": "select", "fio_mode": "single", "fio_column": "fio"})
+
+    def test_whole_file_by_default(self):
+        response = self._select()
+        self.assertEqual(response.context["metrics_rows_checked"], 10)
+        self.assertTrue(response.context["metrics_complete"])
+        self.assertEqual(response.context["metrics_stats"]["fio"]["distinct_estimate"], 3)
+
+    def test_capped_profile_is_labelled_partial(self):
+        from django.test import override_settings
+
+        with override_settings(FIO_COLUMN_PROFILE={"MAX_ROWS": 4}):
+            response = self._select()
+        self.assertEqual(response.context["metrics_rows_checked"], 4)
+        self.assertFalse(response.context["metrics_complete"])
+        self.assertIn("Частичные метрики", response.content.decode())
+
+
+class TestSidecarFiles(unittest.TestCase):
+    def test_concurrent_saves_replace_the_same_file(self):
+        from django.core.files.base import ContentFile
+        from django.core.files.storage import default_storage
+        from uploads.row_index import ensure_row_index, row_index_path, replace_file
+
+        upload = default_storage.save("uploads/sidecar.csv", ContentFile(b"fio\nIvanov Ivan\n"))
+        name = row_index_path(upload)
+        threads = [threading.Thread(target=replace_file, args=(name, b"%d" % i)) for i in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(ensure_row_index(upload).data_rows, 1)  # the garbage index is rebuilt
+        ensure_row_index(upload)
+
+        _, files = default_storage.listdir("uploads")
+        self.assertEqual(sorted(f for f in files if f.startswith("sidecar")), ["sidecar.csv", "sidecar.csv.rows.idx"])
+
+
+if __name__ == "__main__":
+    unittest.main()
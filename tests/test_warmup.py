@@ -0,0 +1,40 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, "src")
+
+from apps.fio_runstore.generator.name_dictionary import get_name_dictionary  # noqa: E402
+from apps.fio_runstore.warmup import warm_up  # noqa: E402
+
+
+HEADER = "canonical,variant,enabled,note,source\n"
+
+
+class TestWarmUp(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self._tmp.name, "names.csv")
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write(HEADER + "Иван,,1,,base\nАлександр,Саша,1,,base\n")
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_warm_up_fills_the_shared_dictionary(self):
+        result = warm_up(self.path)
+        name_dictionary = get_name_dictionary(csv_path=self.path)
+
+        self.assertEqual(result["names"], 2)
+        self.assertEqual(result["dictionary_hash"], name_dictionary.meta.sha256)
+        self.assertIn("typo_index", vars(name_dictionary))  # built, not deferred
+        self.assertIs(get_name_dictionary(csv_path=self.path), name_dictionary)
+
+    def test_missing_dictionary(self):
+        with self.assertRaises(FileNotFoundError):
+            warm_up(os.path.join(self._tmp.name, "missing.csv"))
+
+
+if __name__ == "__main__":
+    unittest.main()